@@ -3,6 +3,7 @@ import path from 'path';
 import fs from 'fs';
 import { fileURLToPath } from 'url';
 import { spawn, execSync } from 'child_process';
+import { randomUUID } from 'crypto';
 import { initDB, dbAPI } from './db.js';
 import { VoiceConversationEngine } from './voice-engine.js';
 
@@ -1528,6 +1529,157 @@ ipcMain.handle('tts:generate-stream', async (event, config) => {
     }
 });
 
+// Binary PCM16 streaming: parses the length-prefixed frames from /generate-stream-pcm
+// and forwards each audio chunk to the renderer as it arrives (no base64/WAV per chunk).
+// Every stream has its own AbortController keyed by the streamId the renderer passes in,
+// so concurrent streams are independent; tts:cancel-stream-pcm(streamId) drops that
+// stream's connection and the server then stops generating it.
+const pcmStreamControllers = new Map();
+
+ipcMain.handle('tts:cancel-stream-pcm', async (event, streamId) => {
+    const controller = pcmStreamControllers.get(streamId);
+    if (controller) {
+        controller.abort();
+        pcmStreamControllers.delete(streamId);
+        return { success: true, cancelled: true };
+    }
+    return { success: true, cancelled: false };
+});
+
+// Byte queue over the received network chunks: frames are sliced out of it without
+// re-concatenating everything received so far on each read.
+class ByteQueue {
+    constructor() {
+        this.chunks = [];
+        this.length = 0;
+    }
+
+    push(chunk) {
+        if (chunk.length === 0) return;
+        this.chunks.push(chunk);
+        this.length += chunk.length;
+    }
+
+    // First n bytes without consuming them, or null if fewer are buffered
+    peek(n) {
+        if (this.length < n) return null;
+        if (this.chunks[0].length >= n) return this.chunks[0].subarray(0, n);
+        const parts = [];
+        let needed = n;
+        for (const chunk of this.chunks) {
+            parts.push(chunk.subarray(0, Math.min(needed, chunk.length)));
+            needed -= parts[parts.length - 1].length;
+            if (needed === 0) break;
+        }
+        return Buffer.concat(parts, n);
+    }
+
+    // Consume and return the first n bytes, or null if fewer are buffered
+    read(n) {
+        const bytes = this.peek(n);
+        if (bytes === null) return null;
+        let remaining = n;
+        while (remaining > 0) {
+            const chunk = this.chunks[0];
+            if (chunk.length <= remaining) {
+                this.chunks.shift();
+                remaining -= chunk.length;
+            } else {
+                this.chunks[0] = chunk.subarray(remaining);
+                remaining = 0;
+            }
+        }
+        this.length -= n;
+        return bytes;
+    }
+}
+
+// Request /generate-stream-pcm and parse its frames as they arrive. onStart(header) fires
+// once, onChunk(pcm) for every PCM16 chunk; resolves with the done/error summary.
+async function streamTtsPcm({ refAudio, refText, genText, temperature, topK }, { signal, onStart, onChunk }) {
+    const response = await fetch(`${TTS_SERVER_URL}/generate-stream-pcm`, {
+        method: 'POST',
+        signal,
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({
+            ref_audio: refAudio, ref_text: refText || '',
+            gen_text: genText, temperature, top_k: topK,
+        }),
+    });
+    if (!response.ok) {
+        const data = await response.json().catch(() => ({}));
+        return { success: false, error: data.detail || data.error || `HTTP ${response.status}` };
+    }
+
+    const reader = response.body.getReader();
+    const queue = new ByteQueue();
+    let header = null;
+
+    while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        queue.push(Buffer.from(value.buffer, value.byteOffset, value.byteLength));
+
+        if (!header) {
+            const bytes = queue.read(12);
+            if (!bytes) continue;
+            if (bytes.toString('ascii', 0, 4) !== 'VNPC') {
+                return { success: false, error: 'Invalid PCM stream header' };
+            }
+            header = {
+                sampleRate: bytes.readUInt32LE(4),
+                channels: bytes.readUInt16LE(8),
+                bitsPerSample: bytes.readUInt16LE(10),
+            };
+            onStart?.(header);
+        }
+
+        // Frame: uint8 type | uint32 length | payload
+        let prefix;
+        while ((prefix = queue.peek(5)) !== null) {
+            const type = prefix.readUInt8(0);
+            const length = prefix.readUInt32LE(1);
+            if (queue.length < 5 + length) break;
+            queue.read(5);
+            const payload = queue.read(length) ?? Buffer.alloc(0);
+
+            if (type === 1) {
+                onChunk?.(Buffer.from(payload));
+            } else if (type === 2) {
+                return { success: true, ...header, ...JSON.parse(payload.toString('utf8')) };
+            } else if (type === 3) {
+                return { success: false, error: JSON.parse(payload.toString('utf8')).error };
+            }
+        }
+    }
+    return { success: false, error: 'PCM stream ended unexpectedly' };
+}
+
+ipcMain.handle('tts:generate-stream-pcm', async (event, config) => {
+    const streamId = config?.streamId ?? randomUUID();
+    if (pcmStreamControllers.has(streamId)) {
+        return { success: false, streamId, error: `Stream ${streamId} is already running` };
+    }
+    const controller = new AbortController();
+    pcmStreamControllers.set(streamId, controller);
+    try {
+        if (!config?.genText) return { success: false, streamId, error: 'Missing params' };
+
+        let chunkIndex = 0;
+        const result = await streamTtsPcm(config, {
+            signal: controller.signal,
+            onStart: (header) => event.sender.send('tts:pcm-start', { streamId, ...header }),
+            onChunk: (pcm) => event.sender.send('tts:pcm-chunk', { streamId, chunkIndex: chunkIndex++, pcm }),
+        });
+        return { streamId, ...result };
+    } catch (error) {
+        if (error.name === 'AbortError') return { success: false, streamId, cancelled: true, error: 'Cancelled' };
+        return { success: false, streamId, error: error.message || 'TTS server error' };
+    } finally {
+        if (pcmStreamControllers.get(streamId) === controller) pcmStreamControllers.delete(streamId);
+    }
+});
+
 // F5-TTS: Build dataset + Finetune voice
 // Get training script text for user to read
 ipcMain.handle('tts:get-training-script', async () => {
@@ -2205,8 +2357,18 @@ async function ollamaPromptStream(prompt, onToken, temperature = 0.5, topP = 0.9
     return fullText;
 }
 
-// TTS server wrapper (generates WAV and returns buffer)
+// TTS server wrapper (generates WAV and returns buffer, or streams PCM16 chunks)
 const ttsServerWrap = {
+    // Stream one sentence as PCM16 so playback starts with its first decoded chunk
+    async generatePcmStream({ refAudio, refText, genText, signal, onStart, onChunk }) {
+        try {
+            return await streamTtsPcm({ refAudio, refText, genText }, { signal, onStart, onChunk });
+        } catch (error) {
+            if (error.name === 'AbortError') return { success: false, cancelled: true, error: 'Cancelled' };
+            return { success: false, error: error.message || 'TTS server error' };
+        }
+    },
+
     async generateWav({ refAudio, refText, genText, speed }) {
         try {
             const result = await ttsServerFetch('/generate', {
@@ -2274,6 +2436,18 @@ function createVoiceChatEventSender() {
                         chunkIndex: evt.chunkIndex,
                     });
                     break;
+                case 'tts-pcm-start':
+                    win.webContents.send('voice-chat:tts-pcm-start', {
+                        chunkIndex: evt.chunkIndex,
+                        sampleRate: evt.sampleRate,
+                    });
+                    break;
+                case 'tts-pcm-chunk':
+                    win.webContents.send('voice-chat:tts-pcm-chunk', { chunkIndex: evt.chunkIndex, pcm: evt.pcm });
+                    break;
+                case 'tts-pcm-end':
+                    win.webContents.send('voice-chat:tts-pcm-end', { chunkIndex: evt.chunkIndex });
+                    break;
                 case 'tts-chunk-failed':
                     win.webContents.send('voice-chat:tts-chunk-failed', { chunkIndex: evt.chunkIndex });
                     break;
@@ -36,6 +36,9 @@ contextBridge.exposeInMainWorld('electronAPI', {
             if (handlers.onSttDone) ipcRenderer.on('voice-chat:stt-done', (_, data) => handlers.onSttDone(data));
             if (handlers.onLlmChunk) ipcRenderer.on('voice-chat:llm-chunk', (_, data) => handlers.onLlmChunk(data));
             if (handlers.onTtsAudio) ipcRenderer.on('voice-chat:tts-audio', (_, data) => handlers.onTtsAudio(data));
+            if (handlers.onTtsPcmStart) ipcRenderer.on('voice-chat:tts-pcm-start', (_, data) => handlers.onTtsPcmStart(data));
+            if (handlers.onTtsPcmChunk) ipcRenderer.on('voice-chat:tts-pcm-chunk', (_, data) => handlers.onTtsPcmChunk(data));
+            if (handlers.onTtsPcmEnd) ipcRenderer.on('voice-chat:tts-pcm-end', (_, data) => handlers.onTtsPcmEnd(data));
             if (handlers.onTtsChunkFailed) ipcRenderer.on('voice-chat:tts-chunk-failed', (_, data) => handlers.onTtsChunkFailed(data));
             if (handlers.onDone) ipcRenderer.on('voice-chat:done', (_, data) => handlers.onDone(data));
         },
@@ -43,6 +46,9 @@ contextBridge.exposeInMainWorld('electronAPI', {
             ipcRenderer.removeAllListeners('voice-chat:stt-done');
             ipcRenderer.removeAllListeners('voice-chat:llm-chunk');
             ipcRenderer.removeAllListeners('voice-chat:tts-audio');
+            ipcRenderer.removeAllListeners('voice-chat:tts-pcm-start');
+            ipcRenderer.removeAllListeners('voice-chat:tts-pcm-chunk');
+            ipcRenderer.removeAllListeners('voice-chat:tts-pcm-end');
             ipcRenderer.removeAllListeners('voice-chat:tts-chunk-failed');
             ipcRenderer.removeAllListeners('voice-chat:done');
         },
@@ -101,6 +107,15 @@ contextBridge.exposeInMainWorld('electronAPI', {
         getTranscripts: () => ipcRenderer.invoke('tts:get-transcripts'),
         generate: (config) => ipcRenderer.invoke('tts:generate', config),
         generateStream: (config) => ipcRenderer.invoke('tts:generate-stream', config),
+        // config.streamId identifies the stream in pcm-start/pcm-chunk events and in cancelStreamPcm
+        generateStreamPcm: (config) => ipcRenderer.invoke('tts:generate-stream-pcm', config),
+        cancelStreamPcm: (streamId) => ipcRenderer.invoke('tts:cancel-stream-pcm', streamId),
+        onPcmStart: (callback) => ipcRenderer.on('tts:pcm-start', (_, data) => callback(data)),
+        onPcmChunk: (callback) => ipcRenderer.on('tts:pcm-chunk', (_, data) => callback(data)),
+        removePcmListeners: () => {
+            ipcRenderer.removeAllListeners('tts:pcm-start');
+            ipcRenderer.removeAllListeners('tts:pcm-chunk');
+        },
         getTrainingScript: () => ipcRenderer.invoke('tts:get-training-script'),
         pickVoiceFile: (voiceName) => ipcRenderer.invoke('tts:pick-voice-file', voiceName),
         autoProcess: (audioPath) => ipcRenderer.invoke('tts:auto-process', audioPath),
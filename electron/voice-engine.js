@@ -17,6 +17,25 @@ function stripThinking(text) {
   return text.replace(/<think>[\s\S]*?<\/think>/gi, '').trim();
 }
 
+// Wrap PCM16 mono samples in a WAV container
+function pcmToWav(pcm, sampleRate) {
+  const header = Buffer.alloc(44);
+  header.write("RIFF", 0, "ascii");
+  header.writeUInt32LE(36 + pcm.length, 4);
+  header.write("WAVE", 8, "ascii");
+  header.write("fmt ", 12, "ascii");
+  header.writeUInt32LE(16, 16);
+  header.writeUInt16LE(1, 20); // PCM
+  header.writeUInt16LE(1, 22); // mono
+  header.writeUInt32LE(sampleRate, 24);
+  header.writeUInt32LE(sampleRate * 2, 28);
+  header.writeUInt16LE(2, 32);
+  header.writeUInt16LE(16, 34);
+  header.write("data", 36, "ascii");
+  header.writeUInt32LE(pcm.length, 40);
+  return Buffer.concat([header, pcm]);
+}
+
 export class VoiceConversationEngine {
   constructor({ nodewhisper, workerPrompt, workerPromptStream, initQwenModel, runPython, ttsServer, dbAPI }) {
     this.nodewhisper = nodewhisper;
@@ -101,6 +120,42 @@ export class VoiceConversationEngine {
     };
   }
 
+  /**
+   * Synthesize one sentence chunk. When the TTS server wrapper can stream PCM16, the chunk's
+   * audio is forwarded as it is decoded (tts-pcm-start / tts-pcm-chunk / tts-pcm-end), so
+   * playback starts before the sentence is finished; otherwise the whole WAV is generated.
+   * Resolves with { success, audioBuffer (WAV), streamed, error }.
+   */
+  async synthesizeChunk(idx, text, onEvent) {
+    const voice = {
+      refAudio: this.voiceConfig?.refAudio || "",
+      refText: this.voiceConfig?.refText || "",
+      genText: text,
+    };
+    if (!this.ttsServer.generatePcmStream) {
+      return this.ttsServer.generateWav({ ...voice, speed: 1.0 });
+    }
+
+    const parts = [];
+    let sampleRate = null;
+    const result = await this.ttsServer.generatePcmStream({
+      ...voice,
+      onStart: (header) => {
+        sampleRate = header.sampleRate;
+        onEvent?.({ type: "tts-pcm-start", chunkIndex: idx, sampleRate });
+      },
+      onChunk: (pcm) => {
+        parts.push(pcm);
+        onEvent?.({ type: "tts-pcm-chunk", chunkIndex: idx, pcm });
+      },
+    });
+    if (!result.success) {
+      return { success: false, streamed: sampleRate !== null, error: result.error };
+    }
+    onEvent?.({ type: "tts-pcm-end", chunkIndex: idx });
+    return { success: true, streamed: true, audioBuffer: pcmToWav(Buffer.concat(parts), sampleRate) };
+  }
+
   async processAudioChunk(audioData, filename) {
     if (!this.isActive) {
       return { success: false, error: "Voice engine not active" };
@@ -247,7 +302,11 @@ export class VoiceConversationEngine {
    * @param {function} onEvent - callback for streaming events:
    *   { type: 'stt-done',  transcript }
    *   { type: 'llm-chunk', text, fullText }  — each sentence-level chunk
-   *   { type: 'tts-audio', audioBuffer, chunkIndex }
+   *   { type: 'tts-audio', audioBuffer, chunkIndex }      — whole WAV (non-streaming server)
+   *   { type: 'tts-pcm-start', chunkIndex, sampleRate }   — PCM16 streaming of one chunk
+   *   { type: 'tts-pcm-chunk', chunkIndex, pcm }
+   *   { type: 'tts-pcm-end',   chunkIndex }
+   *   { type: 'tts-chunk-failed', chunkIndex }
    *   { type: 'done',      timings, responseText }
    */
   /**
@@ -309,19 +368,17 @@ export class VoiceConversationEngine {
           activeTts++;
           const ttsChunkStart = performance.now();
           try {
-            const ttsResult = await this.ttsServer.generateWav({
-              refAudio: this.voiceConfig?.refAudio || "",
-              refText: this.voiceConfig?.refText || "",
-              genText: text,
-              speed: 1.0,
-            });
+            const ttsResult = await this.synthesizeChunk(idx, text, onEvent);
 
             if (ttsResult.success) {
               audioBuffers[idx] = ttsResult.audioBuffer;
               const ttsDur = ((performance.now() - ttsChunkStart) / 1000).toFixed(2);
               if (chunkTimings[idx]) chunkTimings[idx].ttsDur = ttsDur;
               console.log(`[VoiceEngine:Text] 🔊 TTS chunk ${idx} ready (${ttsDur}s, ${ttsResult.audioBuffer.length} bytes)`);
-              onEvent?.({ type: "tts-audio", audioBuffer: ttsResult.audioBuffer, chunkIndex: idx });
+              // Streamed chunks already reached the renderer as PCM
+              if (!ttsResult.streamed) {
+                onEvent?.({ type: "tts-audio", audioBuffer: ttsResult.audioBuffer, chunkIndex: idx });
+              }
             } else {
               console.warn(`[VoiceEngine:Text] TTS chunk ${idx} failed:`, ttsResult.error);
               audioBuffers[idx] = null;
@@ -546,19 +603,17 @@ export class VoiceConversationEngine {
           activeTts++;
           const ttsChunkStart = performance.now();
           try {
-            const ttsResult = await this.ttsServer.generateWav({
-              refAudio: this.voiceConfig?.refAudio || "",
-              refText: this.voiceConfig?.refText || "",
-              genText: text,
-              speed: 1.0,
-            });
+            const ttsResult = await this.synthesizeChunk(idx, text, onEvent);
 
             if (ttsResult.success) {
               audioBuffers[idx] = ttsResult.audioBuffer;
               const ttsDur = ((performance.now() - ttsChunkStart) / 1000).toFixed(2);
               if (chunkTimings[idx]) chunkTimings[idx].ttsDur = ttsDur;
               console.log(`[VoiceEngine:Stream] 🔊 TTS chunk ${idx} ready (${ttsDur}s, ${ttsResult.audioBuffer.length} bytes)`);
-              onEvent?.({ type: "tts-audio", audioBuffer: ttsResult.audioBuffer, chunkIndex: idx });
+              // Streamed chunks already reached the renderer as PCM
+              if (!ttsResult.streamed) {
+                onEvent?.({ type: "tts-audio", audioBuffer: ttsResult.audioBuffer, chunkIndex: idx });
+              }
             } else {
               console.warn(`[VoiceEngine:Stream] TTS chunk ${idx} failed:`, ttsResult.error);
               audioBuffers[idx] = null;
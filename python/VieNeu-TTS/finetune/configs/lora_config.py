@@ -34,6 +34,10 @@ training_config = {
     'bf16': True, 
     
     'use_4bit': False, 
+
+    # "default" hoặc "ref_first" (đặt audio tham chiếu trước văn bản cần đọc, cho phép
+    # cache toàn bộ phần tham chiếu khi suy luận; dùng VieNeuTTS(prompt_layout="ref_first"))
+    'prompt_layout': "default",
 }
 
 def get_training_args(config):
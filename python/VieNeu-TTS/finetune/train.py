@@ -18,17 +18,23 @@ sys.path.insert(0, os.path.join(project_root, "src"))
 sys.path.insert(0, project_root)
 
 from vieneu_utils.phonemize_text import phonemize_with_dict
+from vieneu_utils.core_utils import format_codes_str, format_prompt_prefix, PROMPT_LAYOUTS
 from finetune.configs.lora_config import lora_config, training_config, get_training_args
 
-def preprocess_sample(sample, tokenizer, max_len=2048):
+def preprocess_sample(sample, tokenizer, max_len=2048, prompt_layout="default"):
     speech_gen_start = tokenizer.convert_tokens_to_ids('<|SPEECH_GENERATION_START|>')
     ignore_index = -100
     
     phones = sample["phones"]
     vq_codes = sample["codes"]
     
-    codes_str = "".join([f"<|speech_{i}|>" for i in vq_codes])
+    codes_str = format_codes_str(vq_codes)
     chat = f"""user: Convert the text to speech:<|TEXT_PROMPT_START|>{phones}<|TEXT_PROMPT_END|>\nassistant:<|SPEECH_GENERATION_START|>{codes_str}<|SPEECH_GENERATION_END|>"""
+    if prompt_layout == "ref_first":
+        # Reference utterance (text + codes) comes first as a full turn, so at inference time
+        # everything voice-specific is a cacheable prompt prefix
+        ref_prefix = format_prompt_prefix(sample["ref_phones"], format_codes_str(sample["ref_codes"]), prompt_layout)
+        chat = f"{ref_prefix}\n{chat}"
     
     ids = tokenizer.encode(chat)
     
@@ -43,7 +49,8 @@ def preprocess_sample(sample, tokenizer, max_len=2048):
     
     speech_gen_start_idx = (input_ids == speech_gen_start).nonzero(as_tuple=True)[0]
     if len(speech_gen_start_idx) > 0:
-        speech_gen_start_idx = speech_gen_start_idx[0]
+        # Only the target utterance is supervised (the last generation start)
+        speech_gen_start_idx = speech_gen_start_idx[-1]
         labels[speech_gen_start_idx:] = input_ids[speech_gen_start_idx:]
     
     attention_mask = (input_ids != tokenizer.pad_token_id).long()
@@ -55,10 +62,13 @@ def preprocess_sample(sample, tokenizer, max_len=2048):
     }
 
 class VieNeuDataset(Dataset):
-    def __init__(self, metadata_path, tokenizer, max_len=2048):
+    def __init__(self, metadata_path, tokenizer, max_len=2048, prompt_layout="default"):
+        if prompt_layout not in PROMPT_LAYOUTS:
+            raise ValueError(f"prompt_layout không hợp lệ: {prompt_layout}. Chọn một trong {PROMPT_LAYOUTS}")
         self.samples = []
         self.tokenizer = tokenizer
         self.max_len = max_len
+        self.prompt_layout = prompt_layout
         
         if not os.path.exists(metadata_path):
              raise FileNotFoundError(f"Missing dataset file: {metadata_path}")
@@ -78,22 +88,33 @@ class VieNeuDataset(Dataset):
     def __len__(self):
         return len(self.samples)
 
-    def __getitem__(self, idx):
-        sample = self.samples[idx]
-        text = sample["text"]
-        
+    def _phonemize(self, text):
         try:
-            phones = phonemize_with_dict(text)
+            return phonemize_with_dict(text)
         except Exception as e:
             print(f"⚠️ Lỗi khi xử lý text: {e}")
-            phones = text 
-            
+            return text
+
+    def __getitem__(self, idx):
+        sample = self.samples[idx]
+        
         data_item = {
-            "phones": phones,
+            "phones": self._phonemize(sample["text"]),
             "codes": sample["codes"]
         }
+
+        if self.prompt_layout == "ref_first":
+            # Dùng một mẫu khác cùng giọng làm tham chiếu
+            ref_idx = idx
+            if len(self.samples) > 1:
+                ref_idx = random.randrange(len(self.samples) - 1)
+                if ref_idx >= idx:
+                    ref_idx += 1
+            ref_sample = self.samples[ref_idx]
+            data_item["ref_phones"] = self._phonemize(ref_sample["text"])
+            data_item["ref_codes"] = ref_sample["codes"]
         
-        return preprocess_sample(data_item, self.tokenizer, self.max_len)
+        return preprocess_sample(data_item, self.tokenizer, self.max_len, self.prompt_layout)
 
 def run_training():
     model_name = training_config['model']
@@ -117,7 +138,7 @@ def run_training():
         print(f"⚠️ Không tìm thấy {dataset_path}. Vui lòng chạy prepare data trước.")
         return
 
-    full_dataset = VieNeuDataset(dataset_path, tokenizer)
+    full_dataset = VieNeuDataset(dataset_path, tokenizer, prompt_layout=training_config.get('prompt_layout', "default"))
     
     print(f"🦜 Total samples: {len(full_dataset)} (eval disabled, training only)")
     
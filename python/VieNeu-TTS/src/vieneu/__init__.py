@@ -2,5 +2,10 @@ from .standard import VieNeuTTS
 from .fast import FastVieNeuTTS
 from .remote import RemoteVieNeuTTS
 from .factory import Vieneu
+from .cache import ReferenceCodeCache, AudioCache
+from .pool import BackbonePool
+from .balancer import EndpointBalancer
+from .metrics import MetricsRegistry
+from .voice import PreparedVoice
 
-__all__ = ["VieNeuTTS", "FastVieNeuTTS", "RemoteVieNeuTTS", "Vieneu"]
+__all__ = ["VieNeuTTS", "FastVieNeuTTS", "RemoteVieNeuTTS", "Vieneu", "ReferenceCodeCache", "AudioCache", "BackbonePool", "EndpointBalancer", "MetricsRegistry", "PreparedVoice"]
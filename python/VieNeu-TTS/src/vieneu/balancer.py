@@ -0,0 +1,169 @@
+import hashlib
+import threading
+import time
+import logging
+from contextlib import contextmanager
+from typing import Optional, List, Dict, Any, Iterator, Iterable
+
+import requests
+
+logger = logging.getLogger("Vieneu.Balancer")
+
+
+def _rendezvous_score(key: str, endpoint: str) -> int:
+    # hashlib rather than hash(): the mapping must agree across processes and restarts
+    return int.from_bytes(hashlib.blake2b(f"{key}|{endpoint}".encode("utf-8"), digest_size=8).digest(), "big")
+
+
+class EndpointBalancer:
+    """
+    Client-side load balancing across several LMDeploy API servers.
+
+    Each request goes to the healthy endpoint with the fewest requests in flight.
+    Requests carrying an ``affinity_key`` (the voice identity) prefer the endpoint that
+    rendezvous hashing assigns to that key, so one voice keeps hitting the same server's
+    prefix cache; the preference is dropped when that endpoint has more than
+    ``affinity_slack`` requests above the least loaded one. Endpoints that fail are
+    skipped for ``retry_after`` seconds, and a background thread probes ``/models``
+    every ``health_interval`` seconds to take them out or bring them back sooner.
+    """
+
+    def __init__(
+        self,
+        endpoints: Iterable[str],
+        health_interval: float = 10.0,
+        health_timeout: float = 2.0,
+        retry_after: float = 5.0,
+        affinity_slack: int = 2,
+    ):
+        """
+        Args:
+            endpoints: API base URLs, e.g. ``http://host:23333/v1``.
+            health_interval: Seconds between health probes. 0 disables them; with a single
+                endpoint there is nothing to balance and no probe thread is started.
+            health_timeout: Timeout of one health probe.
+            retry_after: Seconds a failed endpoint is skipped unless a probe revives it.
+            affinity_slack: Extra in-flight requests tolerated on the affine endpoint.
+        """
+        self.endpoints: List[str] = list(dict.fromkeys(e.rstrip("/") for e in endpoints))
+        if not self.endpoints:
+            raise ValueError("At least one endpoint is required")
+        self.health_timeout = health_timeout
+        self.retry_after = retry_after
+        self.affinity_slack = max(0, int(affinity_slack))
+
+        self._lock = threading.Lock()
+        self._outstanding: Dict[str, int] = {e: 0 for e in self.endpoints}
+        self._down_until: Dict[str, float] = {e: 0.0 for e in self.endpoints}
+        self._requests: Dict[str, int] = {e: 0 for e in self.endpoints}
+        self._failures: Dict[str, int] = {e: 0 for e in self.endpoints}
+        self._rotation = 0
+
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        if health_interval > 0 and len(self.endpoints) > 1:
+            self._thread = threading.Thread(
+                target=self._run, args=(health_interval,), name="vieneu-health-check", daemon=True
+            )
+            self._thread.start()
+
+    def __len__(self) -> int:
+        return len(self.endpoints)
+
+    def select(self, affinity_key: Optional[str] = None, exclude: Iterable[str] = ()) -> str:
+        """
+        Pick the endpoint for the next request.
+
+        Raises:
+            RuntimeError: If every endpoint is excluded.
+        """
+        exclude = set(exclude)
+        with self._lock:
+            candidates = [e for e in self.endpoints if e not in exclude]
+            if not candidates:
+                raise RuntimeError("No endpoint left to try")
+            now = time.monotonic()
+            # When everything is marked down, trying one beats failing outright
+            candidates = [e for e in candidates if self._down_until[e] <= now] or candidates
+            least = min(self._outstanding[e] for e in candidates)
+
+            if affinity_key is not None:
+                for e in sorted(candidates, key=lambda e: _rendezvous_score(affinity_key, e), reverse=True):
+                    if self._outstanding[e] <= least + self.affinity_slack:
+                        return e
+
+            idle = [e for e in candidates if self._outstanding[e] == least]
+            self._rotation += 1
+            return idle[self._rotation % len(idle)]
+
+    def choices(self, affinity_key: Optional[str] = None) -> Iterator[str]:
+        """Yield endpoints to try in turn (for failover), each chosen by :meth:`select` among the untried."""
+        tried: List[str] = []
+        while len(tried) < len(self.endpoints):
+            endpoint = self.select(affinity_key, tried)
+            tried.append(endpoint)
+            yield endpoint
+
+    @contextmanager
+    def track(self, endpoint: str) -> Iterator[str]:
+        """Count a request to ``endpoint`` as in flight for the duration of the ``with`` block."""
+        with self._lock:
+            self._outstanding[endpoint] += 1
+            self._requests[endpoint] += 1
+        try:
+            yield endpoint
+        finally:
+            with self._lock:
+                self._outstanding[endpoint] -= 1
+
+    def mark_down(self, endpoint: str):
+        """Skip ``endpoint`` for ``retry_after`` seconds (or until a health probe succeeds)."""
+        with self._lock:
+            self._down_until[endpoint] = time.monotonic() + self.retry_after
+            self._failures[endpoint] += 1
+
+    def mark_up(self, endpoint: str):
+        with self._lock:
+            self._down_until[endpoint] = 0.0
+
+    def check_health(self):
+        """Probe every endpoint's ``/models`` route once and update its state."""
+        for endpoint in self.endpoints:
+            try:
+                healthy = requests.get(f"{endpoint}/models", timeout=self.health_timeout).status_code < 500
+            except requests.RequestException:
+                healthy = False
+            if healthy:
+                self.mark_up(endpoint)
+            else:
+                with self._lock:
+                    self._down_until[endpoint] = time.monotonic() + self.retry_after
+                logger.warning(f"Endpoint {endpoint} failed its health check")
+
+    def _run(self, interval: float):
+        while not self._stopped.wait(interval):
+            try:
+                self.check_health()
+            except Exception as e:
+                logger.error(f"Health check failed: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Return per-endpoint load, request and failure counters."""
+        now = time.monotonic()
+        with self._lock:
+            return {
+                e: {
+                    "healthy": self._down_until[e] <= now,
+                    "outstanding": self._outstanding[e],
+                    "requests": self._requests[e],
+                    "failures": self._failures[e],
+                }
+                for e in self.endpoints
+            }
+
+    def close(self):
+        """Stop the health-check thread."""
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
@@ -1,13 +1,20 @@
 from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import Optional, Union, List, Dict, Any, Generator
+from typing import Optional, Union, List, Dict, Any, Generator, Iterable
+from contextlib import nullcontext
 import json
+import time
 import torch
 import numpy as np
 import gc
 import logging
 from huggingface_hub import hf_hub_download
 from vieneu_utils.normalize_text import VietnameseTTSNormalizer
+from vieneu_utils.phonemize_text import phonemize_with_dict
+from vieneu_utils.core_utils import format_codes_str, format_prompt_prefix
+from .cache import ReferenceCodeCache, AudioCache
+from .metrics import MetricsRegistry
+from .voice import PreparedVoice
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -19,16 +26,34 @@ class BaseVieneuTTS(ABC):
     Provides shared functionality for voice management and common operations.
     """
 
+    _no_speech_tokens_message = "No valid speech tokens found in the output."
+    # Whether _seeded_sampling makes a generation reproducible; the audio cache needs it
+    _supports_seeded_sampling = False
+
     def __init__(self):
         self.sample_rate = 24_000
         self.max_context = 2048
         self.hop_length = 480
+        # Sequences decoded in one batched codec call may differ in length by at most this many
+        # frames. 0 batches only equal lengths, which decode exactly as they would one by one.
+        self.decode_batch_max_pad_frames = 0
 
         self.assets_dir = Path(__file__).parent / "assets"
         self._preset_voices: Dict[str, Any] = {}
         self._default_voice: Optional[str] = None
         self.normalizer = VietnameseTTSNormalizer()
 
+        # Encoded reference codes, keyed by file content/mtime/codec (memory-only by default)
+        self.codec_repo: Optional[str] = None
+        self.ref_code_cache: Optional[ReferenceCodeCache] = ReferenceCodeCache()
+
+        # Synthesized audio for repeated phrases (opt-in, see set_audio_cache)
+        self.model_id: Optional[str] = None
+        self.audio_cache: Optional[AudioCache] = None
+
+        # Per-stage latency metrics (opt-in, see set_metrics)
+        self.metrics: Optional[MetricsRegistry] = None
+
         # Watermarker placeholder
         self.watermarker = None
         self._init_watermarker()
@@ -167,9 +192,136 @@ class BaseVieneuTTS(ABC):
         import soundfile as sf
         sf.write(str(output_path), audio, self.sample_rate)
 
+    def set_reference_cache(self, cache: Optional[ReferenceCodeCache]):
+        """
+        Replace the reference code cache (e.g. with a disk-backed one), or disable it with None.
+
+        Args:
+            cache: ReferenceCodeCache instance or None.
+        """
+        self.ref_code_cache = cache
+
+    def set_metrics(self, metrics: Optional[MetricsRegistry]):
+        """
+        Record per-stage pipeline latencies into ``metrics``, or stop recording with None.
+
+        Args:
+            metrics: MetricsRegistry instance or None.
+        """
+        self.metrics = metrics
+
+    def _stage(self, name: str):
+        """Context manager timing pipeline stage ``name`` when metrics are enabled."""
+        if self.metrics is None:
+            return nullcontext()
+        return self.metrics.stage(name)
+
+    def _timed_generation(self, items: Iterable[Any], prompt_eval_offset: float = 0.0) -> Generator[Any, None, None]:
+        """
+        Pass through a streaming backbone iterator, recording the wait for the first
+        item as prompt evaluation and the remaining waits as token generation.
+
+        Args:
+            items: Streaming backbone output.
+            prompt_eval_offset: Seconds of prompt evaluation already spent before the
+                iterator started (e.g. a voice prefix evaluated separately), added to the
+                single prompt_eval observation.
+        """
+        if self.metrics is None:
+            yield from items
+            return
+
+        n_items = 0
+        gen_time = 0.0
+        iterator = iter(items)
+        try:
+            while True:
+                start = time.perf_counter()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    break
+                elapsed = time.perf_counter() - start
+                if n_items == 0:
+                    self.metrics.observe("prompt_eval", prompt_eval_offset + elapsed)
+                else:
+                    gen_time += elapsed
+                n_items += 1
+                yield item
+        finally:
+            if n_items > 1:
+                self.metrics.observe_generation(n_items - 1, gen_time)
+
+    @staticmethod
+    def _is_cancelled(cancel_event: Optional[Any]) -> bool:
+        """True once the caller's cancel token (anything with ``is_set()``, e.g. threading.Event) is set."""
+        return cancel_event is not None and cancel_event.is_set()
+
+    def _normalize_text(self, text: str) -> str:
+        with self._stage("normalize"):
+            return self.normalizer.normalize(text)
+
+    def set_audio_cache(self, cache: Optional[AudioCache]):
+        """
+        Enable the synthesized-audio cache used by ``infer``, or disable it with None.
+
+        Backends that cannot seed their sampler keep the cache disabled, since their
+        cached entries would not match what a fresh generation produces.
+
+        Args:
+            cache: AudioCache instance or None.
+        """
+        if cache is not None and not self._supports_seeded_sampling:
+            logger.warning(f"{type(self).__name__} cannot seed its sampler; the audio cache stays disabled")
+            cache = None
+        self.audio_cache = cache
+
+    def _model_identity(self) -> str:
+        """Everything about the loaded model that changes the synthesized audio."""
+        return "|".join([
+            self.model_id or "",
+            self.codec_repo or "",
+            getattr(self, "prompt_layout", "default"),
+            getattr(self, "_current_lora_repo", None) or "",
+        ])
+
+    def _audio_cache_key(self, text: str, voice_id: str, temperature: float, top_k: int, **params: Any) -> Optional[str]:
+        """Return the audio cache key for a request, or None when the cache is disabled."""
+        if self.audio_cache is None:
+            return None
+        return self.audio_cache.make_key(text, voice_id, self._model_identity(), temperature, top_k, **params)
+
+    def lookup_cached_audio(self, text: str, ref_audio: Optional[Union[str, Path]] = None, ref_codes: Optional[Union[np.ndarray, torch.Tensor]] = None, ref_text: Optional[str] = None, max_chars: int = 256, silence_p: float = 0.15, crossfade_p: float = 0.0, voice: Optional[Union[Dict[str, Any], PreparedVoice]] = None, temperature: float = 1.0, top_k: int = 50, skip_normalize: bool = False) -> Optional[np.ndarray]:
+        """
+        Return the cached result of ``infer`` with the same arguments, without running the backbone.
+
+        Lets callers answer repeated phrases before waiting for an inference slot.
+
+        Returns:
+            np.ndarray | None: Cached audio, or None on a miss or when the cache is disabled.
+        """
+        if self.audio_cache is None:
+            return None
+        if isinstance(voice, PreparedVoice):
+            voice_id = voice.identity
+        else:
+            voice_id = AudioCache.voice_identity(*self._resolve_ref_voice(voice, ref_audio, ref_codes, ref_text))
+        if not skip_normalize:
+            text = self._normalize_text(text)
+        key = self._audio_cache_key(text, voice_id, temperature, top_k, max_chars=max_chars, silence_p=silence_p, crossfade_p=crossfade_p)
+        cached = self.audio_cache.get(key)
+        return cached.copy() if cached is not None else None
+
+    def _seeded_sampling(self, seed: Optional[int]):
+        """
+        Context manager seeding the backbone sampler for one generation so a cached entry is
+        reproducible; generations outside the block stay random. No-op by default.
+        """
+        return nullcontext()
+
     def encode_reference(self, ref_audio_path: Union[str, Path]) -> torch.Tensor:
         """
-        Encode reference audio to codes.
+        Encode reference audio to codes, reusing cached codes when available.
 
         Args:
             ref_audio_path: Path to the reference audio file.
@@ -177,11 +329,25 @@ class BaseVieneuTTS(ABC):
         Returns:
             torch.Tensor: Encoded codes.
         """
+        cache = self.ref_code_cache
+        if cache is None:
+            return self._encode_reference_audio(ref_audio_path)
+
+        key = cache.make_key(ref_audio_path, self.codec_repo)
+        ref_codes = cache.get(key)
+        if ref_codes is None:
+            ref_codes = self._encode_reference_audio(ref_audio_path)
+            cache.put(key, ref_codes)
+        return ref_codes
+
+    def _encode_reference_audio(self, ref_audio_path: Union[str, Path]) -> torch.Tensor:
+        """Run the codec encoder on a reference audio file."""
         import librosa
-        wav, _ = librosa.load(ref_audio_path, sr=16000, mono=True)
-        wav_tensor = torch.from_numpy(wav).float().unsqueeze(0).unsqueeze(0)  # [1, 1, T]
-        with torch.no_grad():
-            ref_codes = self.codec.encode_code(audio_or_path=wav_tensor).squeeze(0).squeeze(0)
+        with self._stage("reference_encode"):
+            wav, _ = librosa.load(ref_audio_path, sr=16000, mono=True)
+            wav_tensor = torch.from_numpy(wav).float().unsqueeze(0).unsqueeze(0)  # [1, 1, T]
+            with torch.no_grad():
+                ref_codes = self.codec.encode_code(audio_or_path=wav_tensor).squeeze(0).squeeze(0)
         return ref_codes
 
     def _decode(self, codes_str: str) -> np.ndarray:
@@ -195,33 +361,99 @@ class BaseVieneuTTS(ABC):
             np.ndarray: Decoded audio waveform.
         """
         from .utils import extract_speech_ids
-        speech_ids = extract_speech_ids(codes_str)
+        return self._decode_ids(extract_speech_ids(codes_str))
 
-        if len(speech_ids) == 0:
-            raise ValueError("No valid speech tokens found in the output.")
+    def _decode_ids(self, speech_ids: Union[np.ndarray, List[int]]) -> np.ndarray:
+        """
+        Decode integer speech token ids to audio waveform.
 
-        # Onnx decode
-        if getattr(self, "_is_onnx_codec", False):
-            codes = np.array(speech_ids, dtype=np.int32)[np.newaxis, np.newaxis, :]
-            recon = self.codec.decode_code(codes)
-        # Torch decode
-        else:
-            with torch.no_grad():
-                codes = torch.tensor(speech_ids, dtype=torch.long)[None, None, :].to(
-                    self.codec.device
-                )
-                recon = self.codec.decode_code(codes).cpu().numpy()
+        Args:
+            speech_ids: 1-D sequence of speech token ids.
+
+        Returns:
+            np.ndarray: Decoded audio waveform.
+        """
+        if len(speech_ids) == 0:
+            raise ValueError(self._no_speech_tokens_message)
+
+        with self._stage("codec_decode"):
+            # Onnx decode
+            if getattr(self, "_is_onnx_codec", False):
+                codes = np.asarray(speech_ids, dtype=np.int32)[np.newaxis, np.newaxis, :]
+                recon = self.codec.decode_code(codes)
+            # Torch decode
+            else:
+                with torch.no_grad():
+                    codes = torch.as_tensor(np.asarray(speech_ids), dtype=torch.long)[None, None, :].to(
+                        self.codec.device
+                    )
+                    recon = self.codec.decode_code(codes).cpu().numpy()
 
         return recon[0, 0, :]
 
+    def _decode_batch(self, id_seqs: List[Union[np.ndarray, List[int]]]) -> List[np.ndarray]:
+        """
+        Decode several speech-id sequences with as few codec calls as fidelity allows.
+
+        Sequences are sorted by length and bucketed so that no member is more than
+        ``decode_batch_max_pad_frames`` shorter than the longest. Each bucket is right-padded
+        (repeating its last frame) into one ``[B, 1, T]`` input, decoded in a single
+        ``decode_code`` call and trimmed back to each sequence's true length; a bucket of
+        one is decoded on its own.
+
+        The codec decoder is non-causal and normalizes over time, so pad frames change the
+        whole waveform of a shorter member, not just its tail. With the default spread of 0
+        only equal-length sequences share a call, and the result matches ``_decode`` one by
+        one; a larger spread trades that exactness for fewer codec calls.
+
+        Args:
+            id_seqs: 1-D speech-id sequences.
+
+        Returns:
+            List[np.ndarray]: One waveform per sequence, in input order.
+        """
+        id_seqs = [np.asarray(ids, dtype=np.int64).reshape(-1) for ids in id_seqs]
+        if any(ids.size == 0 for ids in id_seqs):
+            raise ValueError(self._no_speech_tokens_message)
+
+        wavs: List[Optional[np.ndarray]] = [None] * len(id_seqs)
+        buckets: List[List[int]] = []
+        for i in sorted(range(len(id_seqs)), key=lambda i: id_seqs[i].size):
+            if buckets and id_seqs[i].size - id_seqs[buckets[-1][0]].size <= self.decode_batch_max_pad_frames:
+                buckets[-1].append(i)
+            else:
+                buckets.append([i])
+
+        for bucket in buckets:
+            if len(bucket) == 1:
+                wavs[bucket[0]] = self._decode_ids(id_seqs[bucket[0]])
+                continue
+
+            n_frames = id_seqs[bucket[-1]].size
+            padded = np.stack([np.pad(id_seqs[i], (0, n_frames - id_seqs[i].size), mode="edge") for i in bucket])
+            with self._stage("codec_decode"):
+                if getattr(self, "_is_onnx_codec", False):
+                    recon = self.codec.decode_code(padded.astype(np.int32)[:, np.newaxis, :])
+                else:
+                    with torch.no_grad():
+                        codes = torch.from_numpy(padded)[:, None, :].to(self.codec.device)
+                        recon = self.codec.decode_code(codes).cpu().numpy()
+
+            samples_per_frame = recon.shape[-1] // n_frames
+            for row, i in enumerate(bucket):
+                wavs[i] = recon[row, 0, : id_seqs[i].size * samples_per_frame].copy()
+        return wavs
+
     def _resolve_ref_voice(
         self,
-        voice: Optional[Dict[str, Any]] = None,
+        voice: Optional[Union[Dict[str, Any], PreparedVoice]] = None,
         ref_audio: Optional[Union[str, Path]] = None,
         ref_codes: Optional[Union[np.ndarray, torch.Tensor]] = None,
         ref_text: Optional[str] = None
     ) -> tuple[Union[np.ndarray, torch.Tensor], str]:
         """Resolve reference voice codes and text."""
+        if isinstance(voice, PreparedVoice):
+            return list(voice.codes), voice.text
         if voice is not None:
             ref_codes = voice.get('codes', ref_codes)
             ref_text = voice.get('text', ref_text)
@@ -241,10 +473,52 @@ class BaseVieneuTTS(ABC):
 
         return ref_codes, ref_text
 
+    def prepare_voice(
+        self,
+        voice: Optional[Union[Dict[str, Any], PreparedVoice]] = None,
+        ref_audio: Optional[Union[str, Path]] = None,
+        ref_codes: Optional[Union[np.ndarray, torch.Tensor, List[int]]] = None,
+        ref_text: Optional[str] = None,
+    ) -> PreparedVoice:
+        """
+        Precompute everything voice-specific that each chunk's prompt needs.
+
+        Accepts the same voice arguments as ``infer`` (a preset dict, reference audio, or
+        codes plus transcript). The result can be passed as ``voice=`` to every inference
+        call of this model. A handle prepared for another model or prompt layout is rebuilt.
+
+        Returns:
+            PreparedVoice: Immutable voice handle.
+        """
+        layout = getattr(self, "prompt_layout", "default")
+        if isinstance(voice, PreparedVoice) and voice.layout == layout and voice.model_id == self._model_identity():
+            return voice
+
+        ref_codes, ref_text = self._resolve_ref_voice(voice, ref_audio, ref_codes, ref_text)
+        if isinstance(ref_codes, (torch.Tensor, np.ndarray)):
+            codes = tuple(ref_codes.flatten().tolist())
+        else:
+            codes = tuple(int(c) for c in ref_codes)
+
+        with self._stage("phonemize"):
+            phones = phonemize_with_dict(ref_text)
+        codes_str = format_codes_str(codes)
+        return PreparedVoice(
+            codes=codes,
+            text=ref_text,
+            phones=phones,
+            codes_str=codes_str,
+            layout=layout,
+            prompt_prefix=format_prompt_prefix(phones, codes_str, layout),
+            identity=AudioCache.voice_identity(codes, ref_text),
+            model_id=self._model_identity(),
+        )
+
     def _apply_watermark(self, wav: np.ndarray) -> np.ndarray:
         """Apply watermark to audio if enabled."""
         if self.watermarker:
-            return self.watermarker.apply_watermark(wav, sample_rate=self.sample_rate)
+            with self._stage("watermark"):
+                return self.watermarker.apply_watermark(wav, sample_rate=self.sample_rate)
         return wav
 
     @abstractmethod
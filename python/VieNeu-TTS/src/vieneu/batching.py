@@ -0,0 +1,122 @@
+import queue
+import threading
+import time
+import logging
+from concurrent.futures import Future
+from typing import Callable, List, Tuple, Dict, Any
+
+logger = logging.getLogger("Vieneu.Batching")
+
+# (prompt_ids, temperature, top_k, future)
+_Request = Tuple[List[int], float, int, Future]
+
+
+class MicroBatcher:
+    """
+    Collects generation requests from concurrent callers into batched backbone calls.
+
+    A single background thread waits for the first request, keeps accepting more for
+    up to ``max_wait_ms`` (or until ``max_batch_size`` are queued), then runs one
+    ``generate_fn`` call per group of requests sharing the same sampling parameters.
+    Callers receive their own output through a ``concurrent.futures.Future``.
+    """
+
+    def __init__(
+        self,
+        generate_fn: Callable[[List[List[int]], float, int], List[str]],
+        max_batch_size: int = 8,
+        max_wait_ms: float = 15.0,
+    ):
+        """
+        Args:
+            generate_fn: ``(prompts, temperature, top_k) -> outputs``, one output per prompt.
+            max_batch_size: Maximum number of prompts per ``generate_fn`` call.
+            max_wait_ms: Collection window opened by the first queued request.
+        """
+        self.generate_fn = generate_fn
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self._queue: "queue.Queue[_Request]" = queue.Queue()
+        self._stopped = threading.Event()
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.requests = 0
+        self._thread = threading.Thread(target=self._run, name="vieneu-microbatcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, prompt_ids: List[int], temperature: float = 1.0, top_k: int = 50) -> Future:
+        """Queue one prompt for generation and return a future for its output string."""
+        if self._stopped.is_set():
+            raise RuntimeError("MicroBatcher is closed")
+        future: Future = Future()
+        self._queue.put((list(prompt_ids), temperature, top_k, future))
+        return future
+
+    def _collect(self) -> List[_Request]:
+        try:
+            first = self._queue.get(timeout=0.1)
+        except queue.Empty:
+            return []
+
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while not self._stopped.is_set():
+            batch = self._collect()
+            if not batch:
+                continue
+
+            # generate() takes one set of sampling parameters per call
+            groups: Dict[Tuple[float, int], List[_Request]] = {}
+            for req in batch:
+                groups.setdefault((req[1], req[2]), []).append(req)
+
+            for (temperature, top_k), reqs in groups.items():
+                reqs = [r for r in reqs if r[3].set_running_or_notify_cancel()]
+                if not reqs:
+                    continue
+                try:
+                    outputs = self.generate_fn([r[0] for r in reqs], temperature, top_k)
+                except Exception as e:
+                    logger.error(f"Batched generation failed for {len(reqs)} request(s): {e}")
+                    for r in reqs:
+                        r[3].set_exception(e)
+                    continue
+
+                with self._lock:
+                    self.batches += 1
+                    self.requests += len(reqs)
+                for r, out in zip(reqs, outputs):
+                    r[3].set_result(out)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the number of batched calls and the average batch size."""
+        with self._lock:
+            return {
+                "batches": self.batches,
+                "requests": self.requests,
+                "avg_batch_size": round(self.requests / self.batches, 2) if self.batches else 0.0,
+                "pending": self._queue.qsize(),
+            }
+
+    def close(self):
+        """Stop the background thread and fail any request still queued."""
+        self._stopped.set()
+        self._thread.join(timeout=5)
+        while True:
+            try:
+                req = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if req[3].set_running_or_notify_cancel():
+                req[3].set_exception(RuntimeError("MicroBatcher is closed"))
@@ -0,0 +1,427 @@
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, Union, Dict, Any, Tuple, List
+
+import numpy as np
+import torch
+
+logger = logging.getLogger("Vieneu.Cache")
+
+
+def _file_digest(path: Path, chunk_size: int = 1 << 20) -> str:
+    """Compute the SHA-256 digest of a file's content."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+class ReferenceCodeCache:
+    """
+    Cache for encoded reference audio codes.
+
+    Entries are keyed by the reference file's content hash, its mtime and the
+    codec repo that produced the codes. A bounded LRU is kept in memory and,
+    when ``cache_dir`` is set, every new entry is written through to disk so
+    that a restarted process can skip codec encoding as well.
+    """
+
+    def __init__(self, cache_dir: Optional[Union[str, Path]] = None, max_entries: int = 64):
+        """
+        Args:
+            cache_dir: Directory of the on-disk store. ``None`` keeps the cache in memory only.
+            max_entries: Maximum number of entries held in memory.
+        """
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.max_entries = max(1, int(max_entries))
+        self._entries: "OrderedDict[str, torch.Tensor]" = OrderedDict()
+        # (resolved path, size, mtime_ns) -> content digest, so unchanged files are hashed once
+        self._digests: Dict[Tuple[str, int, int], str] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        if self.cache_dir is not None:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def make_key(self, ref_audio_path: Union[str, Path], codec_repo: Optional[str]) -> str:
+        """
+        Build the cache key for a reference audio file.
+
+        Args:
+            ref_audio_path: Path to the reference audio file.
+            codec_repo: Codec repository used for encoding.
+
+        Returns:
+            str: Hex key combining content hash, mtime and codec repo.
+        """
+        path = Path(ref_audio_path).resolve()
+        st = path.stat()
+        stat_key = (str(path), st.st_size, st.st_mtime_ns)
+
+        with self._lock:
+            digest = self._digests.get(stat_key)
+        if digest is None:
+            digest = _file_digest(path)
+            with self._lock:
+                if len(self._digests) >= self.max_entries * 4:
+                    self._digests.clear()
+                self._digests[stat_key] = digest
+
+        raw = f"{digest}:{st.st_mtime_ns}:{codec_repo or ''}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _disk_path(self, key: str) -> Optional[Path]:
+        if self.cache_dir is None:
+            return None
+        return self.cache_dir / f"{key}.pt"
+
+    def get(self, key: str) -> Optional[torch.Tensor]:
+        """Return cached codes for ``key``, promoting disk entries into memory."""
+        with self._lock:
+            codes = self._entries.get(key)
+            if codes is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return codes
+
+        disk_path = self._disk_path(key)
+        if disk_path is not None and disk_path.exists():
+            try:
+                codes = torch.load(disk_path, map_location="cpu", weights_only=True)
+            except Exception as e:
+                logger.warning(f"Discarding unreadable reference cache entry {disk_path.name}: {e}")
+                codes = None
+            if codes is not None:
+                with self._lock:
+                    self.disk_hits += 1
+                    self._insert(key, codes)
+                return codes
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, codes: torch.Tensor):
+        """Store codes in memory and write them through to the disk store."""
+        codes = codes.detach().cpu()
+        with self._lock:
+            self._insert(key, codes)
+
+        disk_path = self._disk_path(key)
+        if disk_path is not None:
+            tmp_path = disk_path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            try:
+                torch.save(codes, tmp_path)
+                os.replace(tmp_path, disk_path)
+            except Exception as e:
+                logger.warning(f"Could not persist reference cache entry: {e}")
+                tmp_path.unlink(missing_ok=True)
+
+    def _insert(self, key: str, codes: torch.Tensor):
+        self._entries[key] = codes
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self, disk: bool = False):
+        """Drop in-memory entries, and on-disk entries too if ``disk`` is set."""
+        with self._lock:
+            self._entries.clear()
+            self._digests.clear()
+        if disk and self.cache_dir is not None:
+            for p in self.cache_dir.glob("*.pt"):
+                p.unlink(missing_ok=True)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and current size."""
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": round((self.hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+                "cache_dir": str(self.cache_dir) if self.cache_dir else None,
+            }
+
+
+class PrefixStateCache:
+    """
+    Bounded LRU of backbone context snapshots taken right after a shared prompt prefix.
+
+    Used by the GGUF backend to restore the llama.cpp KV state for a voice instead of
+    re-evaluating the voice-specific prompt head on every chunk.
+    """
+
+    def __init__(self, max_entries: int = 4):
+        """
+        Args:
+            max_entries: Maximum number of snapshots to keep. Each one holds a copy of the KV cache.
+        """
+        self.max_entries = max(1, int(max_entries))
+        self._entries: "OrderedDict[str, Tuple[List[int], Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(model_id: Optional[str], layout: str, prefix: str) -> str:
+        """Build a key from the model, prompt layout and voice-specific prefix text."""
+        raw = f"{model_id or ''}\x00{layout}\x00{prefix}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Tuple[List[int], Any]]:
+        """Return ``(prefix_tokens, state)`` for ``key`` or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: str, tokens: List[int], state: Any):
+        """Store a snapshot taken after evaluating ``tokens``."""
+        with self._lock:
+            self._entries[key] = (list(tokens), state)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and current size."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+class AudioCache:
+    """
+    Content-addressed cache of synthesized audio.
+
+    Entries are keyed by the normalized text, the voice identity, the model and the
+    sampling parameters (including a fixed seed), and hold the final float32 PCM.
+    The in-memory LRU is bounded by total bytes; when ``cache_dir`` is set, entries
+    are also written to disk so frequently repeated phrases survive restarts. The
+    disk store is an LRU of its own, bounded by total file size.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Optional[Union[str, Path]] = None,
+        max_bytes: int = 64 * 1024 * 1024,
+        seed: int = 0,
+        max_disk_bytes: int = 512 * 1024 * 1024,
+    ):
+        """
+        Args:
+            cache_dir: Directory of the on-disk store. ``None`` keeps the cache in memory only.
+            max_bytes: Maximum total size of the PCM held in memory.
+            seed: Sampling seed used to synthesize entries on a miss; part of every key.
+            max_disk_bytes: Maximum total size of the files in ``cache_dir``. The least
+                recently used files are deleted first.
+        """
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.max_bytes = max(1, int(max_bytes))
+        self.max_disk_bytes = max(1, int(max_disk_bytes))
+        self.seed = int(seed)
+        self._entries: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._bytes = 0
+        # key -> file size of the disk store, least recently used first
+        self._disk_entries: "OrderedDict[str, int]" = OrderedDict()
+        self._disk_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        if self.cache_dir is not None:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            self._load_disk_index()
+
+    def _load_disk_index(self):
+        """Index the files left by earlier runs, ordered by last use (mtime, refreshed on hits)."""
+        files = []
+        for p in self.cache_dir.glob("*.npy"):
+            try:
+                st = p.stat()
+            except OSError:
+                continue
+            files.append((st.st_mtime_ns, p.stem, st.st_size))
+        for _, key, size in sorted(files):
+            self._disk_entries[key] = size
+            self._disk_bytes += size
+        self._evict_disk()
+
+    def _evict_disk(self):
+        """Delete least recently used files until the disk store fits. Called with the lock held."""
+        while self._disk_bytes > self.max_disk_bytes and self._disk_entries:
+            key, size = self._disk_entries.popitem(last=False)
+            self._disk_bytes -= size
+            self._disk_path(key).unlink(missing_ok=True)
+
+    def _touch_disk(self, key: str, disk_path: Path):
+        """Mark a disk entry as recently used, in the index and on the file itself."""
+        with self._lock:
+            if key in self._disk_entries:
+                self._disk_entries.move_to_end(key)
+        try:
+            os.utime(disk_path)
+        except OSError:
+            pass
+
+    def make_key(
+        self,
+        text: str,
+        voice_id: str,
+        model_id: Optional[str],
+        temperature: float,
+        top_k: int,
+        **params: Any,
+    ) -> str:
+        """
+        Build the cache key for one synthesis request.
+
+        Args:
+            text: Normalized input text.
+            voice_id: Identity of the reference voice (see ``voice_identity``).
+            model_id: Backbone/codec identity.
+            temperature: Sampling temperature.
+            top_k: Sampling top-k.
+            **params: Any other option that changes the output (chunking, silence, ...).
+
+        Returns:
+            str: Hex key.
+        """
+        extra = ",".join(f"{k}={params[k]}" for k in sorted(params))
+        raw = f"{text}\x00{voice_id}\x00{model_id or ''}\x00{float(temperature)}:{int(top_k)}:{self.seed}\x00{extra}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def voice_identity(ref_codes: Any, ref_text: Optional[str]) -> str:
+        """Hash the reference codes and transcript that define a cloned voice."""
+        if isinstance(ref_codes, torch.Tensor):
+            ref_codes = ref_codes.detach().cpu().numpy()
+        codes = np.asarray(ref_codes, dtype=np.int64).ravel()
+        h = hashlib.sha256(codes.tobytes())
+        h.update((ref_text or "").encode("utf-8"))
+        return h.hexdigest()
+
+    def _disk_path(self, key: str) -> Optional[Path]:
+        if self.cache_dir is None:
+            return None
+        return self.cache_dir / f"{key}.npy"
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        """Return cached audio for ``key``, promoting disk entries into memory."""
+        with self._lock:
+            audio = self._entries.get(key)
+            if audio is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return audio
+
+        disk_path = self._disk_path(key)
+        if disk_path is not None and disk_path.exists():
+            try:
+                audio = np.load(disk_path, allow_pickle=False)
+            except Exception as e:
+                logger.warning(f"Discarding unreadable audio cache entry {disk_path.name}: {e}")
+                audio = None
+            if audio is not None:
+                audio.setflags(write=False)
+                self._touch_disk(key, disk_path)
+                with self._lock:
+                    self.disk_hits += 1
+                    self._insert(key, audio)
+                return audio
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, audio: np.ndarray):
+        """Store audio in memory and write it through to the disk store."""
+        audio = np.array(audio, dtype=np.float32, copy=True)
+        audio.setflags(write=False)
+        with self._lock:
+            self._insert(key, audio)
+
+        disk_path = self._disk_path(key)
+        if disk_path is not None:
+            tmp_path = disk_path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            try:
+                with open(tmp_path, "wb") as f:
+                    np.save(f, audio, allow_pickle=False)
+                os.replace(tmp_path, disk_path)
+                size = disk_path.stat().st_size
+            except Exception as e:
+                logger.warning(f"Could not persist audio cache entry: {e}")
+                tmp_path.unlink(missing_ok=True)
+                return
+            with self._lock:
+                self._disk_bytes += size - self._disk_entries.pop(key, 0)
+                self._disk_entries[key] = size
+                self._evict_disk()
+
+    def _insert(self, key: str, audio: np.ndarray):
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= old.nbytes
+        if audio.nbytes > self.max_bytes:
+            return
+        self._entries[key] = audio
+        self._bytes += audio.nbytes
+        while self._bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= evicted.nbytes
+
+    def clear(self, disk: bool = False):
+        """Drop in-memory entries, and on-disk entries too if ``disk`` is set."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            if disk:
+                self._disk_entries.clear()
+                self._disk_bytes = 0
+        if disk and self.cache_dir is not None:
+            for p in self.cache_dir.glob("*.npy"):
+                p.unlink(missing_ok=True)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and current size."""
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "disk_entries": len(self._disk_entries),
+                "disk_bytes": self._disk_bytes,
+                "max_disk_bytes": self.max_disk_bytes,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": round((self.hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+                "cache_dir": str(self.cache_dir) if self.cache_dir else None,
+            }
@@ -3,12 +3,14 @@ from typing import Optional, Union, List, Generator, Any, Dict
 import numpy as np
 import torch
 import gc
+import time
 import logging
 from collections import defaultdict
 from .base import BaseVieneuTTS
-from .utils import _compile_codec_with_triton, extract_speech_ids, _linear_overlap_add
+from .voice import PreparedVoice
+from .utils import _compile_codec_with_triton, extract_speech_ids, StreamingOverlapAdd, SpeechTokenBuffer
 from vieneu_utils.phonemize_text import phonemize_with_dict
-from vieneu_utils.core_utils import split_text_into_chunks, join_audio_chunks
+from vieneu_utils.core_utils import split_text_into_chunks, join_audio_chunks, format_prompt, PROMPT_LAYOUTS
 from neucodec import NeuCodec, DistillNeuCodec
 
 logger = logging.getLogger("Vieneu.Fast")
@@ -18,6 +20,13 @@ class FastVieNeuTTS(BaseVieneuTTS):
     GPU-optimized VieNeu-TTS using LMDeploy TurbomindEngine.
     """
 
+    _no_speech_tokens_message = (
+        "No valid speech tokens found in the output. "
+        "Lỗi này có thể do GPU của bạn không hỗ trợ định dạng bfloat16 (ví dụ: dòng T4, RTX 20-series) "
+        "dẫn đến sai số khi tính toán. Bạn hãy thử chuyển sang dùng phiên bản VieNeu-TTS-0.3B nếu vẫn muốn dùng LmDeploy hoặc "
+        "bỏ chọn 'LMDeploy' trong Tùy chọn nâng cao. Nếu vẫn gặp lỗi này, hãy thông báo với chúng tôi tại: https://discord.com/invite/yJt8kzjzWZ"
+    )
+
     def __init__(
         self,
         backbone_repo: str = "pnnbao-ump/VieNeu-TTS",
@@ -31,8 +40,16 @@ class FastVieNeuTTS(BaseVieneuTTS):
         enable_triton: bool = True,
         max_batch_size: int = 4,
         hf_token: Optional[str] = None,
+        prompt_layout: str = "default",
+        stream_prefetch: int = 0,
     ):
         super().__init__()
+        self.codec_repo = codec_repo
+        self.model_id = backbone_repo
+
+        if prompt_layout not in PROMPT_LAYOUTS:
+            raise ValueError(f"Unsupported prompt layout: {prompt_layout}. Choose from {PROMPT_LAYOUTS}")
+        self.prompt_layout = prompt_layout
 
         if backbone_device != "cuda" and not backbone_device.startswith("cuda:"):
             raise ValueError("LMDeploy backend requires CUDA device")
@@ -45,6 +62,8 @@ class FastVieNeuTTS(BaseVieneuTTS):
         self.streaming_stride_samples = self.streaming_frames_per_chunk * self.hop_length
 
         self.max_batch_size = max_batch_size
+        # Chunks generated ahead of the one being streamed (see infer_stream's prefetch)
+        self.stream_prefetch = stream_prefetch
         self._ref_cache: Dict[str, Any] = {}
         self.stored_dict = defaultdict(dict)
 
@@ -112,52 +131,33 @@ class FastVieNeuTTS(BaseVieneuTTS):
     def _warmup_model(self):
         logger.info("🔥 Warming up model...")
         try:
-            dummy_codes = list(range(10))
-            dummy_prompt = self._format_prompt(dummy_codes, "warmup", "test")
+            dummy_voice = self.prepare_voice(ref_codes=list(range(10)), ref_text="warmup")
+            dummy_prompt = self._format_prompt(dummy_voice, "test")
             _ = self.backbone([dummy_prompt], gen_config=self.gen_config, do_preprocess=False)
             logger.info("   ✅ Warmup complete")
         except Exception as e:
             logger.warning(f"   ⚠️ Warmup failed: {e}")
 
-    def _decode(self, codes_str: str) -> np.ndarray:
-        speech_ids = extract_speech_ids(codes_str)
-        if not speech_ids:
-            raise ValueError(
-                "No valid speech tokens found in the output. "
-                "Lỗi này có thể do GPU của bạn không hỗ trợ định dạng bfloat16 (ví dụ: dòng T4, RTX 20-series) "
-                "dẫn đến sai số khi tính toán. Bạn hãy thử chuyển sang dùng phiên bản VieNeu-TTS-0.3B nếu vẫn muốn dùng LmDeploy hoặc "
-                "bỏ chọn 'LMDeploy' trong Tùy chọn nâng cao. Nếu vẫn gặp lỗi này, hãy thông báo với chúng tôi tại: https://discord.com/invite/yJt8kzjzWZ"
-            )
-
-        if self._is_onnx_codec:
-            codes = np.array(speech_ids, dtype=np.int32)[np.newaxis, np.newaxis, :]
-            recon = self.codec.decode_code(codes)
-        else:
-            with torch.no_grad():
-                codes = torch.tensor(speech_ids, dtype=torch.long)[None, None, :].to(self.codec.device)
-                recon = self.codec.decode_code(codes).cpu().numpy()
-        return recon[0, 0, :]
-
-    def _format_prompt(self, ref_codes: Union[List[int], torch.Tensor, np.ndarray], ref_text: str, input_text: str) -> str:
-        if isinstance(ref_codes, (torch.Tensor, np.ndarray)):
-            ref_codes_list = ref_codes.flatten().tolist()
-        else:
-            ref_codes_list = ref_codes
-
-        ref_text_phones = phonemize_with_dict(ref_text)
-        input_text_phones = phonemize_with_dict(input_text, skip_normalize=True)
-        codes_str = "".join([f"<|speech_{idx}|>" for idx in ref_codes_list])
-        return (
-            f"user: Convert the text to speech:<|TEXT_PROMPT_START|>{ref_text_phones} {input_text_phones}"
-            f"<|TEXT_PROMPT_END|>\nassistant:<|SPEECH_GENERATION_START|>{codes_str}"
-        )
+    def _format_prompt(self, voice: PreparedVoice, input_text: str) -> str:
+        with self._stage("phonemize"):
+            input_text_phones = phonemize_with_dict(input_text, skip_normalize=True)
+        return format_prompt(voice.phones, input_text_phones, voice.codes_str, voice.layout)
+
+    def _generate(self, prompts: List[str]) -> List[Any]:
+        """Run one batched pipeline call, recording generation time and throughput."""
+        start = time.perf_counter()
+        responses = self.backbone(prompts, gen_config=self.gen_config, do_preprocess=False)
+        if self.metrics is not None:
+            n_tokens = sum(getattr(r, "generate_token_len", 0) or 0 for r in responses)
+            self.metrics.observe_generation(n_tokens, time.perf_counter() - start)
+        return responses
 
-    def infer(self, text: str, ref_audio: Optional[Union[str, Path]] = None, ref_codes: Optional[Union[np.ndarray, torch.Tensor]] = None, ref_text: Optional[str] = None, max_chars: int = 256, silence_p: float = 0.15, crossfade_p: float = 0.0, voice: Optional[Dict[str, Any]] = None, temperature: float = 1.0, top_k: int = 50, skip_normalize: bool = False) -> np.ndarray:
+    def infer(self, text: str, ref_audio: Optional[Union[str, Path]] = None, ref_codes: Optional[Union[np.ndarray, torch.Tensor]] = None, ref_text: Optional[str] = None, max_chars: int = 256, silence_p: float = 0.15, crossfade_p: float = 0.0, voice: Optional[Union[Dict[str, Any], PreparedVoice]] = None, temperature: float = 1.0, top_k: int = 50, skip_normalize: bool = False) -> np.ndarray:
 
-        ref_codes, ref_text = self._resolve_ref_voice(voice, ref_audio, ref_codes, ref_text)
+        voice = self.prepare_voice(voice, ref_audio, ref_codes, ref_text)
 
         if not skip_normalize:
-            text = self.normalizer.normalize(text)
+            text = self._normalize_text(text)
 
         self.gen_config.temperature = temperature
         self.gen_config.top_k = top_k
@@ -167,24 +167,24 @@ class FastVieNeuTTS(BaseVieneuTTS):
             return np.array([], dtype=np.float32)
 
         if len(chunks) == 1:
-            prompt = self._format_prompt(ref_codes, ref_text, chunks[0])
-            responses = self.backbone([prompt], gen_config=self.gen_config, do_preprocess=False)
+            prompt = self._format_prompt(voice, chunks[0])
+            responses = self._generate([prompt])
             wav = self._decode(responses[0].text)
             wav = self._apply_watermark(wav)
         else:
-            all_wavs = self.infer_batch(chunks, ref_codes, ref_text, voice=voice, temperature=temperature, top_k=top_k, skip_normalize=True)
+            all_wavs = self.infer_batch(chunks, voice=voice, temperature=temperature, top_k=top_k, skip_normalize=True)
             wav = join_audio_chunks(all_wavs, self.sample_rate, silence_p, crossfade_p)
 
         return wav
 
-    def infer_batch(self, texts: List[str], ref_codes: Optional[Union[np.ndarray, torch.Tensor]] = None, ref_text: Optional[str] = None, max_batch_size: Optional[int] = None, voice: Optional[Dict[str, Any]] = None, temperature: float = 1.0, top_k: int = 50, skip_normalize: bool = False) -> List[np.ndarray]:
+    def infer_batch(self, texts: List[str], ref_codes: Optional[Union[np.ndarray, torch.Tensor]] = None, ref_text: Optional[str] = None, max_batch_size: Optional[int] = None, voice: Optional[Union[Dict[str, Any], PreparedVoice]] = None, temperature: float = 1.0, top_k: int = 50, skip_normalize: bool = False) -> List[np.ndarray]:
 
         if not skip_normalize:
-            texts = [self.normalizer.normalize(t) for t in texts]
+            texts = [self._normalize_text(t) for t in texts]
 
         max_batch_size = max_batch_size or self.max_batch_size
 
-        ref_codes, ref_text = self._resolve_ref_voice(voice, None, ref_codes, ref_text)
+        voice = self.prepare_voice(voice, None, ref_codes, ref_text)
 
         self.gen_config.temperature = temperature
         self.gen_config.top_k = top_k
@@ -192,76 +192,109 @@ class FastVieNeuTTS(BaseVieneuTTS):
         all_wavs = []
         for i in range(0, len(texts), max_batch_size):
             batch_texts = texts[i : i + max_batch_size]
-            prompts = [self._format_prompt(ref_codes, ref_text, text) for text in batch_texts]
-            responses = self.backbone(prompts, gen_config=self.gen_config, do_preprocess=False)
-            batch_codes = [response.text for response in responses]
-            batch_wavs = [self._decode(codes) for codes in batch_codes]
+            prompts = [self._format_prompt(voice, text) for text in batch_texts]
+            responses = self._generate(prompts)
+            batch_wavs = self._decode_batch([extract_speech_ids(response.text) for response in responses])
             batch_wavs = [self._apply_watermark(w) for w in batch_wavs]
             all_wavs.extend(batch_wavs)
         return all_wavs
 
-    def infer_stream(self, text: str, ref_audio: Optional[Union[str, Path]] = None, ref_codes: Optional[Union[np.ndarray, torch.Tensor]] = None, ref_text: Optional[str] = None, max_chars: int = 256, voice: Optional[Dict[str, Any]] = None, temperature: float = 1.0, top_k: int = 50, skip_normalize: bool = False) -> Generator[np.ndarray, None, None]:
+    def infer_stream(self, text: str, ref_audio: Optional[Union[str, Path]] = None, ref_codes: Optional[Union[np.ndarray, torch.Tensor]] = None, ref_text: Optional[str] = None, max_chars: int = 256, voice: Optional[Union[Dict[str, Any], PreparedVoice]] = None, temperature: float = 1.0, top_k: int = 50, skip_normalize: bool = False, cancel_event: Optional[Any] = None, prefetch: Optional[int] = None) -> Generator[np.ndarray, None, None]:
 
-        ref_codes, ref_text = self._resolve_ref_voice(voice, ref_audio, ref_codes, ref_text)
+        voice = self.prepare_voice(voice, ref_audio, ref_codes, ref_text)
 
         if not skip_normalize:
-            text = self.normalizer.normalize(text)
+            text = self._normalize_text(text)
 
         self.gen_config.temperature = temperature
         self.gen_config.top_k = top_k
 
         chunks = split_text_into_chunks(text, max_chars=max_chars)
+        prefetch = self.stream_prefetch if prefetch is None else prefetch
+        if prefetch > 0 and len(chunks) > 1:
+            yield from self._infer_stream_prefetch(chunks, voice, prefetch, cancel_event)
+            return
+
         for chunk in chunks:
-            yield from self._infer_stream_single(chunk, ref_codes, ref_text)
+            if self._is_cancelled(cancel_event):
+                return
+            yield from self._infer_stream_single(chunk, voice, cancel_event)
+
+    def _infer_stream_single(self, text: str, voice: PreparedVoice, cancel_event: Optional[Any] = None) -> Generator[np.ndarray, None, None]:
+        prompt = self._format_prompt(voice, text)
+        stream = _ChunkStream(voice.context_codes, self.streaming_stride_samples)
+
+        for response in self._timed_generation(self.backbone.stream_infer([prompt], gen_config=self.gen_config, do_preprocess=False)):
+            if self._is_cancelled(cancel_event):
+                return
+            stream.feed(response.text)
+            yield from self._drain_chunk_stream(stream)
+
+        yield from self._drain_chunk_stream(stream, final=True)
+
+    def _infer_stream_prefetch(self, chunks: List[str], voice: PreparedVoice, prefetch: int, cancel_event: Optional[Any] = None) -> Generator[np.ndarray, None, None]:
+        """
+        Stream ``chunks`` in order while the following ones generate in the same engine batch.
+
+        Chunks are submitted in groups of ``prefetch + 1`` (capped at ``max_batch_size``) to a
+        single ``stream_infer`` call. Responses are routed by ``response.index``: the chunk
+        being played is decoded window by window as its tokens arrive, the others only
+        collect tokens. When the played chunk finishes, the next one already has tokens
+        buffered, so its audio follows immediately.
+        """
+        group_size = max(1, min(prefetch + 1, self.max_batch_size))
+        for group_start in range(0, len(chunks), group_size):
+            if self._is_cancelled(cancel_event):
+                return
+            prompts = [self._format_prompt(voice, chunk) for chunk in chunks[group_start:group_start + group_size]]
+            streams = [_ChunkStream(voice.context_codes, self.streaming_stride_samples) for _ in prompts]
+            current = 0
+
+            for response in self._timed_generation(self.backbone.stream_infer(prompts, gen_config=self.gen_config, do_preprocess=False)):
+                if self._is_cancelled(cancel_event):
+                    return
+                stream = streams[response.index]
+                stream.feed(response.text)
+                if getattr(response, "finish_reason", None) is not None:
+                    stream.finished = True
+
+                while current < len(streams):
+                    yield from self._drain_chunk_stream(streams[current], final=streams[current].finished)
+                    if not streams[current].finished:
+                        break
+                    current += 1
+
+            for stream in streams[current:]:
+                yield from self._drain_chunk_stream(stream, final=True)
+
+    def _drain_chunk_stream(self, stream: "_ChunkStream", final: bool = False) -> Generator[np.ndarray, None, None]:
+        """Yield every audio window ``stream`` has enough tokens for; with ``final``, also the tail."""
+        tokens = stream.tokens
+        while len(tokens) - stream.n_decoded_tokens >= self.streaming_frames_per_chunk + self.streaming_lookforward:
+            n_decoded_tokens = stream.n_decoded_tokens
+            tokens_start = max(n_decoded_tokens - self.streaming_lookback - self.streaming_overlap_frames, 0)
+            tokens_end = n_decoded_tokens + self.streaming_frames_per_chunk + self.streaming_lookforward + self.streaming_overlap_frames
+            sample_start = (n_decoded_tokens - tokens_start) * self.hop_length
+            sample_end = sample_start + (self.streaming_frames_per_chunk + 2 * self.streaming_overlap_frames) * self.hop_length
+            recon = self._decode_ids(tokens.window(tokens_start, tokens_end))
+            recon = self._apply_watermark(recon)
+            recon = recon[sample_start:sample_end]
+            processed_recon = stream.ola.add(recon)
+            stream.n_decoded_tokens += self.streaming_frames_per_chunk
+            tokens.discard_before(stream.n_decoded_tokens - self.streaming_lookback - self.streaming_overlap_frames)
+            yield processed_recon
 
-    def _infer_stream_single(self, text: str, ref_codes: Union[np.ndarray, torch.Tensor, List[int]], ref_text: str) -> Generator[np.ndarray, None, None]:
-        if isinstance(ref_codes, (torch.Tensor, np.ndarray)):
-            ref_codes_list = ref_codes.flatten().tolist()
-        else:
-            ref_codes_list = ref_codes
-
-        prompt = self._format_prompt(ref_codes_list, ref_text, text)
-        audio_cache = []
-        token_cache = [f"<|speech_{idx}|>" for idx in ref_codes_list]
-        n_decoded_samples = 0
-        n_decoded_tokens = len(ref_codes_list)
-
-        for response in self.backbone.stream_infer([prompt], gen_config=self.gen_config, do_preprocess=False):
-            output_str = response.text
-            new_tokens = output_str[len("".join(token_cache[len(ref_codes_list):])):] if len(token_cache) > len(ref_codes_list) else output_str
-            if new_tokens:
-                token_cache.append(new_tokens)
-
-            if len(token_cache[n_decoded_tokens:]) >= self.streaming_frames_per_chunk + self.streaming_lookforward:
-                tokens_start = max(n_decoded_tokens - self.streaming_lookback - self.streaming_overlap_frames, 0)
-                tokens_end = n_decoded_tokens + self.streaming_frames_per_chunk + self.streaming_lookforward + self.streaming_overlap_frames
-                sample_start = (n_decoded_tokens - tokens_start) * self.hop_length
-                sample_end = sample_start + (self.streaming_frames_per_chunk + 2 * self.streaming_overlap_frames) * self.hop_length
-                curr_codes = token_cache[tokens_start:tokens_end]
-                recon = self._decode("".join(curr_codes))
-                recon = self._apply_watermark(recon)
-                recon = recon[sample_start:sample_end]
-                audio_cache.append(recon)
-
-                processed_recon = _linear_overlap_add(audio_cache, stride=self.streaming_stride_samples)
-                new_samples_end = len(audio_cache) * self.streaming_stride_samples
-                processed_recon = processed_recon[n_decoded_samples:new_samples_end]
-                n_decoded_samples = new_samples_end
-                n_decoded_tokens += self.streaming_frames_per_chunk
-                yield processed_recon
-
-        remaining_tokens = len(token_cache) - n_decoded_tokens
+        if not final or stream.flushed:
+            return
+        stream.flushed = True
+        remaining_tokens = len(tokens) - stream.n_decoded_tokens
         if remaining_tokens > 0:
-            tokens_start = max(len(token_cache) - (self.streaming_lookback + self.streaming_overlap_frames + remaining_tokens), 0)
-            sample_start = (len(token_cache) - tokens_start - remaining_tokens - self.streaming_overlap_frames) * self.hop_length
-            curr_codes = token_cache[tokens_start:]
-            recon = self._decode("".join(curr_codes))
+            tokens_start = max(len(tokens) - (self.streaming_lookback + self.streaming_overlap_frames + remaining_tokens), 0)
+            sample_start = (len(tokens) - tokens_start - remaining_tokens - self.streaming_overlap_frames) * self.hop_length
+            recon = self._decode_ids(tokens.window(tokens_start))
             recon = self._apply_watermark(recon)
             recon = recon[sample_start:]
-            audio_cache.append(recon)
-            processed_recon = _linear_overlap_add(audio_cache, stride=self.streaming_stride_samples)
-            processed_recon = processed_recon[n_decoded_samples:]
-            yield processed_recon
+            yield stream.ola.add(recon, final=True)
 
     def cleanup_memory(self):
         if torch.cuda.is_available():
@@ -276,3 +309,22 @@ class FastVieNeuTTS(BaseVieneuTTS):
             'active_sessions': len(self.stored_dict),
             'prefix_caching': True,
         }
+
+
+class _ChunkStream:
+    """Streaming decode state of one text chunk: parsed tokens, decode position and OLA tail."""
+
+    def __init__(self, ref_codes: Any, stride: int):
+        self.tokens = SpeechTokenBuffer(ref_codes)
+        self.ola = StreamingOverlapAdd(stride)
+        self.n_decoded_tokens = len(self.tokens)
+        # Length of the response text already fed; LMDeploy's text grows by the new tokens each step
+        self.n_consumed_chars = 0
+        self.finished = False
+        self.flushed = False
+
+    def feed(self, output_str: str):
+        """Parse the part of the cumulative response text not seen yet."""
+        if len(output_str) > self.n_consumed_chars:
+            self.tokens.feed(output_str[self.n_consumed_chars:])
+            self.n_consumed_chars = len(output_str)
@@ -0,0 +1,150 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Seconds; spans sub-millisecond cache hits up to multi-second generations
+LATENCY_BUCKETS: Tuple[float, ...] = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
+TOKENS_PER_SECOND_BUCKETS: Tuple[float, ...] = (5, 10, 20, 30, 50, 75, 100, 150, 200, 300, 500, 1000)
+
+
+def _format_value(value: float) -> str:
+    return "+Inf" if value == float("inf") else repr(float(value))
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    parts = []
+    for k, v in labels.items():
+        v = str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        parts.append(f'{k}="{v}"')
+    return "{" + ",".join(parts) + "}"
+
+
+class Histogram:
+    """Cumulative-bucket histogram with one series per label value, in Prometheus semantics."""
+
+    def __init__(self, name: str, help_text: str, buckets: Sequence[float] = LATENCY_BUCKETS, label: Optional[str] = None):
+        """
+        Args:
+            name: Metric name.
+            help_text: HELP line.
+            buckets: Sorted upper bounds; ``+Inf`` is implied.
+            label: Optional label name; ``observe`` then takes its value.
+        """
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(sorted(buckets))
+        self.label = label
+        self._series: Dict[str, Tuple[List[int], List[float]]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, label_value: str = ""):
+        """Record one observation."""
+        idx = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_value)
+            if series is None:
+                series = ([0] * (len(self.buckets) + 1), [0.0])
+                self._series[label_value] = series
+            counts, total = series
+            counts[idx] += 1
+            total[0] += value
+
+    def snapshot(self, label_value: str = "") -> Dict[str, float]:
+        """Return count and sum for one series (zeros if it was never observed)."""
+        with self._lock:
+            series = self._series.get(label_value)
+            if series is None:
+                return {"count": 0, "sum": 0.0}
+            return {"count": sum(series[0]), "sum": series[1][0]}
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((k, (list(c), t[0])) for k, (c, t) in self._series.items())
+        for label_value, (counts, total) in items:
+            base = {self.label: label_value} if self.label else {}
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                labels = _format_labels({**base, "le": _format_value(bound)})
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(base)} {total}")
+            lines.append(f"{self.name}_count{_format_labels(base)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Per-stage latency metrics for the synthesis pipeline.
+
+    Stages are observed into one ``<prefix>_stage_duration_seconds`` histogram labelled
+    by stage name; generation throughput goes into ``<prefix>_generation_tokens_per_second``.
+    Gauges are point-in-time values (pool occupancy, cache hit rates) and counters are
+    cumulative totals kept elsewhere (pool waits); both are set by the caller right before
+    rendering. ``render()`` returns the Prometheus text exposition format.
+    """
+
+    def __init__(self, prefix: str = "vieneu"):
+        self.prefix = prefix
+        self.stages = Histogram(
+            f"{prefix}_stage_duration_seconds",
+            "Time spent in each synthesis pipeline stage.",
+            LATENCY_BUCKETS,
+            label="stage",
+        )
+        self.tokens_per_second = Histogram(
+            f"{prefix}_generation_tokens_per_second",
+            "Speech token generation throughput per backbone call.",
+            TOKENS_PER_SECOND_BUCKETS,
+        )
+        self._gauges: Dict[str, Tuple[str, float]] = {}
+        self._counters: Dict[str, Tuple[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, stage: str, seconds: float):
+        """Record the duration of one pipeline stage."""
+        self.stages.observe(seconds, stage)
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Time the ``with`` block as pipeline stage ``name``."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages.observe(time.perf_counter() - start, name)
+
+    def observe_generation(self, n_tokens: int, seconds: float):
+        """Record a generation stage that produced ``n_tokens`` in ``seconds``."""
+        self.stages.observe(seconds, "generate")
+        if n_tokens > 0 and seconds > 0:
+            self.tokens_per_second.observe(n_tokens / seconds)
+
+    def set_gauge(self, name: str, value: float, help_text: str = ""):
+        """Set a gauge reported as ``<prefix>_<name>``."""
+        with self._lock:
+            self._gauges[f"{self.prefix}_{name}"] = (help_text, float(value))
+
+    def set_counter(self, name: str, value: float, help_text: str = ""):
+        """Set a cumulative total reported as counter ``<prefix>_<name>`` (name it ``..._total``)."""
+        with self._lock:
+            self._counters[f"{self.prefix}_{name}"] = (help_text, float(value))
+
+    def render(self) -> str:
+        """Return all metrics in Prometheus text exposition format."""
+        lines = self.stages.render() + self.tokens_per_second.render()
+        with self._lock:
+            series = [(name, entry, "gauge") for name, entry in self._gauges.items()]
+            series += [(name, entry, "counter") for name, entry in self._counters.items()]
+        for name, (help_text, value), kind in sorted(series):
+            if help_text:
+                lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            lines.append(f"{name} {value}")
+        return "\n".join(lines) + "\n"
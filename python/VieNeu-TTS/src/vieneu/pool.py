@@ -0,0 +1,117 @@
+import os
+import queue
+import threading
+import time
+import logging
+from contextlib import contextmanager
+from typing import Optional, List, Dict, Any, Iterator
+
+from .standard import VieNeuTTS
+
+logger = logging.getLogger("Vieneu.Pool")
+
+
+def default_threads_per_worker(size: int) -> int:
+    """Split the machine's CPU cores evenly across ``size`` backbone contexts."""
+    return max(1, (os.cpu_count() or 1) // max(1, size))
+
+
+class BackbonePool:
+    """
+    Pool of independent GGUF backbone contexts for concurrent synthesis.
+
+    llama.cpp contexts are not thread-safe, so a single ``VieNeuTTS`` serializes all
+    requests. The pool holds ``size`` workers spawned from one primary instance: each
+    has its own context and CPU thread budget over the same mmapped weights, and all
+    share one codec. Callers borrow an idle worker with :meth:`acquire`; when every
+    worker is busy the call waits for the next one to be returned.
+    """
+
+    def __init__(self, tts: VieNeuTTS, size: int = 1, n_threads: Optional[int] = None):
+        """
+        Args:
+            tts: Primary instance. Used as the first worker and as the template for the others.
+            size: Number of workers. Sizes above 1 require a GGUF backbone.
+            n_threads: CPU threads per spawned worker. Defaults to the primary's setting.
+        """
+        self.size = max(1, int(size))
+        self._workers: List[VieNeuTTS] = [tts]
+        for i in range(1, self.size):
+            logger.info(f"Spawning backbone worker {i + 1}/{self.size} ...")
+            self._workers.append(tts.spawn_worker(n_threads=n_threads))
+
+        # LIFO so the most recently used worker (warm prefix cache, hot pages) is reused first
+        self._idle: "queue.LifoQueue[VieNeuTTS]" = queue.LifoQueue()
+        for worker in self._workers:
+            self._idle.put(worker)
+
+        self._lock = threading.Lock()
+        self._busy = 0
+        self.acquisitions = 0
+        self.waits = 0
+        self.total_wait_time = 0.0
+
+    @property
+    def primary(self) -> VieNeuTTS:
+        """The instance the pool was built from (owns the shared codec and caches)."""
+        return self._workers[0]
+
+    def __len__(self) -> int:
+        return self.size
+
+    @contextmanager
+    def acquire(self, timeout: Optional[float] = None) -> Iterator[VieNeuTTS]:
+        """
+        Borrow an idle worker for the duration of the ``with`` block.
+
+        Args:
+            timeout: Seconds to wait for a worker. ``None`` waits indefinitely.
+
+        Raises:
+            TimeoutError: If no worker became idle within ``timeout``.
+        """
+        start = time.perf_counter()
+        try:
+            worker = self._idle.get_nowait()
+            waited = False
+        except queue.Empty:
+            try:
+                worker = self._idle.get(timeout=timeout)
+            except queue.Empty:
+                raise TimeoutError(f"No idle TTS worker within {timeout}s") from None
+            waited = True
+
+        with self._lock:
+            self._busy += 1
+            self.acquisitions += 1
+            if waited:
+                self.waits += 1
+                self.total_wait_time += time.perf_counter() - start
+        try:
+            yield worker
+        finally:
+            with self._lock:
+                self._busy -= 1
+            self._idle.put(worker)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return worker occupancy and queueing counters."""
+        with self._lock:
+            return {
+                "workers": self.size,
+                "busy": self._busy,
+                "idle": self.size - self._busy,
+                "acquisitions": self.acquisitions,
+                "waits": self.waits,
+                "avg_wait_s": round(self.total_wait_time / self.waits, 4) if self.waits else 0.0,
+            }
+
+    def close(self):
+        """Release every worker's backbone context."""
+        for worker in self._workers[1:]:
+            if worker.backbone is not None:
+                close_fn = getattr(worker.backbone, "close", None)
+                if callable(close_fn):
+                    close_fn()
+                worker.backbone = None
+        self.primary.close()
@@ -1,40 +1,80 @@
 from pathlib import Path
-from typing import Optional, Union, List, Generator, Any, Dict
+from typing import Optional, Union, List, Generator, AsyncGenerator, Any, Dict, Tuple, Sequence
 import numpy as np
 import torch
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
 import asyncio
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from .standard import VieNeuTTS
-from .utils import _linear_overlap_add
+from .balancer import EndpointBalancer
+from .voice import PreparedVoice
+from .utils import StreamingOverlapAdd, SpeechTokenBuffer
 from vieneu_utils.phonemize_text import phonemize_with_dict
-from vieneu_utils.core_utils import split_text_into_chunks, join_audio_chunks
+from vieneu_utils.core_utils import split_text_into_chunks, join_audio_chunks, format_prompt
 
 logger = logging.getLogger("Vieneu.Remote")
 
+# Returned by _parse_sse_line for the terminating "data: [DONE]" event
+_SSE_DONE = object()
+
+# (speech ids, first sample, end sample or None for the rest)
+_Window = Tuple[np.ndarray, int, Optional[int]]
+
 class RemoteVieNeuTTS(VieNeuTTS):
     """
-    Client for VieNeu-TTS running on a remote LMDeploy server.
+    Client for VieNeu-TTS running on one or more remote LMDeploy servers.
+
+    With several ``api_base`` URLs, requests are spread across them by an
+    :class:`EndpointBalancer` and fail over to the next server when one is unreachable.
     """
 
+    # The server samples with its own RNG, so generations can't be reproduced from here
+    _supports_seeded_sampling = False
+
     def __init__(
         self,
-        api_base: str = "http://localhost:23333/v1",
+        api_base: Union[str, Sequence[str]] = "http://localhost:23333/v1",
         model_name: str = "pnnbao-ump/VieNeu-TTS",
         codec_repo: str = "neuphonic/distill-neucodec",
         codec_device: str = "cpu",
-        hf_token: Optional[str] = None
+        hf_token: Optional[str] = None,
+        prompt_layout: str = "default",
+        pool_size: int = 8,
+        connect_timeout: float = 5.0,
+        read_timeout: float = 60.0,
+        max_retries: int = 3,
+        retry_backoff: float = 0.2,
+        decode_workers: int = 2,
+        health_interval: float = 10.0,
     ):
-        self.api_base = api_base.rstrip('/')
+        self.balancer = EndpointBalancer([api_base] if isinstance(api_base, str) else api_base, health_interval=health_interval)
+        self.endpoints = self.balancer.endpoints
+        self.api_base = self.endpoints[0]
         self.model_name = model_name
+        # Keep-alive connections per server, also the cap on concurrent requests to it
+        self.pool_size = max(1, int(pool_size))
+        # (connect, read) seconds; when streaming, the read timeout applies between events
+        self.timeout = (connect_timeout, read_timeout)
+        # Retries on failed connections and 502/503/504, with jittered exponential backoff
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.session = self._make_session()
+        # Threads decoding audio for infer_stream_async, shared by all its streams
+        self.decode_workers = max(1, int(decode_workers))
+        self._decode_executor: Optional[ThreadPoolExecutor] = None
 
         super().__init__(
             backbone_repo=None,
             codec_repo=codec_repo,
             codec_device=codec_device,
-            hf_token=hf_token
+            hf_token=hf_token,
+            prompt_layout=prompt_layout,
         )
+        self.model_id = f"{','.join(self.endpoints)}#{model_name}"
 
         self.streaming_frames_per_chunk = 10
         self.streaming_lookforward = 5
@@ -45,26 +85,125 @@ class RemoteVieNeuTTS(VieNeuTTS):
     def _load_backbone(self, backbone_repo, backbone_device, hf_token=None):
         pass
 
-    def _format_prompt(self, ref_codes: Union[List[int], torch.Tensor, np.ndarray], ref_text: str, input_text: str) -> str:
-        if isinstance(ref_codes, (torch.Tensor, np.ndarray)):
-            ref_codes_list = ref_codes.flatten().tolist()
-        else:
-            ref_codes_list = ref_codes
-
-        ref_text_phones = phonemize_with_dict(ref_text)
-        input_text_phones = phonemize_with_dict(input_text, skip_normalize=True)
-        codes_str = "".join([f"<|speech_{idx}|>" for idx in ref_codes_list])
-        return (
-            f"user: Convert the text to speech:<|TEXT_PROMPT_START|>{ref_text_phones} {input_text_phones}"
-            f"<|TEXT_PROMPT_END|>\nassistant:<|SPEECH_GENERATION_START|>{codes_str}"
+    def _make_session(self) -> requests.Session:
+        """
+        Build the pooled HTTP session shared by all chunks.
+
+        Connections are kept alive between chunks, so only the first request to the
+        server pays for TCP setup. Chat completions have no server-side effects, so a
+        POST is retried when the connection fails or the server answers 502/503/504
+        (e.g. while it restarts). Read timeouts are not retried: the server may still
+        be generating, and resending would only double its load.
+        """
+        retry = Retry(
+            total=self.max_retries,
+            connect=self.max_retries,
+            read=0,
+            status=self.max_retries,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=frozenset({"POST"}),
+            backoff_factor=self.retry_backoff,
+            backoff_jitter=self.retry_backoff,
+            raise_on_status=False,
         )
+        adapter = HTTPAdapter(pool_connections=len(self.endpoints), pool_maxsize=self.pool_size, pool_block=True, max_retries=retry)
+        session = requests.Session()
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    def _make_async_session(self):
+        """aiohttp counterpart of :meth:`_make_session`: same connection cap and timeouts."""
+        import aiohttp
+        connector = aiohttp.TCPConnector(limit=self.pool_size * len(self.endpoints), limit_per_host=self.pool_size)
+        return aiohttp.ClientSession(connector=connector, timeout=self._async_timeout())
+
+    def _async_timeout(self):
+        import aiohttp
+        return aiohttp.ClientTimeout(sock_connect=self.timeout[0], sock_read=self.timeout[1])
+
+    def close(self):
+        """Close pooled connections, stop health checks and release model resources."""
+        balancer = getattr(self, "balancer", None)
+        if balancer is not None:
+            balancer.close()
+        session = getattr(self, "session", None)
+        if session is not None:
+            session.close()
+            self.session = None
+        executor = getattr(self, "_decode_executor", None)
+        if executor is not None:
+            executor.shutdown(wait=False)
+            self._decode_executor = None
+        super().close()
+
+    def _format_prompt(self, voice: PreparedVoice, input_text: str) -> str:
+        with self._stage("phonemize"):
+            input_text_phones = phonemize_with_dict(input_text, skip_normalize=True)
+        return format_prompt(voice.phones, input_text_phones, voice.codes_str, voice.layout)
+
+    @staticmethod
+    def _should_fail_over(e: BaseException) -> bool:
+        """Whether ``e`` means the endpoint, rather than the request, is at fault."""
+        response = getattr(e, "response", None)
+        status = getattr(response, "status_code", None) or getattr(e, "status", None)
+        if status is not None:
+            return status >= 500
+        if isinstance(e, (requests.RequestException, asyncio.TimeoutError)):
+            return True
+        try:
+            import aiohttp
+        except ImportError:
+            return False
+        return isinstance(e, aiohttp.ClientError)
+
+    def _complete(self, payload: Dict[str, Any], affinity_key: Optional[str] = None) -> str:
+        """Run a non-streaming chat completion, failing over across endpoints."""
+        error: Optional[Exception] = None
+        for api_base in self.balancer.choices(affinity_key):
+            try:
+                with self.balancer.track(api_base):
+                    response = self.session.post(f"{api_base}/chat/completions", json=payload, timeout=self.timeout)
+                    response.raise_for_status()
+                    return response.json()["choices"][0]["message"]["content"]
+            except Exception as e:
+                if not self._should_fail_over(e):
+                    raise
+                self.balancer.mark_down(api_base)
+                logger.warning(f"Endpoint {api_base} failed ({e}), trying the next one")
+                error = e
+        raise error
+
+    async def _complete_async(self, session, payload: Dict[str, Any], affinity_key: Optional[str] = None) -> str:
+        """Async :meth:`_complete`."""
+        error: Optional[Exception] = None
+        for api_base in self.balancer.choices(affinity_key):
+            try:
+                with self.balancer.track(api_base):
+                    async with session.post(f"{api_base}/chat/completions", json=payload, timeout=self._async_timeout()) as resp:
+                        resp.raise_for_status()
+                        data = await resp.json()
+                        return data["choices"][0]["message"]["content"]
+            except Exception as e:
+                if not self._should_fail_over(e):
+                    raise
+                self.balancer.mark_down(api_base)
+                logger.warning(f"Endpoint {api_base} failed ({e}), trying the next one")
+                error = e
+        raise error
 
-    def infer(self, text: str, ref_audio: Optional[Union[str, Path]] = None, ref_codes: Optional[Union[np.ndarray, torch.Tensor]] = None, ref_text: Optional[str] = None, max_chars: int = 256, silence_p: float = 0.15, crossfade_p: float = 0.0, voice: Optional[Dict[str, Any]] = None, temperature: float = 1.0, top_k: int = 50, skip_normalize: bool = False) -> np.ndarray:
+    def infer(self, text: str, ref_audio: Optional[Union[str, Path]] = None, ref_codes: Optional[Union[np.ndarray, torch.Tensor]] = None, ref_text: Optional[str] = None, max_chars: int = 256, silence_p: float = 0.15, crossfade_p: float = 0.0, voice: Optional[Union[Dict[str, Any], PreparedVoice]] = None, temperature: float = 1.0, top_k: int = 50, skip_normalize: bool = False, skip_failed_chunks: bool = False) -> np.ndarray:
+        """
+        Synthesize ``text`` through the remote backbone.
 
-        ref_codes, ref_text = self._resolve_ref_voice(voice, ref_audio, ref_codes, ref_text)
+        A chunk whose request still fails after retries and endpoint failover raises,
+        unless ``skip_failed_chunks`` is set; then it is logged and left out of the audio.
+        """
+
+        voice = self.prepare_voice(voice, ref_audio, ref_codes, ref_text)
 
         if not skip_normalize:
-            text = self.normalizer.normalize(text)
+            text = self._normalize_text(text)
 
         chunks = split_text_into_chunks(text, max_chars=max_chars)
         if not chunks:
@@ -72,7 +211,7 @@ class RemoteVieNeuTTS(VieNeuTTS):
 
         all_wavs = []
         for chunk in chunks:
-            prompt = self._format_prompt(ref_codes, ref_text, chunk)
+            prompt = self._format_prompt(voice, chunk)
             payload = {
                 "model": self.model_name,
                 "messages": [{"role": "user", "content": prompt}],
@@ -83,31 +222,33 @@ class RemoteVieNeuTTS(VieNeuTTS):
                 "stream": False
             }
             try:
-                response = requests.post(f"{self.api_base}/chat/completions", json=payload, timeout=60)
-                response.raise_for_status()
-                output_str = response.json()["choices"][0]["message"]["content"]
+                with self._stage("generate"):
+                    output_str = self._complete(payload, voice.identity)
                 wav = self._decode(output_str)
                 all_wavs.append(wav)
             except Exception as e:
                 logger.error(f"Error during remote inference: {e}")
-                continue
+                if not skip_failed_chunks:
+                    raise
 
         final_wav = join_audio_chunks(all_wavs, self.sample_rate, silence_p, crossfade_p)
         return self._apply_watermark(final_wav)
 
-    def infer_stream(self, text: str, ref_audio: Optional[Union[str, Path]] = None, ref_codes: Optional[Union[np.ndarray, torch.Tensor]] = None, ref_text: Optional[str] = None, max_chars: int = 256, voice: Optional[Dict[str, Any]] = None, temperature: float = 1.0, top_k: int = 50, skip_normalize: bool = False) -> Generator[np.ndarray, None, None]:
+    def infer_stream(self, text: str, ref_audio: Optional[Union[str, Path]] = None, ref_codes: Optional[Union[np.ndarray, torch.Tensor]] = None, ref_text: Optional[str] = None, max_chars: int = 256, voice: Optional[Union[Dict[str, Any], PreparedVoice]] = None, temperature: float = 1.0, top_k: int = 50, skip_normalize: bool = False, cancel_event: Optional[Any] = None) -> Generator[np.ndarray, None, None]:
 
-        ref_codes, ref_text = self._resolve_ref_voice(voice, ref_audio, ref_codes, ref_text)
+        voice = self.prepare_voice(voice, ref_audio, ref_codes, ref_text)
 
         if not skip_normalize:
-            text = self.normalizer.normalize(text)
+            text = self._normalize_text(text)
 
         chunks = split_text_into_chunks(text, max_chars=max_chars)
         for chunk in chunks:
-            yield from self._infer_stream_chunk(chunk, ref_codes, ref_text, temperature, top_k)
+            if self._is_cancelled(cancel_event):
+                return
+            yield from self._infer_stream_chunk(chunk, voice, temperature, top_k, cancel_event)
 
-    def _infer_stream_chunk(self, chunk, ref_codes, ref_text, temperature, top_k):
-        prompt = self._format_prompt(ref_codes, ref_text, chunk)
+    def _infer_stream_chunk(self, chunk, voice, temperature, top_k, cancel_event=None):
+        prompt = self._format_prompt(voice, chunk)
         payload = {
             "model": self.model_name,
             "messages": [{"role": "user", "content": prompt}],
@@ -118,73 +259,199 @@ class RemoteVieNeuTTS(VieNeuTTS):
             "stream": True
         }
 
-        if isinstance(ref_codes, (torch.Tensor, np.ndarray)):
-            ref_codes_list = ref_codes.flatten().tolist()
+        error: Optional[Exception] = None
+        for api_base in self.balancer.choices(voice.identity):
+            ola = StreamingOverlapAdd(self.streaming_stride_samples)
+            tokens = SpeechTokenBuffer(voice.context_codes)
+            n_decoded_tokens: int = len(voice.context_codes)
+            started = False
+            try:
+                with self.balancer.track(api_base), \
+                     self.session.post(f"{api_base}/chat/completions", json=payload, stream=True, timeout=self.timeout) as r:
+                    r.raise_for_status()
+                    for line in r.iter_lines():
+                        # Closing the response drops the connection, so the server stops generating
+                        if self._is_cancelled(cancel_event):
+                            return
+                        content = self._parse_sse_line(line)
+                        if content is _SSE_DONE:
+                            break
+                        if content:
+                            tokens.feed(content)
+                            windows, n_decoded_tokens = self._take_windows(tokens, n_decoded_tokens)
+                            for window in windows:
+                                started = True
+                                yield ola.add(self._decode_window(*window))
+                break
+            except Exception as e:
+                # Audio already yielded can't be taken back, so fail over only before the first window
+                if started or not self._should_fail_over(e):
+                    logger.error(f"Error streaming chunk: {e}")
+                    raise
+                self.balancer.mark_down(api_base)
+                logger.warning(f"Endpoint {api_base} failed ({e}), trying the next one")
+                error = e
         else:
-            ref_codes_list = ref_codes
+            logger.error("Error streaming chunk: no endpoint available")
+            raise error or RuntimeError("No endpoint available for streaming")
+
+        tail = self._take_tail(tokens, n_decoded_tokens)
+        if tail is not None:
+            yield ola.add(self._decode_window(*tail), final=True)
+
+    @staticmethod
+    def _parse_sse_line(line: bytes) -> Any:
+        """Return the content delta of one SSE line, ``""`` if it has none, or ``_SSE_DONE``."""
+        line_str = line.decode('utf-8').strip()
+        if not line_str.startswith('data: '):
+            return ""
+        data_str = line_str[6:]
+        if data_str == '[DONE]':
+            return _SSE_DONE
+        try:
+            return json.loads(data_str)["choices"][0]["delta"].get("content", "") or ""
+        except json.JSONDecodeError:
+            return ""
+
+    def _take_windows(self, tokens: SpeechTokenBuffer, n_decoded_tokens: int) -> Tuple[List[_Window], int]:
+        """
+        Cut every streaming window ``tokens`` can fill past ``n_decoded_tokens``.
+
+        Returns the windows (with their ids copied, so they stay valid after the buffer
+        is compacted) and the new number of decoded tokens.
+        """
+        windows = []
+        while len(tokens) - n_decoded_tokens >= self.streaming_frames_per_chunk + self.streaming_lookforward:
+            tokens_start = max(n_decoded_tokens - self.streaming_lookback - self.streaming_overlap_frames, 0)
+            tokens_end = n_decoded_tokens + self.streaming_frames_per_chunk + self.streaming_lookforward + self.streaming_overlap_frames
+            sample_start = (n_decoded_tokens - tokens_start) * self.hop_length
+            sample_end = sample_start + (self.streaming_frames_per_chunk + 2 * self.streaming_overlap_frames) * self.hop_length
+            windows.append((np.array(tokens.window(tokens_start, tokens_end)), sample_start, sample_end))
+            n_decoded_tokens += self.streaming_frames_per_chunk
+            tokens.discard_before(n_decoded_tokens - self.streaming_lookback - self.streaming_overlap_frames)
+        return windows, n_decoded_tokens
+
+    def _take_tail(self, tokens: SpeechTokenBuffer, n_decoded_tokens: int) -> Optional[_Window]:
+        """The final window covering tokens not yet decoded, or ``None`` if there are none."""
+        remaining_tokens = len(tokens) - n_decoded_tokens
+        if remaining_tokens <= 0:
+            return None
+        tokens_start = max(len(tokens) - (self.streaming_lookback + self.streaming_overlap_frames + remaining_tokens), 0)
+        sample_start = (len(tokens) - tokens_start - remaining_tokens - self.streaming_overlap_frames) * self.hop_length
+        return np.array(tokens.window(tokens_start)), sample_start, None
+
+    def _decode_window(self, speech_ids: np.ndarray, sample_start: int, sample_end: Optional[int]) -> np.ndarray:
+        recon = self._decode_ids(speech_ids)
+        recon = self._apply_watermark(recon)
+        return recon[sample_start:sample_end]
+
+    def _get_decode_executor(self) -> ThreadPoolExecutor:
+        if self._decode_executor is None:
+            self._decode_executor = ThreadPoolExecutor(max_workers=self.decode_workers, thread_name_prefix="vieneu-decode")
+        return self._decode_executor
+
+    async def infer_stream_async(self, text: str, ref_audio: Optional[Union[str, Path]] = None, ref_codes: Optional[Union[np.ndarray, torch.Tensor]] = None, ref_text: Optional[str] = None, max_chars: int = 256, voice: Optional[Union[Dict[str, Any], PreparedVoice]] = None, temperature: float = 1.0, top_k: int = 50, session=None, skip_normalize: bool = False, cancel_event: Optional[Any] = None) -> AsyncGenerator[np.ndarray, None]:
+        """
+        Async counterpart of :meth:`infer_stream`: yields audio chunks as SSE deltas arrive.
+
+        Token parsing runs on the event loop; codec decodes run on a pool of
+        ``decode_workers`` threads shared by every stream of this instance, so many
+        concurrent streams need no thread of their own. Voice preparation (audio load and
+        codec encode), normalization and phonemization run on the loop's default executor.
+        Closing the generator (or setting ``cancel_event``) drops the connection, which
+        stops the server's generation.
+        """
+        try:
+            import aiohttp
+        except ImportError:
+            raise ImportError("Async requires 'aiohttp'.")
 
-        audio_cache: List[np.ndarray] = []
-        token_cache: List[str] = [f"<|speech_{idx}|>" for idx in ref_codes_list]
-        n_decoded_samples: int = 0
-        n_decoded_tokens: int = len(ref_codes_list)
+        loop = asyncio.get_running_loop()
+        voice = await loop.run_in_executor(None, self.prepare_voice, voice, ref_audio, ref_codes, ref_text)
+
+        if not skip_normalize:
+            text = await loop.run_in_executor(None, self._normalize_text, text)
+
+        should_close_session = False
+        if session is None:
+            session = self._make_async_session()
+            should_close_session = True
 
         try:
-             with requests.post(f"{self.api_base}/chat/completions", json=payload, stream=True, timeout=60) as r:
-                r.raise_for_status()
-                for line in r.iter_lines():
-                    if not line: continue
-                    line_str = line.decode('utf-8')
-                    if not line_str.startswith('data: '): continue
-                    data_str = line_str[6:]
-                    if data_str == '[DONE]': break
-                    try:
-                        content = json.loads(data_str)["choices"][0]["delta"].get("content", "")
-                        if content:
-                             token_cache.append(content)
-                             if len(token_cache[n_decoded_tokens:]) >= self.streaming_frames_per_chunk + self.streaming_lookforward:
-                                tokens_start = max(n_decoded_tokens - self.streaming_lookback - self.streaming_overlap_frames, 0)
-                                tokens_end = n_decoded_tokens + self.streaming_frames_per_chunk + self.streaming_lookforward + self.streaming_overlap_frames
-                                sample_start = (n_decoded_tokens - tokens_start) * self.hop_length
-                                sample_end = sample_start + (self.streaming_frames_per_chunk + 2 * self.streaming_overlap_frames) * self.hop_length
-                                curr_codes = token_cache[tokens_start:tokens_end]
-                                recon = self._decode("".join(curr_codes))
-                                recon = self._apply_watermark(recon)
-                                recon = recon[sample_start:sample_end]
-                                audio_cache.append(recon)
-                                processed_recon = _linear_overlap_add(audio_cache, stride=self.streaming_stride_samples)
-                                new_samples_end = len(audio_cache) * self.streaming_stride_samples
-                                processed_recon = processed_recon[n_decoded_samples:new_samples_end]
-                                n_decoded_samples = new_samples_end
-                                n_decoded_tokens += self.streaming_frames_per_chunk
-                                yield processed_recon
-                    except json.JSONDecodeError: continue
-        except Exception as e:
-            logger.error(f"Error streaming chunk: {e}")
-            return
-
-        remaining_tokens = len(token_cache) - n_decoded_tokens
-        if remaining_tokens > 0:
-            tokens_start = max(len(token_cache) - (self.streaming_lookback + self.streaming_overlap_frames + remaining_tokens), 0)
-            sample_start = (len(token_cache) - tokens_start - remaining_tokens - self.streaming_overlap_frames) * self.hop_length
-            curr_codes = token_cache[tokens_start:]
-            recon = self._decode("".join(curr_codes))
-            recon = self._apply_watermark(recon)
-            recon = recon[sample_start:]
-            audio_cache.append(recon)
-            processed_recon = _linear_overlap_add(audio_cache, stride=self.streaming_stride_samples)
-            processed_recon = processed_recon[n_decoded_samples:]
-            yield processed_recon
-
-    async def infer_async(self, text: str, ref_audio: Optional[Union[str, Path]] = None, ref_codes: Optional[Union[np.ndarray, torch.Tensor]] = None, ref_text: Optional[str] = None, max_chars: int = 256, silence_p: float = 0.15, crossfade_p: float = 0.0, voice: Optional[Dict[str, Any]] = None, temperature: float = 1.0, top_k: int = 50, session=None, skip_normalize: bool = False) -> np.ndarray:
+            for chunk in split_text_into_chunks(text, max_chars=max_chars):
+                if self._is_cancelled(cancel_event):
+                    return
+                async for wav in self._infer_stream_chunk_async(session, chunk, voice, temperature, top_k, cancel_event):
+                    yield wav
+        finally:
+            if should_close_session:
+                await session.close()
+
+    async def _infer_stream_chunk_async(self, session, chunk, voice, temperature, top_k, cancel_event=None):
+        loop = asyncio.get_running_loop()
+        prompt = await loop.run_in_executor(None, self._format_prompt, voice, chunk)
+        payload = {
+            "model": self.model_name,
+            "messages": [{"role": "user", "content": prompt}],
+            "max_tokens": 2048,
+            "temperature": temperature,
+            "top_k": top_k,
+            "stop": ["<|SPEECH_GENERATION_END|>"],
+            "stream": True
+        }
+
+        executor = self._get_decode_executor()
+        error: Optional[Exception] = None
+        for api_base in self.balancer.choices(voice.identity):
+            ola = StreamingOverlapAdd(self.streaming_stride_samples)
+            tokens = SpeechTokenBuffer(voice.context_codes)
+            n_decoded_tokens: int = len(voice.context_codes)
+            started = False
+            try:
+                with self.balancer.track(api_base):
+                    async with session.post(f"{api_base}/chat/completions", json=payload, timeout=self._async_timeout()) as resp:
+                        resp.raise_for_status()
+                        async for line in resp.content:
+                            if self._is_cancelled(cancel_event):
+                                return
+                            content = self._parse_sse_line(line)
+                            if content is _SSE_DONE:
+                                break
+                            if content:
+                                tokens.feed(content)
+                                windows, n_decoded_tokens = self._take_windows(tokens, n_decoded_tokens)
+                                for window in windows:
+                                    recon = await loop.run_in_executor(executor, self._decode_window, *window)
+                                    started = True
+                                    yield ola.add(recon)
+                break
+            except Exception as e:
+                if started or not self._should_fail_over(e):
+                    logger.error(f"Error streaming chunk: {e}")
+                    raise
+                self.balancer.mark_down(api_base)
+                logger.warning(f"Endpoint {api_base} failed ({e}), trying the next one")
+                error = e
+        else:
+            logger.error("Error streaming chunk: no endpoint available")
+            raise error or RuntimeError("No endpoint available for streaming")
+
+        tail = self._take_tail(tokens, n_decoded_tokens)
+        if tail is not None:
+            recon = await loop.run_in_executor(executor, self._decode_window, *tail)
+            yield ola.add(recon, final=True)
+
+    async def infer_async(self, text: str, ref_audio: Optional[Union[str, Path]] = None, ref_codes: Optional[Union[np.ndarray, torch.Tensor]] = None, ref_text: Optional[str] = None, max_chars: int = 256, silence_p: float = 0.15, crossfade_p: float = 0.0, voice: Optional[Union[Dict[str, Any], PreparedVoice]] = None, temperature: float = 1.0, top_k: int = 50, session=None, skip_normalize: bool = False, skip_failed_chunks: bool = False) -> np.ndarray:
         try:
             import aiohttp
         except ImportError:
             raise ImportError("Async requires 'aiohttp'.")
 
-        ref_codes, ref_text = self._resolve_ref_voice(voice, ref_audio, ref_codes, ref_text)
+        loop = asyncio.get_running_loop()
+        voice = await loop.run_in_executor(None, self.prepare_voice, voice, ref_audio, ref_codes, ref_text)
 
         if not skip_normalize:
-            text = self.normalizer.normalize(text)
+            text = await loop.run_in_executor(None, self._normalize_text, text)
 
         chunks = split_text_into_chunks(text, max_chars=max_chars)
         if not chunks:
@@ -192,11 +459,11 @@ class RemoteVieNeuTTS(VieNeuTTS):
 
         should_close_session = False
         if session is None:
-            session = aiohttp.ClientSession()
+            session = self._make_async_session()
             should_close_session = True
 
         try:
-            tasks = [self._infer_chunk_async(session, chunk, ref_codes, ref_text, temperature, top_k) for chunk in chunks]
+            tasks = [self._infer_chunk_async(session, chunk, voice, temperature, top_k, skip_failed_chunks) for chunk in chunks]
             wavs = await asyncio.gather(*tasks)
             final_wav = join_audio_chunks(wavs, self.sample_rate, silence_p, crossfade_p)
             return self._apply_watermark(final_wav)
@@ -204,8 +471,9 @@ class RemoteVieNeuTTS(VieNeuTTS):
             if should_close_session:
                 await session.close()
 
-    async def _infer_chunk_async(self, session, chunk, ref_codes, ref_text, temperature, top_k):
-        prompt = self._format_prompt(ref_codes, ref_text, chunk)
+    async def _infer_chunk_async(self, session, chunk, voice, temperature, top_k, skip_failed_chunks=False):
+        loop = asyncio.get_running_loop()
+        prompt = await loop.run_in_executor(None, self._format_prompt, voice, chunk)
         payload = {
             "model": self.model_name,
             "messages": [{"role": "user", "content": prompt}],
@@ -216,32 +484,32 @@ class RemoteVieNeuTTS(VieNeuTTS):
             "stream": False
         }
         try:
-            async with session.post(f"{self.api_base}/chat/completions", json=payload, timeout=60) as resp:
-                resp.raise_for_status()
-                data = await resp.json()
-                output_str = data["choices"][0]["message"]["content"]
-                return self._decode(output_str)
+            output_str = await self._complete_async(session, payload, voice.identity)
+            return await loop.run_in_executor(self._get_decode_executor(), self._decode, output_str)
         except Exception as e:
             logger.error(f"Error in async chunk: {e}")
+            if not skip_failed_chunks:
+                raise
             return np.array([], dtype=np.float32)
 
-    async def infer_batch_async(self, texts: List[str], ref_audio: Optional[Union[str, Path]] = None, ref_codes: Optional[Union[np.ndarray, torch.Tensor]] = None, ref_text: Optional[str] = None, max_chars: int = 256, silence_p: float = 0.15, crossfade_p: float = 0.0, voice: Optional[Dict[str, Any]] = None, temperature: float = 1.0, top_k: int = 50, concurrency_limit: int = 50, skip_normalize: bool = False) -> List[np.ndarray]:
+    async def infer_batch_async(self, texts: List[str], ref_audio: Optional[Union[str, Path]] = None, ref_codes: Optional[Union[np.ndarray, torch.Tensor]] = None, ref_text: Optional[str] = None, max_chars: int = 256, silence_p: float = 0.15, crossfade_p: float = 0.0, voice: Optional[Union[Dict[str, Any], PreparedVoice]] = None, temperature: float = 1.0, top_k: int = 50, concurrency_limit: int = 50, skip_normalize: bool = False) -> List[np.ndarray]:
         try:
             import aiohttp
         except ImportError:
             raise ImportError("Async requires 'aiohttp'.")
 
+        loop = asyncio.get_running_loop()
         if not skip_normalize:
-            texts = [self.normalizer.normalize(t) for t in texts]
+            texts = await loop.run_in_executor(None, lambda: [self._normalize_text(t) for t in texts])
 
-        ref_codes, ref_text = self._resolve_ref_voice(voice, ref_audio, ref_codes, ref_text)
+        voice = await loop.run_in_executor(None, self.prepare_voice, voice, ref_audio, ref_codes, ref_text)
 
         sem = asyncio.Semaphore(concurrency_limit)
-        async with aiohttp.ClientSession() as session:
+        async with self._make_async_session() as session:
             async def bounded_infer(text):
                 async with sem:
                     return await self.infer_async(
-                        text, ref_codes=ref_codes, ref_text=ref_text,
+                        text, voice=voice,
                         max_chars=max_chars, silence_p=silence_p, crossfade_p=crossfade_p,
                         temperature=temperature, top_k=top_k,
                         session=session, skip_normalize=True
@@ -1,13 +1,22 @@
 from pathlib import Path
-from typing import Optional, Union, List, Generator, Any, Dict
+from typing import Optional, Union, List, Generator, Any, Dict, Iterable, Tuple
 import numpy as np
 import torch
 import gc
+import copy
+import random
+import dataclasses
+import time
+import queue
+import threading
 import logging
+from contextlib import contextmanager
 from .base import BaseVieneuTTS
-from .utils import extract_speech_ids, _linear_overlap_add
+from .cache import PrefixStateCache
+from .voice import PreparedVoice
+from .utils import extract_speech_ids, StreamingOverlapAdd, SpeechTokenBuffer
 from vieneu_utils.phonemize_text import phonemize_with_dict
-from vieneu_utils.core_utils import split_text_into_chunks, join_audio_chunks
+from vieneu_utils.core_utils import split_text_into_chunks, join_audio_chunks, format_prompt, PROMPT_LAYOUTS
 from neucodec import NeuCodec, DistillNeuCodec
 
 logger = logging.getLogger("Vieneu.Standard")
@@ -18,6 +27,8 @@ class VieNeuTTS(BaseVieneuTTS):
     Supports PyTorch + Transformers backend and GGUF quantized models.
     """
 
+    _supports_seeded_sampling = True
+
     def __init__(
         self,
         backbone_repo: str = "pnnbao-ump/VieNeu-TTS-0.3B-q4-gguf",
@@ -25,8 +36,17 @@ class VieNeuTTS(BaseVieneuTTS):
         codec_repo: str = "neuphonic/distill-neucodec",
         codec_device: str = "cpu",
         hf_token: Optional[str] = None,
+        prompt_layout: str = "default",
+        prefix_cache_size: int = 4,
+        n_threads: Optional[int] = None,
+        pipeline_decode: bool = False,
     ):
         super().__init__()
+        self.codec_repo = codec_repo
+
+        if prompt_layout not in PROMPT_LAYOUTS:
+            raise ValueError(f"Unsupported prompt layout: {prompt_layout}. Choose from {PROMPT_LAYOUTS}")
+        self.prompt_layout = prompt_layout
 
         # Streaming configuration
         self.streaming_overlap_frames = 1
@@ -40,6 +60,18 @@ class VieNeuTTS(BaseVieneuTTS):
         self.tokenizer = None
         self.backbone = None
         self.codec = None
+        self._backbone_repo = backbone_repo
+        self.model_id = backbone_repo
+        # llama.cpp context snapshots after the voice-specific prompt head (GGUF only)
+        self.prefix_cache: Optional[PrefixStateCache] = None
+        self._prefix_cache_size = prefix_cache_size
+        # llama.cpp CPU threads per context (None = llama.cpp default)
+        self._n_threads = n_threads
+        self._backbone_device = backbone_device
+        # Cross-request micro-batcher for the PyTorch backbone (see enable_batching)
+        self.batcher = None
+        # Decode chunk N on a worker thread while the backbone generates chunk N+1
+        self.pipeline_decode = pipeline_decode
 
         if backbone_repo:
             self._load_backbone(backbone_repo, backbone_device, hf_token)
@@ -49,6 +81,7 @@ class VieNeuTTS(BaseVieneuTTS):
     def close(self):
         """Explicitly release model resources."""
         try:
+            self.disable_batching()
             if self.backbone is not None:
                 if self._is_quantized_model:
                     close_fn = getattr(self.backbone, "close", None)
@@ -82,14 +115,12 @@ class VieNeuTTS(BaseVieneuTTS):
             self.backbone = Llama.from_pretrained(
                 repo_id=backbone_repo,
                 filename="*.gguf",
-                verbose=False,
-                n_gpu_layers=-1 if backbone_device in ("gpu", "cuda") else 0,
-                n_ctx=self.max_context,
-                mlock=True,
-                flash_attn=True if backbone_device in ("gpu", "cuda") else False,
                 token=hf_token,
+                **self._ggml_context_kwargs(backbone_device, self._n_threads),
             )
             self._is_quantized_model = True
+            if self._prefix_cache_size > 0:
+                self.prefix_cache = PrefixStateCache(max_entries=self._prefix_cache_size)
         else:
             from transformers import AutoTokenizer, AutoModelForCausalLM
             self.tokenizer = AutoTokenizer.from_pretrained(backbone_repo, token=hf_token)
@@ -97,6 +128,57 @@ class VieNeuTTS(BaseVieneuTTS):
                 torch.device(backbone_device)
             )
 
+    def _ggml_context_kwargs(self, backbone_device: str, n_threads: Optional[int]) -> Dict[str, Any]:
+        kwargs = dict(
+            verbose=False,
+            n_gpu_layers=-1 if backbone_device in ("gpu", "cuda") else 0,
+            n_ctx=self.max_context,
+            mlock=True,
+            flash_attn=True if backbone_device in ("gpu", "cuda") else False,
+        )
+        if n_threads:
+            kwargs["n_threads"] = n_threads
+            kwargs["n_threads_batch"] = n_threads
+        return kwargs
+
+    def spawn_worker(self, n_threads: Optional[int] = None) -> "VieNeuTTS":
+        """
+        Create another instance with its own llama.cpp context over the same GGUF file.
+
+        The weights are mmapped, so every context shares one copy of them in memory.
+        The worker gets its own llama.cpp context, prefix cache, preset voice table and
+        watermarker. The codec, the normalizer (whose memo is locked) and the reference,
+        audio and metrics stores (each behind its own lock) are shared on purpose.
+
+        Args:
+            n_threads: CPU threads for the new context. Defaults to this instance's setting.
+
+        Returns:
+            VieNeuTTS: Worker that can run inference concurrently with this instance.
+        """
+        if not self._is_quantized_model:
+            raise ValueError(
+                "spawn_worker requires a GGUF backbone; for concurrent requests on a PyTorch "
+                "backbone use enable_batching() instead."
+            )
+
+        from llama_cpp import Llama
+
+        n_threads = n_threads if n_threads is not None else self._n_threads
+        worker = copy.copy(self)
+        # copy.copy aliases every attribute; rebuild the state that must not be shared
+        worker._preset_voices = dict(self._preset_voices)
+        worker._init_watermarker()
+        worker._n_threads = n_threads
+        worker.backbone = Llama(
+            model_path=self.backbone.model_path,
+            **self._ggml_context_kwargs(self._backbone_device, n_threads),
+        )
+        worker.prefix_cache = (
+            PrefixStateCache(max_entries=self._prefix_cache_size) if self._prefix_cache_size > 0 else None
+        )
+        return worker
+
     def _load_codec(self, codec_repo: str, codec_device: str):
         if codec_device == "mps" and not torch.backends.mps.is_available():
             logger.warning("Warning: MPS not available for codec, falling back to CPU")
@@ -170,54 +252,144 @@ class VieNeuTTS(BaseVieneuTTS):
             logger.error(f"   ⚠️ Error during unload: {e}")
             return False
 
-    def infer(self, text: str, ref_audio: Optional[Union[str, Path]] = None, ref_codes: Optional[Union[np.ndarray, torch.Tensor]] = None, ref_text: Optional[str] = None, max_chars: int = 256, silence_p: float = 0.15, crossfade_p: float = 0.0, voice: Optional[Dict[str, Any]] = None, temperature: float = 1.0, top_k: int = 50, skip_normalize: bool = False) -> np.ndarray:
+    def infer(self, text: str, ref_audio: Optional[Union[str, Path]] = None, ref_codes: Optional[Union[np.ndarray, torch.Tensor]] = None, ref_text: Optional[str] = None, max_chars: int = 256, silence_p: float = 0.15, crossfade_p: float = 0.0, voice: Optional[Union[Dict[str, Any], PreparedVoice]] = None, temperature: float = 1.0, top_k: int = 50, skip_normalize: bool = False) -> np.ndarray:
 
-        ref_codes, ref_text = self._resolve_ref_voice(voice, ref_audio, ref_codes, ref_text)
+        voice = self.prepare_voice(voice, ref_audio, ref_codes, ref_text)
 
         if not skip_normalize:
-            text = self.normalizer.normalize(text)
+            text = self._normalize_text(text)
+
+        cache_key = self._audio_cache_key(text, voice.identity, temperature, top_k, max_chars=max_chars, silence_p=silence_p, crossfade_p=crossfade_p)
+        seed = None
+        if cache_key is not None:
+            cached = self.audio_cache.get(cache_key)
+            if cached is not None:
+                return cached.copy()
+            seed = self.audio_cache.seed
 
         chunks = split_text_into_chunks(text, max_chars=max_chars)
         if not chunks:
             return np.array([], dtype=np.float32)
 
-        all_wavs = []
-        for chunk in chunks:
-            if self._is_quantized_model:
-                output_str = self._infer_ggml(ref_codes, ref_text, chunk, temperature, top_k)
-            else:
-                prompt_ids = self._apply_chat_template(ref_codes, ref_text, chunk)
-                output_str = self._infer_torch(prompt_ids, temperature, top_k)
-            wav = self._decode(output_str)
-            all_wavs.append(wav)
+        with self._seeded_sampling(seed):
+            all_wavs = self._generate_wavs(voice, chunks, temperature, top_k)
 
-        final_wav = join_audio_chunks(all_wavs, self.sample_rate, silence_p, crossfade_p)
-        return self._apply_watermark(final_wav)
+        final_wav = self._apply_watermark(join_audio_chunks(all_wavs, self.sample_rate, silence_p, crossfade_p))
+        if cache_key is not None:
+            self.audio_cache.put(cache_key, final_wav)
+        return final_wav
 
-    def infer_stream(self, text: str, ref_audio: Optional[Union[str, Path]] = None, ref_codes: Optional[Union[np.ndarray, torch.Tensor]] = None, ref_text: Optional[str] = None, max_chars: int = 256, voice: Optional[Dict[str, Any]] = None, temperature: float = 1.0, top_k: int = 50, skip_normalize: bool = False) -> Generator[np.ndarray, None, None]:
+    def _generate_wavs(self, voice: PreparedVoice, chunks: List[str], temperature: float, top_k: int) -> List[np.ndarray]:
+        if self.batcher is not None and not self._is_quantized_model:
+            # The batcher finishes every chunk together; decode them in one codec call
+            prompts = [self._apply_chat_template(voice, chunk) for chunk in chunks]
+            output_strs = self._generate_torch(prompts, temperature, top_k)
+            return self._decode_batch([extract_speech_ids(output_str) for output_str in output_strs])
 
-        ref_codes, ref_text = self._resolve_ref_voice(voice, ref_audio, ref_codes, ref_text)
+        if self._is_quantized_model:
+            output_strs = (self._infer_ggml(voice, chunk, temperature, top_k) for chunk in chunks)
+        else:
+            output_strs = (self._infer_torch(self._apply_chat_template(voice, chunk), temperature, top_k) for chunk in chunks)
+
+        if self.pipeline_decode and len(chunks) > 1:
+            return self._decode_pipelined(output_strs)
+        return [self._decode(output_str) for output_str in output_strs]
+
+    def _decode_pipelined(self, output_strs: Iterable[str], max_pending: int = 2) -> List[np.ndarray]:
+        """
+        Decode speech token strings on a worker thread while ``output_strs`` keeps generating.
+
+        The worker consumes a bounded FIFO queue, so wavs come back in input order and at
+        most ``max_pending`` finished chunks wait for the codec. llama.cpp and torch release
+        the GIL in their kernels, so generation and decoding genuinely overlap.
+        """
+        pending: "queue.Queue[Any]" = queue.Queue(maxsize=max_pending)
+        done = object()
+        wavs: List[np.ndarray] = []
+        errors: List[BaseException] = []
+
+        def decode_worker():
+            while True:
+                item = pending.get()
+                if item is done:
+                    return
+                if errors:
+                    continue
+                try:
+                    wavs.append(self._decode(item))
+                except BaseException as e:
+                    errors.append(e)
+
+        worker = threading.Thread(target=decode_worker, name="vieneu-decode", daemon=True)
+        worker.start()
+        try:
+            for output_str in output_strs:
+                if errors:
+                    break
+                pending.put(output_str)
+        finally:
+            pending.put(done)
+            worker.join()
+
+        if errors:
+            raise errors[0]
+        return wavs
+
+    def infer_stream(self, text: str, ref_audio: Optional[Union[str, Path]] = None, ref_codes: Optional[Union[np.ndarray, torch.Tensor]] = None, ref_text: Optional[str] = None, max_chars: int = 256, voice: Optional[Union[Dict[str, Any], PreparedVoice]] = None, temperature: float = 1.0, top_k: int = 50, skip_normalize: bool = False, cancel_event: Optional[Any] = None) -> Generator[np.ndarray, None, None]:
+
+        voice = self.prepare_voice(voice, ref_audio, ref_codes, ref_text)
 
         if not skip_normalize:
-            text = self.normalizer.normalize(text)
+            text = self._normalize_text(text)
 
         chunks = split_text_into_chunks(text, max_chars=max_chars)
         for chunk in chunks:
+            if self._is_cancelled(cancel_event):
+                return
             if self._is_quantized_model:
-                yield from self._infer_stream_ggml(ref_codes, ref_text, chunk, temperature, top_k)
+                yield from self._infer_stream_ggml(voice, chunk, temperature, top_k, cancel_event)
             else:
-                prompt_ids = self._apply_chat_template(ref_codes, ref_text, chunk)
-                output_str = self._infer_torch(prompt_ids, temperature, top_k)
+                prompt_ids = self._apply_chat_template(voice, chunk)
+                output_str = self._generate_torch([prompt_ids], temperature, top_k)[0]
                 wav = self._decode(output_str)
                 yield self._apply_watermark(wav)
 
-    def _apply_chat_template(self, ref_codes: Union[List[int], torch.Tensor, np.ndarray], ref_text: str, input_text: str) -> List[int]:
-        if isinstance(ref_codes, (torch.Tensor, np.ndarray)):
-            ref_codes_list = ref_codes.flatten().tolist()
-        else:
-            ref_codes_list = ref_codes
-
-        input_text = phonemize_with_dict(ref_text) + " " + phonemize_with_dict(input_text, skip_normalize=True)
+    def prepare_voice(
+        self,
+        voice: Optional[Union[Dict[str, Any], PreparedVoice]] = None,
+        ref_audio: Optional[Union[str, Path]] = None,
+        ref_codes: Optional[Union[np.ndarray, torch.Tensor, List[int]]] = None,
+        ref_text: Optional[str] = None,
+        warm: bool = False,
+    ) -> PreparedVoice:
+        """
+        Precompute everything voice-specific that each chunk's prompt needs.
+
+        On top of the base handle, the PyTorch backbone gets the reference codes
+        pre-tokenized. With ``warm=True`` a GGUF backbone also evaluates the voice's prompt
+        prefix now and stores its KV state in the prefix cache, so the first request for the
+        voice skips that prefill.
+
+        Returns:
+            PreparedVoice: Immutable voice handle.
+        """
+        prepared = super().prepare_voice(voice, ref_audio, ref_codes, ref_text)
+        if prepared.codes_token_ids is None and self.tokenizer is not None and not self._is_quantized_model:
+            codes_token_ids = tuple(self.tokenizer.encode(prepared.codes_str, add_special_tokens=False))
+            prepared = dataclasses.replace(prepared, codes_token_ids=codes_token_ids)
+        if warm and self._is_quantized_model and self.backbone is not None:
+            self._restore_ggml_prefix(prepared.prompt_prefix)
+        return prepared
+
+    def _apply_chat_template(self, voice: PreparedVoice, input_text: str) -> List[int]:
+        if voice.layout != "default":
+            with self._stage("phonemize"):
+                input_phones = phonemize_with_dict(input_text, skip_normalize=True)
+            prompt = format_prompt(voice.phones, input_phones, voice.codes_str, voice.layout)
+            return self.tokenizer.encode(prompt)
+
+        with self._stage("phonemize"):
+            input_text = voice.phones + " " + phonemize_with_dict(input_text, skip_normalize=True)
 
         speech_replace = self.tokenizer.convert_tokens_to_ids("<|SPEECH_REPLACE|>")
         speech_gen_start = self.tokenizer.convert_tokens_to_ids("<|SPEECH_GENERATION_START|>")
@@ -233,14 +405,16 @@ class VieNeuTTS(BaseVieneuTTS):
         ids = ids[:text_replace_idx] + [text_prompt_start] + input_ids + [text_prompt_end] + ids[text_replace_idx + 1:]
 
         speech_replace_idx = ids.index(speech_replace)
-        codes_str = "".join([f"<|speech_{i}|>" for i in ref_codes_list])
-        codes = self.tokenizer.encode(codes_str, add_special_tokens=False)
+        codes = voice.codes_token_ids
+        if codes is None:
+            codes = self.tokenizer.encode(voice.codes_str, add_special_tokens=False)
         ids = ids[:speech_replace_idx] + [speech_gen_start] + list(codes)
         return ids
 
     def _infer_torch(self, prompt_ids: List[int], temperature: float = 1.0, top_k: int = 50) -> str:
         prompt_tensor = torch.tensor(prompt_ids).unsqueeze(0).to(self.backbone.device)
         speech_end_id = self.tokenizer.convert_tokens_to_ids("<|SPEECH_GENERATION_END|>")
+        start = time.perf_counter()
         with torch.no_grad():
             output_tokens = self.backbone.generate(
                 prompt_tensor,
@@ -253,76 +427,227 @@ class VieNeuTTS(BaseVieneuTTS):
                 min_new_tokens=50,
             )
         input_length = prompt_tensor.shape[-1]
+        if self.metrics is not None:
+            self.metrics.observe_generation(output_tokens.shape[-1] - input_length, time.perf_counter() - start)
         output_str = self.tokenizer.decode(output_tokens[0, input_length:].cpu().numpy().tolist(), add_special_tokens=False)
         return output_str
 
-    def _infer_ggml(self, ref_codes: Union[List[int], torch.Tensor, np.ndarray], ref_text: str, input_text: str, temperature: float = 1.0, top_k: int = 50) -> str:
-        if isinstance(ref_codes, (torch.Tensor, np.ndarray)):
-            ref_codes_list = ref_codes.flatten().tolist()
-        else:
-            ref_codes_list = ref_codes
-
-        ref_text = phonemize_with_dict(ref_text)
-        input_text = phonemize_with_dict(input_text, skip_normalize=True)
-        codes_str = "".join([f"<|speech_{idx}|>" for idx in ref_codes_list])
-        prompt = (
-            f"user: Convert the text to speech:<|TEXT_PROMPT_START|>{ref_text} {input_text}"
-            f"<|TEXT_PROMPT_END|>\nassistant:<|SPEECH_GENERATION_START|>{codes_str}"
-        )
-        output = self.backbone(prompt, max_tokens=self.max_context, temperature=temperature, top_k=top_k, stop=["<|SPEECH_GENERATION_END|>"])
-        return output["choices"][0]["text"]
+    def _infer_torch_batch(self, prompts: List[List[int]], temperature: float = 1.0, top_k: int = 50) -> List[str]:
+        """Run several prompts through one left-padded ``generate`` call."""
+        if len(prompts) == 1:
+            return [self._infer_torch(prompts[0], temperature, top_k)]
 
-    def _infer_stream_ggml(self, ref_codes: Union[np.ndarray, torch.Tensor, List[int]], ref_text: str, input_text: str, temperature: float = 1.0, top_k: int = 50) -> Generator[np.ndarray, None, None]:
-        ref_text = phonemize_with_dict(ref_text)
-        input_text = phonemize_with_dict(input_text, skip_normalize=True)
+        speech_end_id = self.tokenizer.convert_tokens_to_ids("<|SPEECH_GENERATION_END|>")
+        pad_id = self.tokenizer.pad_token_id
+        if pad_id is None:
+            pad_id = speech_end_id
+
+        max_len = max(len(p) for p in prompts)
+        input_ids = torch.full((len(prompts), max_len), pad_id, dtype=torch.long)
+        attention_mask = torch.zeros((len(prompts), max_len), dtype=torch.long)
+        for i, p in enumerate(prompts):
+            input_ids[i, max_len - len(p):] = torch.tensor(p, dtype=torch.long)
+            attention_mask[i, max_len - len(p):] = 1
+
+        start = time.perf_counter()
+        with torch.no_grad():
+            output_tokens = self.backbone.generate(
+                input_ids.to(self.backbone.device),
+                attention_mask=attention_mask.to(self.backbone.device),
+                pad_token_id=pad_id,
+                max_length=self.max_context,
+                eos_token_id=speech_end_id,
+                do_sample=True,
+                temperature=temperature,
+                top_k=top_k,
+                use_cache=True,
+                min_new_tokens=50,
+            )
+
+        outputs = []
+        for row in output_tokens[:, max_len:].cpu().numpy().tolist():
+            # Finished rows are padded after their end token
+            if speech_end_id in row:
+                row = row[:row.index(speech_end_id) + 1]
+            outputs.append(row)
+        if self.metrics is not None:
+            self.metrics.observe_generation(sum(len(row) for row in outputs), time.perf_counter() - start)
+        return [self.tokenizer.decode(row, add_special_tokens=False) for row in outputs]
+
+    def enable_batching(self, max_batch_size: int = 8, max_wait_ms: float = 15.0):
+        """
+        Route PyTorch backbone generation through a cross-request micro-batcher.
+
+        Concurrent ``infer``/``infer_stream`` calls (and the chunks of a single long
+        text) arriving within ``max_wait_ms`` of each other are left-padded into one
+        batched ``generate`` call. Not applicable to GGUF backbones.
+
+        Args:
+            max_batch_size: Maximum number of prompts per ``generate`` call.
+            max_wait_ms: How long the first queued prompt waits for others to join.
+        """
+        if self._is_quantized_model:
+            raise ValueError(
+                "enable_batching requires a PyTorch backbone; for concurrent requests on a GGUF "
+                "backbone use spawn_worker() or BackbonePool instead."
+            )
 
-        if isinstance(ref_codes, (torch.Tensor, np.ndarray)):
-            ref_codes_list = ref_codes.flatten().tolist()
+        from .batching import MicroBatcher
+
+        self.disable_batching()
+        self.batcher = MicroBatcher(self._infer_torch_batch, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms)
+
+    def disable_batching(self):
+        """Stop the micro-batcher, if any, and return to per-request generation."""
+        if self.batcher is not None:
+            self.batcher.close()
+            self.batcher = None
+
+    def _generate_torch(self, prompts: List[List[int]], temperature: float, top_k: int) -> List[str]:
+        """Generate for a list of prompts, through the micro-batcher when enabled."""
+        if self.batcher is None:
+            return [self._infer_torch(p, temperature, top_k) for p in prompts]
+        futures = [self.batcher.submit(p, temperature, top_k) for p in prompts]
+        return [f.result() for f in futures]
+
+    @contextmanager
+    def _seeded_sampling(self, seed: Optional[int]):
+        if seed is None:
+            yield
+        elif self._is_quantized_model:
+            set_seed = getattr(self.backbone, "set_seed", None)
+            if not callable(set_seed):
+                yield
+                return
+            set_seed(seed)
+            try:
+                yield
+            finally:
+                # The seed stays on the worker's llama.cpp context; later requests must not inherit it
+                set_seed(random.SystemRandom().randrange(2 ** 32 - 1))
+        elif self.batcher is None:
+            # The global torch RNG state is restored when the block ends
+            with torch.random.fork_rng():
+                torch.manual_seed(seed)
+                yield
         else:
-            ref_codes_list = ref_codes
+            # Batched generation mixes requests, so a per-request seed is not meaningful there
+            yield
+
+    def _restore_ggml_prefix(self, prefix: str, prefix_tokens: Optional[List[int]] = None):
+        """
+        Make sure the llama.cpp context starts with the evaluated tokens of ``prefix``.
+
+        The following completion call then only evaluates the part of the prompt after
+        the prefix (llama.cpp reuses the longest matching token prefix of its context).
+
+        Args:
+            prefix: Voice-specific prompt head, the cache key.
+            prefix_tokens: Head of the full prompt's tokenization covering ``prefix``. When
+                omitted (warming a voice with no prompt yet), ``prefix`` is tokenized alone.
+
+        Returns:
+            float: Seconds spent evaluating the prefix (0 when its state was cached), for the
+            caller to count as part of the prompt evaluation.
+        """
+        if self.prefix_cache is None:
+            return 0.0
+
+        key = PrefixStateCache.make_key(self._backbone_repo, self.prompt_layout, prefix)
+        entry = self.prefix_cache.get(key)
+        if entry is None:
+            tokens = prefix_tokens if prefix_tokens is not None else self.backbone.tokenize(prefix.encode("utf-8"), special=True)
+            start = time.perf_counter()
+            self.backbone.reset()
+            self.backbone.eval(tokens)
+            elapsed = time.perf_counter() - start
+            self.prefix_cache.put(key, tokens, self.backbone.save_state())
+            return elapsed
+
+        tokens, state = entry
+        if not self._context_starts_with(tokens):
+            self.backbone.load_state(state)
+        return 0.0
+
+    def _count_prefix_tokens(self, tokens: List[int], prefix: str) -> int:
+        """Number of leading ``tokens`` whose text lies entirely within ``prefix``."""
+        prefix_bytes = prefix.encode("utf-8")
+        n = 1 if tokens and tokens[0] == self.backbone.token_bos() else 0
+        n_bytes = 0
+        while n < len(tokens):
+            n_bytes += len(self.backbone.detokenize([tokens[n]], special=True))
+            if n_bytes > len(prefix_bytes):
+                break
+            n += 1
+        return n
+
+    def _context_starts_with(self, tokens: List[int]) -> bool:
+        n = len(tokens)
+        if self.backbone.n_tokens < n:
+            return False
+        return self.backbone.input_ids[:n].tolist() == list(tokens)
+
+    def _format_ggml_prompt(self, voice: PreparedVoice, input_text: str) -> Union[str, List[int]]:
+        return self._prepare_ggml_prompt(voice, input_text)[0]
+
+    def _prepare_ggml_prompt(self, voice: PreparedVoice, input_text: str) -> Tuple[Union[str, List[int]], float]:
+        """Return the llama.cpp prompt and the seconds spent evaluating its voice prefix."""
+        with self._stage("phonemize"):
+            input_phones = phonemize_with_dict(input_text, skip_normalize=True)
+        prompt = format_prompt(voice.phones, input_phones, voice.codes_str, voice.layout)
+        if self.prefix_cache is None:
+            return prompt, 0.0
+
+        # Tokenize the prompt once and cache exactly its head, so the cached prefix always
+        # matches the tokens llama.cpp is given, whatever happens at the prefix boundary
+        tokens = self.backbone.tokenize(prompt.encode("utf-8"), special=True)
+        n_prefix = self._count_prefix_tokens(tokens, voice.prompt_prefix)
+        return tokens, self._restore_ggml_prefix(voice.prompt_prefix, tokens[:n_prefix])
+
+    def _infer_ggml(self, voice: PreparedVoice, input_text: str, temperature: float = 1.0, top_k: int = 50) -> str:
+        prompt, prefix_eval = self._prepare_ggml_prompt(voice, input_text)
+        start = time.perf_counter()
+        output = self.backbone(prompt, max_tokens=self.max_context, temperature=temperature, top_k=top_k, stop=["<|SPEECH_GENERATION_END|>"])
+        if self.metrics is not None:
+            # The completion call does not report its prompt evaluation separately
+            if prefix_eval:
+                self.metrics.observe("prompt_eval", prefix_eval)
+            n_tokens = output.get("usage", {}).get("completion_tokens", 0)
+            self.metrics.observe_generation(n_tokens, time.perf_counter() - start)
+        return output["choices"][0]["text"]
 
-        codes_str = "".join([f"<|speech_{idx}|>" for idx in ref_codes_list])
-        prompt = (
-            f"user: Convert the text to speech:<|TEXT_PROMPT_START|>{ref_text} {input_text}"
-            f"<|TEXT_PROMPT_END|>\nassistant:<|SPEECH_GENERATION_START|>{codes_str}"
-        )
+    def _infer_stream_ggml(self, voice: PreparedVoice, input_text: str, temperature: float = 1.0, top_k: int = 50, cancel_event: Optional[Any] = None) -> Generator[np.ndarray, None, None]:
+        prompt, prefix_eval = self._prepare_ggml_prompt(voice, input_text)
 
-        audio_cache: List[np.ndarray] = []
-        token_cache: List[str] = [f"<|speech_{idx}|>" for idx in ref_codes_list]
-        n_decoded_samples: int = 0
-        n_decoded_tokens: int = len(ref_codes_list)
+        ola = StreamingOverlapAdd(self.streaming_stride_samples)
+        # Seed the decode lookback only with codes the generation actually continues
+        tokens = SpeechTokenBuffer(voice.context_codes)
+        n_decoded_tokens: int = len(voice.context_codes)
 
-        for item in self.backbone(prompt, max_tokens=self.max_context, temperature=temperature, top_k=top_k, stop=["<|SPEECH_GENERATION_END|>"], stream=True):
-            output_str = item["choices"][0]["text"]
-            token_cache.append(output_str)
+        for item in self._timed_generation(self.backbone(prompt, max_tokens=self.max_context, temperature=temperature, top_k=top_k, stop=["<|SPEECH_GENERATION_END|>"], stream=True), prefix_eval):
+            # Leaving the loop closes llama.cpp's completion generator, which stops sampling
+            if self._is_cancelled(cancel_event):
+                return
+            tokens.feed(item["choices"][0]["text"])
 
-            if len(token_cache[n_decoded_tokens:]) >= self.streaming_frames_per_chunk + self.streaming_lookforward:
+            while len(tokens) - n_decoded_tokens >= self.streaming_frames_per_chunk + self.streaming_lookforward:
                 tokens_start = max(n_decoded_tokens - self.streaming_lookback - self.streaming_overlap_frames, 0)
                 tokens_end = n_decoded_tokens + self.streaming_frames_per_chunk + self.streaming_lookforward + self.streaming_overlap_frames
                 sample_start = (n_decoded_tokens - tokens_start) * self.hop_length
                 sample_end = sample_start + (self.streaming_frames_per_chunk + 2 * self.streaming_overlap_frames) * self.hop_length
-                curr_codes = token_cache[tokens_start:tokens_end]
-                recon = self._decode("".join(curr_codes))
+                recon = self._decode_ids(tokens.window(tokens_start, tokens_end))
                 recon = self._apply_watermark(recon)
                 recon = recon[sample_start:sample_end]
-                audio_cache.append(recon)
-
-                processed_recon = _linear_overlap_add(audio_cache, stride=self.streaming_stride_samples)
-                new_samples_end = len(audio_cache) * self.streaming_stride_samples
-                processed_recon = processed_recon[n_decoded_samples:new_samples_end]
-                n_decoded_samples = new_samples_end
+                processed_recon = ola.add(recon)
                 n_decoded_tokens += self.streaming_frames_per_chunk
+                tokens.discard_before(n_decoded_tokens - self.streaming_lookback - self.streaming_overlap_frames)
                 yield processed_recon
 
-        remaining_tokens = len(token_cache) - n_decoded_tokens
+        remaining_tokens = len(tokens) - n_decoded_tokens
         if remaining_tokens > 0:
-            tokens_start = max(len(token_cache) - (self.streaming_lookback + self.streaming_overlap_frames + remaining_tokens), 0)
-            sample_start = (len(token_cache) - tokens_start - remaining_tokens - self.streaming_overlap_frames) * self.hop_length
-            curr_codes = token_cache[tokens_start:]
-            recon = self._decode("".join(curr_codes))
+            tokens_start = max(len(tokens) - (self.streaming_lookback + self.streaming_overlap_frames + remaining_tokens), 0)
+            sample_start = (len(tokens) - tokens_start - remaining_tokens - self.streaming_overlap_frames) * self.hop_length
+            recon = self._decode_ids(tokens.window(tokens_start))
             recon = self._apply_watermark(recon)
             recon = recon[sample_start:]
-            audio_cache.append(recon)
-            processed_recon = _linear_overlap_add(audio_cache, stride=self.streaming_stride_samples)
-            processed_recon = processed_recon[n_decoded_samples:]
-            yield processed_recon
+            yield ola.add(recon, final=True)
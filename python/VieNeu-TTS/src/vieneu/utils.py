@@ -6,6 +6,15 @@ from typing import List, Dict, Optional, Any
 # Persistent cache for weights to avoid recomputing if frame_length is constant
 _WEIGHT_CACHE: Dict[int, np.ndarray] = {}
 
+def _ola_weight(frame_length: int, dtype: Any) -> np.ndarray:
+    """Triangular overlap-add window for a frame of ``frame_length`` samples."""
+    weight = _WEIGHT_CACHE.get(frame_length)
+    if weight is None:
+        t = np.linspace(0, 1, frame_length + 2, dtype=dtype)[1:-1]
+        weight = np.abs(0.5 - (t - 0.5))
+        _WEIGHT_CACHE[frame_length] = weight
+    return weight
+
 def _linear_overlap_add(frames: List[np.ndarray], stride: int) -> np.ndarray:
     """
     Perform linear overlap-add on a list of audio frames.
@@ -37,14 +46,7 @@ def _linear_overlap_add(frames: List[np.ndarray], stride: int) -> np.ndarray:
     offset: int = 0
     for frame in frames:
         frame_length = frame.shape[-1]
-
-        if frame_length not in _WEIGHT_CACHE:
-            # Recompute weight if not in cache
-            t = np.linspace(0, 1, frame_length + 2, dtype=dtype)[1:-1]
-            weight = np.abs(0.5 - (t - 0.5))
-            _WEIGHT_CACHE[frame_length] = weight
-        else:
-            weight = _WEIGHT_CACHE[frame_length]
+        weight = _ola_weight(frame_length, dtype)
 
         out[..., offset : offset + frame_length] += weight * frame
         sum_weight[offset : offset + frame_length] += weight
@@ -54,6 +56,72 @@ def _linear_overlap_add(frames: List[np.ndarray], stride: int) -> np.ndarray:
     safe_sum_weight = np.where(sum_weight > 0, sum_weight, 1.0)
     return out / safe_sum_weight
 
+class StreamingOverlapAdd:
+    """
+    Incremental form of ``_linear_overlap_add`` for streaming.
+
+    Frame ``i`` starts at ``i * stride``. Once it is added, every sample before
+    ``(i + 1) * stride`` is final, because no later frame reaches back that far. Those
+    samples are emitted and dropped, so only the pending overlap tail is kept. Each
+    ``add`` then costs O(frame length) no matter how long the stream already is.
+
+    Concatenating the returned pieces gives the same samples as slicing
+    ``_linear_overlap_add(all_frames, stride)`` the way the streaming loops used to.
+    """
+
+    def __init__(self, stride: int):
+        """
+        Args:
+            stride: Stride between frames in samples.
+        """
+        self.stride = stride
+        self.n_frames = 0
+        self._start = 0  # absolute sample index of the first pending sample
+        self._out: Optional[np.ndarray] = None
+        self._weight: Optional[np.ndarray] = None
+
+    def add(self, frame: np.ndarray, final: bool = False) -> np.ndarray:
+        """
+        Add the next frame and return the samples it finalizes.
+
+        Args:
+            frame: Next audio frame; it starts ``stride`` samples after the previous one.
+            final: Also emit the trailing overlap region (last frame of the stream).
+
+        Returns:
+            Newly finalized samples.
+        """
+        frame_length = frame.shape[-1]
+        offset = self.n_frames * self.stride - self._start
+        if self._out is None:
+            self._out = np.zeros((*frame.shape[:-1], 0), dtype=frame.dtype)
+            self._weight = np.zeros(0, dtype=frame.dtype)
+
+        needed = offset + frame_length - self._out.shape[-1]
+        if needed > 0:
+            self._out = np.concatenate([self._out, np.zeros((*self._out.shape[:-1], needed), dtype=self._out.dtype)], axis=-1)
+            self._weight = np.concatenate([self._weight, np.zeros(needed, dtype=self._weight.dtype)])
+
+        weight = _ola_weight(frame_length, frame.dtype)
+        self._out[..., offset : offset + frame_length] += weight * frame
+        self._weight[offset : offset + frame_length] += weight
+        self.n_frames += 1
+
+        if final:
+            return self._emit(self._start + self._out.shape[-1])
+        return self._emit(self.n_frames * self.stride)
+
+    def _emit(self, end: int) -> np.ndarray:
+        n = end - self._start
+        n_avail = min(n, self._out.shape[-1])
+        weight = self._weight[:n_avail]
+        emitted = self._out[..., :n_avail] / np.where(weight > 0, weight, 1.0)
+        # Past the buffer there are no samples yet; the position still advances to ``end``
+        self._out = self._out[..., n:]
+        self._weight = self._weight[n:]
+        self._start = end
+        return emitted
+
 def _compile_codec_with_triton(codec: Any) -> bool:
     """
     Compile codec with Triton for faster decoding (Windows/Linux compatible).
@@ -91,3 +159,95 @@ RE_SPEECH_TOKEN = re.compile(r"<\|speech_(\d+)\|>")
 def extract_speech_ids(codes_str: str) -> List[int]:
     """Extract speech token IDs from a string using regex."""
     return [int(num) for num in RE_SPEECH_TOKEN.findall(codes_str)]
+
+
+class SpeechTokenBuffer:
+    """
+    Integer speech-token buffer for the streaming decoders.
+
+    Generated text is parsed into ids once, as it arrives, and stored in a NumPy array,
+    so each decode window is a zero-copy slice that goes straight to the codec instead of
+    a ``"".join`` of ``<|speech_N|>`` strings that ``_decode`` re-parses every chunk.
+
+    Indices are absolute positions in the stream. Tokens that no later window will need
+    can be released with :meth:`discard_before`; their space is reclaimed by compacting
+    the live region to the front when the array fills up, so memory stays bounded by the
+    decode window rather than the utterance length. Views returned by :meth:`window` are
+    only valid until the next :meth:`append` or :meth:`feed`.
+    """
+
+    # Longest partial token worth carrying over to the next piece of text
+    _MAX_PENDING = 32
+
+    def __init__(self, initial: Any = (), capacity: int = 1024):
+        """
+        Args:
+            initial: Ids to start with (typically the reference codes).
+            capacity: Initial array size; it grows when the live region does not fit.
+        """
+        initial = np.asarray(initial, dtype=np.int64).reshape(-1)
+        self._buf = np.empty(max(capacity, initial.size, 1), dtype=np.int64)
+        self._head = 0  # array index of the first live token
+        self._tail = 0  # array index one past the last token
+        self._base = 0  # absolute index of ``_buf[_head]``
+        self._pending = ""  # unterminated token text from the previous ``feed``
+        self.append(initial)
+
+    def __len__(self) -> int:
+        """Absolute number of tokens received, including discarded ones."""
+        return self._base + self._tail - self._head
+
+    def append(self, ids: Any):
+        """Append already-parsed ids."""
+        ids = np.asarray(ids, dtype=np.int64).reshape(-1)
+        n = ids.size
+        if n == 0:
+            return
+        if self._tail + n > self._buf.size:
+            live = self._tail - self._head
+            if live + n > self._buf.size:
+                buf = np.empty(max(2 * self._buf.size, live + n), dtype=np.int64)
+                buf[:live] = self._buf[self._head:self._tail]
+                self._buf = buf
+            else:
+                self._buf[:live] = self._buf[self._head:self._tail]
+            self._head, self._tail = 0, live
+        self._buf[self._tail:self._tail + n] = ids
+        self._tail += n
+
+    def feed(self, text: str) -> int:
+        """
+        Parse ``<|speech_N|>`` tokens out of newly generated text and append them.
+
+        A token split across two calls is completed on the next one.
+
+        Returns:
+            Number of ids appended.
+        """
+        text = self._pending + text
+        ids = []
+        last = 0
+        for m in RE_SPEECH_TOKEN.finditer(text):
+            ids.append(int(m.group(1)))
+            last = m.end()
+        rest = text[last:]
+        cut = rest.rfind("<")
+        self._pending = rest[cut:] if cut >= 0 and ">" not in rest[cut:] and len(rest) - cut <= self._MAX_PENDING else ""
+        self.append(ids)
+        return len(ids)
+
+    def window(self, start: int, end: Optional[int] = None) -> np.ndarray:
+        """Return ids ``[start, end)`` (absolute indices) as a view."""
+        if start < self._base:
+            raise ValueError(f"Token {start} was already discarded (buffer starts at {self._base})")
+        live = self._tail - self._head
+        s = self._head + min(start - self._base, live)
+        e = self._tail if end is None else self._head + min(max(end - self._base, 0), live)
+        return self._buf[s:max(s, e)]
+
+    def discard_before(self, index: int):
+        """Release every token before absolute index ``index``."""
+        n = min(index - self._base, self._tail - self._head)
+        if n > 0:
+            self._head += n
+            self._base += n
@@ -0,0 +1,33 @@
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+
+@dataclass(frozen=True)
+class PreparedVoice:
+    """
+    Voice-specific prompt material, computed once by ``prepare_voice``.
+
+    Passing it as ``voice=`` to ``infer``, ``infer_stream`` or ``infer_batch`` skips
+    re-phonemizing the reference transcript and re-rendering (and, for the PyTorch
+    backbone, re-tokenizing) the reference codes for every chunk. Instances are
+    immutable, so one handle can be shared across threads and pool workers.
+    """
+
+    codes: Tuple[int, ...]  # reference speech code ids
+    text: str  # reference transcript
+    phones: str  # phonemized reference transcript
+    codes_str: str  # reference codes rendered as <|speech_N|> tokens
+    layout: str  # prompt layout the prefix was built for
+    prompt_prefix: str  # voice-specific prompt head (the GGUF prefix-cache key)
+    identity: str  # hash of codes and transcript, as used by the audio cache
+    model_id: Optional[str] = None  # model the handle was prepared for
+    codes_token_ids: Optional[Tuple[int, ...]] = None  # tokenized codes_str (PyTorch backbone)
+
+    @property
+    def context_codes(self) -> Tuple[int, ...]:
+        """
+        Codes the generated speech directly continues: the reference codes in the default
+        layout, whose prompt ends with them, and none for ``ref_first``, where generation
+        opens a new speech turn after the reference one.
+        """
+        return self.codes if self.layout == "default" else ()
@@ -4,6 +4,8 @@ from .num2vi import n2w, n2w_single
 from .numerical import normalize_number_vi
 from .datestime import normalize_date, normalize_time
 from .text_norm import normalize_others, expand_measurement, expand_currency, expand_compound_units, expand_abbreviations, expand_standalone_letters
+from .text_norm import collapse_spacing, _expand_float, _strip_dot_sep, RE_RANGE, RE_STANDALONE_DASH, RE_ARROW, RE_FLOAT, RE_DOT_SEP_NUMBER
+from .lexer import lex_vietnamese_text
 
 def clean_vietnamese_text(text):
     mask_map = {}
@@ -23,30 +25,20 @@ def clean_vietnamese_text(text):
     text = normalize_date(text)
     text = normalize_time(text)
 
-    text = re.sub(r'(\d+(?:,\d+)?)\s*[–\-—~]\s*(\d+(?:,\d+)?)', r'\1 đến \2', text)
+    text = RE_RANGE.sub(r'\1 đến \2', text)
     
     # 3. Replace standalone hyphens with commas (for better TTS prosody/pausing)
-    text = re.sub(r'(?<=\s)[–\-—](?=\s)', ',', text)
+    text = RE_STANDALONE_DASH.sub(',', text)
     
-    text = re.sub(r'\s*(?:->|=>)\s*', ' sang ', text)
+    text = RE_ARROW.sub(' sang ', text)
 
     # Expand measurements and currencies BEFORE general floats
     text = expand_compound_units(text)
     text = expand_measurement(text)
     text = expand_currency(text)
 
-    def _expand_float(m):
-        int_part = n2w(m.group(1))
-        dec_part = n2w(m.group(2))
-        res = f"{int_part} phẩy {dec_part}"
-        if m.group(3):
-            res += " phần trăm"
-        return f" {res} "
-    text = re.sub(r'\b(\d+),(\d+)(%)?', _expand_float, text)
-    
-    def _strip_dot_sep(m):
-        return m.group(0).replace('.', '')
-    text = re.sub(r'\b\d+(?:\.\d{3})+\b', _strip_dot_sep, text)
+    text = RE_FLOAT.sub(_expand_float, text)
+    text = RE_DOT_SEP_NUMBER.sub(_strip_dot_sep, text)
     
     text = normalize_others(text)
     text = normalize_number_vi(text)
@@ -54,16 +46,7 @@ def clean_vietnamese_text(text):
     # Finally expand standalone letters to catch initials like "M."
     text = expand_standalone_letters(text)
 
-    # Collapse redundant punctuation and whitespace
-    # 1. Collapse multiple spaces BUT preserve newlines
-    text = re.sub(r'[ \t\xA0]+', ' ', text)
-    # 2. Collapse consecutive commas and handle comma-punctuation pairs
-    text = re.sub(r',\s*,', ',', text)
-    text = re.sub(r',\s*([.!?;])', r'\1', text)
-    # 3. Handle redundant spaces before punctuation
-    text = re.sub(r'\s+([,.!?;:])', r'\1', text)
-    # 4. Remove leading/trailing commas if they end up at the start/end of sentence parts
-    text = text.strip().strip(',')
+    text = collapse_spacing(text)
 
     for mask, original in mask_map.items():
         text = text.replace(mask, original)
@@ -36,9 +36,15 @@ def _expand_day_month(match):
         return f"ngày {n2w(day)} tháng {n2w(month)}"
     return match.group(0)
 
+def _expand_month_year(match):
+    return f"tháng {n2w(str(int(match.group(1))))} năm {n2w(match.group(3))}"
+
 def _norm_time_part(s):
     return '0' if s == '00' else s
 
+def _expand_full_time(match):
+    return f"{n2w(str(int(match.group(1))))} giờ {n2w(str(int(match.group(3))))} phút {n2w(str(int(match.group(5))))} giây"
+
 def _expand_time(match):
     h, sep, m, suffix = match.groups()
     if 0 <= int(h) < 24 and 0 <= int(m) < 60:
@@ -47,18 +53,12 @@ def _expand_time(match):
 
 def normalize_date(text):
     text = RE_FULL_DATE.sub(_expand_full_date, text)
-    text = RE_MONTH_YEAR.sub(
-        lambda m: f"tháng {n2w(str(int(m.group(1))))} năm {n2w(m.group(3))}",
-        text
-    )
+    text = RE_MONTH_YEAR.sub(_expand_month_year, text)
     text = RE_DAY_MONTH.sub(_expand_day_month, text)
     text = RE_REDUNDANT_NGAY.sub('ngày', text)
     return text
 
 def normalize_time(text):
-    text = RE_FULL_TIME.sub(
-        lambda m: f"{n2w(str(int(m.group(1))))} giờ {n2w(str(int(m.group(3))))} phút {n2w(str(int(m.group(5))))} giây",
-        text
-    )
+    text = RE_FULL_TIME.sub(_expand_full_time, text)
     text = RE_TIME.sub(_expand_time, text)
     return text
@@ -0,0 +1,354 @@
+"""
+Lexer-based alternative to the rule cascade in ``clean_vietnamese_text``.
+
+The cascade applies each rule as a whole-string ``re.sub`` and feeds its output to the
+next one. Here the rules are listed in the cascade's order and the input is scanned
+once, left to right, and cut into typed spans (date, time, unit, URL, email, acronym,
+...) that are expanded with the same helpers. Where spans compete the cascade's priority
+decides: at one position the earlier rule wins, and a span gives way to an earlier rule
+matching inside it.
+
+The cascade reads numbers only after everything else has been expanded ("0.5B" is
+"0.5 b" by then), so numbers get a second scan over the expanded text.
+
+On running text the output matches the cascade's. Tokens glued together without a
+space ("$50admin@fpt.vn", "GBv.v") are read as written, whereas the cascade may see
+word boundaries that an earlier expansion added or consumed.
+"""
+import re
+from bisect import bisect_right
+from functools import lru_cache
+from heapq import heapify, heappop, heapreplace
+from typing import Callable, List, NamedTuple, Optional
+
+from .datestime import (
+    RE_FULL_DATE, RE_MONTH_YEAR, RE_DAY_MONTH, RE_FULL_TIME, RE_TIME, RE_REDUNDANT_NGAY,
+    _expand_full_date, _expand_month_year, _expand_day_month, _expand_full_time, _expand_time,
+)
+from .numerical import (
+    RE_ORDINAL, RE_MULTIPLY, RE_PHONE, _number_combined,
+    _expand_ordinal, _expand_multiply_number, _expand_phone, _num_to_words,
+)
+from .text_norm import (
+    RE_STANDALONE_DASH, RE_ARROW, RE_COMPOUND_UNIT, RE_MEASUREMENT, RE_CURRENCY_PREFIX, RE_CURRENCY_SUFFIX,
+    RE_PERCENT, RE_CURRENCY, RE_FLOAT, RE_DOT_SEP_NUMBER, RE_ACRONYM_EXCEPTION, RE_URL, RE_EMAIL,
+    RE_SLASH_NUMBER, RE_ROMAN_NUMBER, RE_LETTER, RE_ALPHANUMERIC, RE_QUOTES, RE_SYMBOLS, RE_BRACKETS,
+    RE_TEMP_C_NEG, RE_TEMP_F_NEG, RE_TEMP_C, RE_TEMP_F, RE_DEGREE, RE_ACRONYM, RE_VERSION, RE_CLEAN_OTHERS,
+    RE_SENTENCE_SPLIT, _abbreviations_vi, _symbols_vi,
+    _expand_compound_match, _expand_measurement_match, _expand_dollar, _expand_percent, _expand_currency_match,
+    _expand_float, _strip_dot_sep, _expand_acronym_exception, _spell_url, _spell_email, _expand_slash,
+    expand_roman, expand_letter, _expand_alphanumeric, _has_road_context, _is_all_caps, _spell_acronym,
+    _expand_version, expand_standalone_letters, collapse_spacing,
+)
+
+RE_EN_PLACEHOLDER = re.compile(r'___PROTECTED_EN_TAG_\d+___')
+RE_ABBREVIATION = re.compile("|".join(re.escape(k) for k in _abbreviations_vi))
+# Only the separator of a range; both numbers are left to the other rules
+RE_RANGE_SEPARATOR = re.compile(r'(?<=\d)\s*[–\-—~]\s*(?=\d)')
+RE_RANGE_END = re.compile(r'\d+(?:,\d+)?')
+RE_BRACKET = re.compile(r'[\(\[\{]\s*|\s*[\)\]\}]')
+RE_NUMBER = re.compile(_number_combined)
+
+
+class _Rule(NamedTuple):
+    name: str
+    pattern: re.Pattern
+    # Returns the replacement, or None to let the next rule try the same position
+    expand: Callable[[re.Match, "_Scan"], Optional[str]]
+    # The replacement still holds raw text for the rules after this one
+    relex: bool = False
+
+
+def _plain(fn):
+    return lambda m, lx: fn(m)
+
+
+def _unless_unchanged(fn):
+    # Date and time helpers hand invalid values back unchanged
+    def expand(m, lx):
+        out = fn(m)
+        return None if out == m.group(0) else out
+    return expand
+
+
+def _expand_range(m, lx):
+    # Both numbers must still be raw: not the end or start of a date or time
+    if lx.follows_earlier_rule(m.start(), _RANGE) or lx.applies_before(_RANGE, m.end(), m.end() + 1) is not None:
+        return None
+    return " đến "
+
+
+def _expand_bracket(m, lx):
+    s = m.group(0)
+    if s[0] in "([{":
+        return ", " if m.start() in lx.brackets() else " " + s[1:]
+    return ", " if m.end() - 1 in lx.brackets() else s[:-1] + " "
+
+
+def _expand_number(m, lx):
+    word = _num_to_words(m.group(0))
+    return f"{word} " if lx.at_line_start() else f" {word} "
+
+
+_KEEP = lambda m, lx: m.group(0)
+_EN_TAG = _Rule("en_tag", RE_EN_PLACEHOLDER, _KEEP)
+
+_SPAN_RULES = (
+    _EN_TAG,
+    _Rule("abbreviation", RE_ABBREVIATION, lambda m, lx: _abbreviations_vi[m.group(0)]),
+    _Rule("full_date", RE_FULL_DATE, _unless_unchanged(_expand_full_date)),
+    _Rule("month_year", RE_MONTH_YEAR, _plain(_expand_month_year)),
+    _Rule("day_month", RE_DAY_MONTH, _unless_unchanged(_expand_day_month)),
+    _Rule("full_time", RE_FULL_TIME, _plain(_expand_full_time)),
+    _Rule("time", RE_TIME, _unless_unchanged(_expand_time)),
+    _Rule("range", RE_RANGE_SEPARATOR, lambda m, lx: _expand_range(m, lx)),
+    _Rule("dash", RE_STANDALONE_DASH, lambda m, lx: ","),
+    _Rule("arrow", RE_ARROW, lambda m, lx: " sang "),
+    _Rule("compound_unit", RE_COMPOUND_UNIT, _plain(_expand_compound_match), relex=True),
+    _Rule("measurement", RE_MEASUREMENT, _plain(_expand_measurement_match)),
+    _Rule("currency_prefix", RE_CURRENCY_PREFIX, _plain(_expand_dollar)),
+    _Rule("currency_suffix", RE_CURRENCY_SUFFIX, _plain(_expand_dollar)),
+    _Rule("percent", RE_PERCENT, _plain(_expand_percent)),
+    _Rule("currency", RE_CURRENCY, _plain(_expand_currency_match)),
+    _Rule("float", RE_FLOAT, _plain(_expand_float)),
+    _Rule("dot_separated", RE_DOT_SEP_NUMBER, _plain(_strip_dot_sep)),
+    _Rule("acronym_exception", RE_ACRONYM_EXCEPTION, _plain(_expand_acronym_exception)),
+    _Rule("url", RE_URL, _plain(_spell_url), relex=True),
+    _Rule("email", RE_EMAIL, _plain(_spell_email), relex=True),
+    _Rule("slash", RE_SLASH_NUMBER, _plain(_expand_slash)),
+    _Rule("roman", RE_ROMAN_NUMBER, _plain(expand_roman)),
+    _Rule("letter", RE_LETTER, _plain(expand_letter)),
+    _Rule("alphanumeric", RE_ALPHANUMERIC, lambda m, lx: _expand_alphanumeric(m, lx.road_context)),
+    _Rule("quote", RE_QUOTES, lambda m, lx: ""),
+    _Rule("symbol", RE_SYMBOLS, lambda m, lx: _symbols_vi[m.group(0)]),
+    _Rule("bracket", RE_BRACKET, _expand_bracket),
+    _Rule("temperature_c_neg", RE_TEMP_C_NEG, lambda m, lx: f"âm {m.group(1)} độ xê"),
+    _Rule("temperature_f_neg", RE_TEMP_F_NEG, lambda m, lx: f"âm {m.group(1)} độ ép"),
+    _Rule("temperature_c", RE_TEMP_C, lambda m, lx: f"{m.group(1)} độ xê"),
+    _Rule("temperature_f", RE_TEMP_F, lambda m, lx: f"{m.group(1)} độ ép"),
+    _Rule("degree", RE_DEGREE, lambda m, lx: " độ "),
+    # Spelled out or kept once the whole sentence is known, see _Lexer._resolve_acronyms
+    _Rule("acronym", RE_ACRONYM, _KEEP),
+)
+
+_RANGE = next(i for i, rule in enumerate(_SPAN_RULES) if rule.name == "range")
+
+_NUMBER_RULES = (
+    _EN_TAG,
+    _Rule("version", RE_VERSION, _plain(_expand_version), relex=True),
+    _Rule("other", RE_CLEAN_OTHERS, lambda m, lx: " "),
+    _Rule("ordinal", RE_ORDINAL, _plain(_expand_ordinal)),
+    _Rule("multiply", RE_MULTIPLY, _plain(_expand_multiply_number)),
+    _Rule("phone", RE_PHONE, _plain(_expand_phone)),
+    _Rule("number", RE_NUMBER, _expand_number),
+)
+
+
+@lru_cache(maxsize=None)
+def _master(rules: tuple, first: int, stop: int) -> re.Pattern:
+    """One alternation of ``rules[first:stop]``, for the first rule that matches at a position;
+    the name of the matched group is the rule index."""
+    parts = []
+    for i in range(first, stop):
+        pattern = rules[i].pattern
+        source = f"(?i:{pattern.pattern})" if pattern.flags & re.IGNORECASE else pattern.pattern
+        parts.append(f"(?P<r{i}>{source})")
+    return re.compile("|".join(parts) or r"(?!)")
+
+
+class _Lexer:
+    """Output of one lexing phase; relexed replacements append to it in place."""
+
+    def __init__(self, rules: tuple, road_context: bool):
+        self.rules = rules
+        self.road_context = road_context
+        self.outs: List[str] = []
+        self.acronyms = []
+        self.last = ""
+
+    def render(self, text: str) -> str:
+        _Scan(self, text, 0).lex(0)
+        if self.acronyms:
+            self._resolve_acronyms()
+        return "".join(self.outs)
+
+    def relex(self, text: str, first: int):
+        # The last character emitted stands in for the left context, for lookbehinds and \b
+        _Scan(self, self.last + text, first).lex(len(self.last))
+
+    def emit(self, out: str):
+        self.outs.append(out)
+        if out:
+            self.last = out[-1]
+
+    def _resolve_acronyms(self):
+        # The cascade spells acronyms out unless their sentence is written in capitals
+        outs = self.outs
+        offsets, total = [], 0
+        for out in outs:
+            offsets.append(total)
+            total += len(out)
+        # English placeholders were lowercase masks when the cascade looked at the sentence
+        joined = RE_EN_PLACEHOLDER.sub(lambda m: "m" * len(m.group(0)), "".join(outs))
+        starts, ends = [0], []
+        for sep in RE_SENTENCE_SPLIT.finditer(joined):
+            ends.append(sep.start())
+            starts.append(sep.end())
+        ends.append(len(joined))
+
+        all_caps = {}
+        for index, m in self.acronyms:
+            s = bisect_right(starts, offsets[index]) - 1
+            if s not in all_caps:
+                all_caps[s] = _is_all_caps(joined[starts[s]:ends[s]])
+            if not all_caps[s]:
+                outs[index] = _spell_acronym(m)
+
+
+class _Scan:
+    """One left-to-right pass of the rules from ``first`` on over ``text``."""
+
+    def __init__(self, lexer: _Lexer, text: str, first: int):
+        self.lexer = lexer
+        self.rules = lexer.rules
+        self.road_context = lexer.road_context
+        self.text = text
+        self.first = first
+        # Rule index -> where its next match may start; the cascade's re.sub consumes
+        # the spans a rule declines, and the right number of a range
+        self.blocked = {}
+        self._brackets = None
+        # Start of a span that gave way to an earlier rule and waits for its replacement
+        self._pending = None
+        self._prev = (-1, -1)
+        # Rule index -> (search start, match) of its last search
+        self._matches = {}
+
+    def brackets(self):
+        # Positions of the brackets the cascade pairs up: an opener and the first closer after it on its line
+        if self._brackets is None:
+            self._brackets = set()
+            for m in RE_BRACKETS.finditer(self.text):
+                self._brackets.update((m.start(), m.end() - 1))
+        return self._brackets
+
+    def at_line_start(self) -> bool:
+        return self.lexer.last in ("", "\n")
+
+    def follows_earlier_rule(self, pos: int, k: int) -> bool:
+        """Whether the span ending at ``pos`` was taken by a rule before ``k``."""
+        return self._prev[0] == pos and self._prev[1] < k
+
+    def lex(self, pos: int):
+        text, emit = self.text, self.lexer.emit
+        # Next match start of each rule, the earliest rule first at a tie: what one
+        # alternation of all of them would find, but each pattern keeps its own fast scan
+        heap = []
+        for k in range(self.first, len(self.rules)):
+            m = self._next(k, pos)
+            if m is not None:
+                heap.append((m.start(), k))
+        heapify(heap)
+        while heap:
+            start, k = heap[0]
+            if start < pos:
+                m = self._next(k, pos)
+                if m is None:
+                    heappop(heap)
+                else:
+                    heapreplace(heap, (m.start(), k))
+                continue
+            if start > pos:
+                emit(text[pos:start])
+            pos = self._token(start, k)
+        if pos < len(text):
+            emit(text[pos:])
+
+    def _next(self, k: int, pos: int) -> Optional[re.Match]:
+        """The leftmost match of rule ``k`` at or after ``pos``; searches are reused while still valid."""
+        searched, m = self._matches.get(k, (None, None))
+        if searched is None or searched > pos or (m is not None and m.start() < pos):
+            m = self.rules[k].pattern.search(self.text, pos)
+            self._matches[k] = (pos, m)
+        return m
+
+    def _accepts(self, k: int, start: int):
+        """The match of rule ``k`` at ``start`` and its replacement, or None if the rule does not apply there."""
+        rule = self.rules[k]
+        m = rule.pattern.match(self.text, start)
+        if m.end() == start or start < self.blocked.get(k, 0):
+            return None
+        out = rule.expand(m, self)
+        if out is None:
+            self.blocked[k] = m.end()
+            return None
+        return m, out
+
+    def applies_before(self, k: int, pos: int, end: int) -> Optional[int]:
+        """The first position in ``[pos, end)`` where a rule before ``k`` applies, if any."""
+        found = None
+        for j in range(self.first, k):
+            p = pos
+            while True:
+                m = self._next(j, p)
+                if m is None or m.start() >= end:
+                    break
+                # Probing must not record declined spans
+                blocked = dict(self.blocked)
+                accepted = self._accepts(j, m.start())
+                self.blocked = blocked
+                if accepted is not None:
+                    found = end = m.start()
+                    break
+                p = m.start() + 1
+        return found
+
+    def _token(self, start: int, k: int) -> int:
+        """Expand the span of rule ``k`` (or of a later rule, if it declines) at ``start`` and return its end."""
+        text, lexer = self.text, self.lexer
+        while True:
+            accepted = self._accepts(k, start)
+            if accepted is not None:
+                break
+            following = _master(self.rules, k + 1, len(self.rules)).match(text, start)
+            if following is None:
+                if self._pending is None:
+                    lexer.emit(text[start])
+                return start + 1
+            k = int(following.lastgroup[1:])
+        m, out = accepted
+
+        preempted = self.applies_before(k, start + 1, m.end())
+        if preempted is not None:
+            # The cascade applies the earlier rule first; this span is redone on its result
+            if self._pending is None:
+                self._pending = start
+            return preempted
+
+        rule = self.rules[k]
+        if rule.name == "range":
+            # The right number may not be the left number of another range, as in "1-2-3"
+            self.blocked[k] = RE_RANGE_END.match(text, m.end()).end() + 1
+        self._prev = (m.end(), k)
+        if self._pending is not None:
+            out = text[self._pending:start] + out
+            self._pending = None
+            lexer.relex(out, k + 1)
+        elif rule.relex:
+            lexer.relex(out, k + 1)
+        else:
+            if rule.name == "acronym":
+                lexer.acronyms.append((len(lexer.outs), m))
+            lexer.emit(out)
+        return m.end()
+
+
+def lex_vietnamese_text(text):
+    """Lexer-based equivalent of ``clean_vietnamese_text``."""
+    road_context = _has_road_context(text)
+    text = _Lexer(_SPAN_RULES, road_context).render(text)
+    text = _Lexer(_NUMBER_RULES, road_context).render(text)
+    # These look at the expanded text as a whole, as the cascade's final passes do
+    text = expand_standalone_letters(text)
+    text = RE_REDUNDANT_NGAY.sub('ngày', text)
+    return collapse_spacing(text)
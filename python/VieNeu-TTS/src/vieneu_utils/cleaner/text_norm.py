@@ -94,6 +94,57 @@ RE_CLEAN_OTHERS = re.compile(r'[^\w\sàáảãạăắằẳẵặâấầẩẫ
 _MAGNITUDE_P = r"\s*(tỷ|triệu|nghìn|ngàn)?\s*"
 _NUMERIC_P = r"((?:\d+[.,])*\d+)"
 
+# Units also expanded without a number, e.g. "đơn vị kg" or "băng tần ghz"
+_STANDALONE_UNITS = {"km", "cm", "mm", "kg", "mg", "m2", "km2", "usd", "vnd", "mhz", "khz", "ghz", "hz"}
+
+# Each rule family is one alternation, scanned once. Alternatives keep the order the
+# rules used to be applied in (longest unit first, acronyms in table order), so the
+# leftmost match is the one the rule-by-rule passes produced.
+_UNITS_BY_LENGTH = sorted(_measurement_key_vi, key=len, reverse=True)
+RE_MEASUREMENT = re.compile(
+    rf"\b{_NUMERIC_P}{_MAGNITUDE_P}({'|'.join(_UNITS_BY_LENGTH)})\b"
+    rf"|(?<![\d.,])\b({'|'.join(u for u in _UNITS_BY_LENGTH if u in _STANDALONE_UNITS)})\b",
+    re.IGNORECASE,
+)
+RE_CURRENCY_PREFIX = re.compile(rf"\$\s*{_NUMERIC_P}{_MAGNITUDE_P}")
+RE_CURRENCY_SUFFIX = re.compile(rf"{_NUMERIC_P}{_MAGNITUDE_P}\$")
+RE_PERCENT = re.compile(rf"{_NUMERIC_P}\s*%")
+RE_CURRENCY = re.compile(
+    rf"\b{_NUMERIC_P}{_MAGNITUDE_P}({'|'.join(u for u in _currency_key if u != '%')})\b", re.IGNORECASE
+)
+RE_COMPOUND_UNIT = re.compile(rf"{_NUMERIC_P}?\s*\b([a-zμµ²³°]+)/([a-zμµ²³°0-9]+)\b", re.IGNORECASE)
+RE_ACRONYM_EXCEPTION = re.compile(rf"\b(?:{'|'.join(_acronyms_exceptions_vi)})\b")
+RE_THOUSANDS_SEP = re.compile(r"\d+(?:\.\d{3})+")
+RE_RANGE = re.compile(r'(\d+(?:,\d+)?)\s*[–\-—~]\s*(\d+(?:,\d+)?)')
+RE_STANDALONE_DASH = re.compile(r'(?<=\s)[–\-—](?=\s)')
+RE_ARROW = re.compile(r'\s*(?:->|=>)\s*')
+RE_FLOAT = re.compile(r'\b(\d+),(\d+)(%)?')
+RE_DOT_SEP_NUMBER = re.compile(r'\b\d+(?:\.\d{3})+\b')
+RE_SPACES = re.compile(r'[ \t\xA0]+')
+RE_DOUBLE_COMMA = re.compile(r',\s*,')
+RE_COMMA_BEFORE_PUNCT = re.compile(r',\s*([.!?;])')
+RE_SPACE_BEFORE_PUNCT = re.compile(r'\s+([,.!?;:])')
+RE_QUOTES = re.compile(r'["\']')
+RE_SYMBOLS = re.compile(r'[&+=#><≥≤±≈]')
+
+_abbreviations_vi = {"v.v": " vân vân", "v/v": " về việc", "ko": " không", "đ/c": "địa chỉ"}
+
+_symbols_vi = {
+    "&": " và ", "+": " cộng ", "=": " bằng ", "#": " thăng ", ">": " lớn hơn ", "<": " nhỏ hơn ",
+    "≥": " lớn hơn hoặc bằng ", "≤": " nhỏ hơn hoặc bằng ", "±": " cộng trừ ", "≈": " xấp xỉ ",
+}
+
+def _rule_value(table, matched, flags=0):
+    """Replacement for ``matched``, whose rule is the first key of ``table`` (a regex source) matching it whole."""
+    value = table.get(matched.lower() if flags & re.IGNORECASE else matched)
+    if value is not None:
+        return value
+    # Case-folded or wildcard matches (e.g. "TP HCM" for "TP.HCM")
+    for key, value in table.items():
+        if re.fullmatch(key, matched, flags):
+            return value
+    return matched
+
 def _expand_number_with_sep(num_str):
     if not num_str: return ""
     if "," in num_str:
@@ -106,70 +157,71 @@ def _expand_number_with_sep(num_str):
     if "." in num_str:
         # Check if it's a thousand separator format (e.g. 1.000, 1.000.000)
         # Vietnamese thousand sep is ALWAYS exactly 3 digits after the dot.
-        if re.fullmatch(r"\d+(?:\.\d{3})+", num_str):
+        if RE_THOUSANDS_SEP.fullmatch(num_str):
             return n2w(num_str.replace(".", ""))
         # Otherwise treat dot as "chấm" (e.g. version 1.3 or English-style decimal 1.5)
         return " chấm ".join([n2w(p) for p in num_str.split(".")])
         
     return n2w(num_str)
 
+def _expand_quantity(m, full):
+    num = m.group(1)
+    mag = m.group(2) if m.group(2) else ""
+    expanded_num = _expand_number_with_sep(num)
+    return f"{expanded_num} {mag} {full}".replace("  ", " ").strip()
+
+def _expand_measurement_match(m):
+    if m.group(3) is not None:
+        return _expand_quantity(m, _rule_value(_measurement_key_vi, m.group(3), re.IGNORECASE))
+    return f" {_rule_value(_measurement_key_vi, m.group(4), re.IGNORECASE)} "
+
+def _expand_currency_match(m):
+    return _expand_quantity(m, _rule_value(_currency_key, m.group(3), re.IGNORECASE))
+
+def _expand_dollar(m):
+    return _expand_quantity(m, "đô la Mỹ")
+
+def _expand_percent(m):
+    return f"{_expand_number_with_sep(m.group(1))} phần trăm"
+
 def expand_measurement(text):
-    def _repl(m, full):
-        num = m.group(1)
-        mag = m.group(2) if m.group(2) else ""
-        expanded_num = _expand_number_with_sep(num)
-        return f"{expanded_num} {mag} {full}".replace("  ", " ").strip()
-    
-    for unit, full in sorted(_measurement_key_vi.items(), key=lambda x: len(x[0]), reverse=True):
-        # Case with number
-        pattern = re.compile(rf"\b{_NUMERIC_P}{_MAGNITUDE_P}{unit}\b", re.IGNORECASE)
-        text = pattern.sub(lambda m, f=full: _repl(m, f), text)
-        
-        # Standalone units
-        safe_standalone = [
-            "km", "cm", "mm", "kg", "mg",
-            "m2", "km2", "usd", "vnd",
-            "mhz", "khz", "ghz", "hz"
-        ]
-        if unit.lower() in safe_standalone:
-            # First try with standard word boundaries
-            standalone_pattern = re.compile(rf"(?<![\d.,])\b{unit}\b", re.IGNORECASE)
-            text = standalone_pattern.sub(f" {full} ", text)
-    return text
+    return RE_MEASUREMENT.sub(_expand_measurement_match, text)
 
 def expand_currency(text):
-    def _repl(m, full):
-        num = m.group(1)
-        mag = m.group(2) if m.group(2) else ""
-        expanded_num = _expand_number_with_sep(num)
-        return f"{expanded_num} {mag} {full}".replace("  ", " ").strip()
-        
-    text = re.sub(rf"\$\s*{_NUMERIC_P}{_MAGNITUDE_P}", lambda m: _repl(m, "đô la Mỹ"), text)
-    text = re.sub(rf"{_NUMERIC_P}{_MAGNITUDE_P}\$", lambda m: _repl(m, "đô la Mỹ"), text)
-    text = re.sub(rf"{_NUMERIC_P}\s*%", lambda m: f"{_expand_number_with_sep(m.group(1))} phần trăm", text)
-    
-    for unit, full in _currency_key.items():
-        if unit == "%": continue
-        pattern = re.compile(rf"\b{_NUMERIC_P}{_MAGNITUDE_P}{unit}\b", re.IGNORECASE)
-        text = pattern.sub(lambda m, f=full: _repl(m, f), text)
-    return text
+    if "$" in text:
+        text = RE_CURRENCY_PREFIX.sub(_expand_dollar, text)
+        text = RE_CURRENCY_SUFFIX.sub(_expand_dollar, text)
+    if "%" in text:
+        text = RE_PERCENT.sub(_expand_percent, text)
+    return RE_CURRENCY.sub(_expand_currency_match, text)
+
+def _expand_compound_match(m):
+    num_str = m.group(1) if m.group(1) else ""
+    num = _expand_number_with_sep(num_str)
+    u1 = m.group(2).lower()
+    u2 = m.group(3).lower()
+    full1 = _measurement_key_vi.get(u1, u1)
+    full2 = _measurement_key_vi.get(u2, u2)
+    res = f" {full1} trên {full2} "
+    if num:
+        res = f"{num} {res}"
+    return res
 
 def expand_compound_units(text):
-    def _repl_compound(m):
-        num_str = m.group(1) if m.group(1) else ""
-        num = _expand_number_with_sep(num_str)
-        u1 = m.group(2).lower()
-        u2 = m.group(3).lower()
-        full1 = _measurement_key_vi.get(u1, u1)
-        full2 = _measurement_key_vi.get(u2, u2)
-        res = f" {full1} trên {full2} "
-        if num:
-            res = f"{num} {res}"
-        return res
-
-    pattern = re.compile(rf"{_NUMERIC_P}?\s*\b([a-zμµ²³°]+)/([a-zμµ²³°0-9]+)\b", re.IGNORECASE)
-    text = pattern.sub(_repl_compound, text)
-    return text
+    if "/" not in text:
+        return text
+    return RE_COMPOUND_UNIT.sub(_expand_compound_match, text)
+
+def _expand_float(m):
+    int_part = n2w(m.group(1))
+    dec_part = n2w(m.group(2))
+    res = f"{int_part} phẩy {dec_part}"
+    if m.group(3):
+        res += " phần trăm"
+    return f" {res} "
+
+def _strip_dot_sep(m):
+    return m.group(0).replace('.', '')
 
 def expand_roman(match):
     roman_numerals = {"I": 1, "V": 5, "X": 10, "L": 50, "C": 100, "D": 500, "M": 1000}
@@ -190,96 +242,105 @@ def expand_letter(match):
     return match.group(0)
 
 def expand_abbreviations(text):
-    abbrs = {"v.v": " vân vân", "v/v": " về việc", "ko": " không", "đ/c": "địa chỉ"}
-    for k, v in abbrs.items():
+    for k, v in _abbreviations_vi.items():
         text = text.replace(k, v)
     return text
 
+def _spell_standalone_letter(m):
+    char = m.group(1).lower()
+    if char in _letter_key_vi:
+        return f" {_letter_key_vi[char]} "
+    return m.group(0)
+
 def expand_standalone_letters(text):
-    def _repl_letter(m):
-        char = m.group(1).lower()
-        if char in _letter_key_vi:
-            return f" {_letter_key_vi[char]} "
-        return m.group(0)
-    
-    return RE_STANDALONE_LETTER.sub(_repl_letter, text)
+    return RE_STANDALONE_LETTER.sub(_spell_standalone_letter, text)
+
+def _spell_url(m):
+    url = m.group(0)
+    res = []
+    for char in url.lower():
+        if char.isalnum():
+            if char.isdigit():
+                res.append(n2w_single(char))
+            else:
+                res.append(_vi_letter_names.get(char, char))
+        elif char == '.': res.append('chấm')
+        elif char == '/': res.append('xẹt')
+        elif char == ':': res.append('hai chấm')
+        elif char == '-': res.append('gạch ngang')
+        elif char == '_': res.append('gạch dưới')
+        elif char == '?': res.append('hỏi')
+        elif char == '&': res.append('và')
+        elif char == '=': res.append('bằng')
+        else: res.append(char)
+    return " ".join(res)
 
 def normalize_urls(text):
-    def _repl_url(m):
-        url = m.group(0)
-        res = []
-        for char in url.lower():
-            if char.isalnum():
-                if char.isdigit():
-                    res.append(n2w_single(char))
-                else:
-                    res.append(_vi_letter_names.get(char, char))
-            elif char == '.': res.append('chấm')
-            elif char == '/': res.append('xẹt')
-            elif char == ':': res.append('hai chấm')
-            elif char == '-': res.append('gạch ngang')
-            elif char == '_': res.append('gạch dưới')
-            elif char == '?': res.append('hỏi')
-            elif char == '&': res.append('và')
-            elif char == '=': res.append('bằng')
-            else: res.append(char)
-        return " ".join(res)
-
-    return RE_URL.sub(_repl_url, text)
+    return RE_URL.sub(_spell_url, text)
+
+def _expand_slash(m):
+    n1 = m.group(1)
+    n2 = m.group(2)
+    # If it's likely an address (first number is large)
+    if len(n1) > 2 or int(n1) > 31:
+        return f"{n2w(n1)} xẹt {n2w(n2)}"
+    return f"{n2w(n1)} trên {n2w(n2)}"
 
 def normalize_slashes(text):
-    def _repl(m):
-        n1 = m.group(1)
-        n2 = m.group(2)
-        # If it's likely an address (first number is large)
-        if len(n1) > 2 or int(n1) > 31:
-            return f"{n2w(n1)} xẹt {n2w(n2)}"
-        return f"{n2w(n1)} trên {n2w(n2)}"
-    return RE_SLASH_NUMBER.sub(_repl, text)
+    return RE_SLASH_NUMBER.sub(_expand_slash, text)
+
+def _spell_email(m):
+    email = m.group(0)
+    parts = email.split('@')
+    if len(parts) != 2: return email
+
+    user_part, domain_part = parts
+
+    # User part: spell out
+    user_norm = []
+    for char in user_part.lower():
+        if char.isalnum():
+            if char.isdigit():
+                user_norm.append(n2w_single(char))
+            else:
+                user_norm.append(_vi_letter_names.get(char, char))
+        elif char == '.': user_norm.append('chấm')
+        elif char == '_': user_norm.append('gạch dưới')
+        elif char == '-': user_norm.append('gạch ngang')
+        else: user_norm.append(char)
+
+    # Domain part
+    domain_part_lower = domain_part.lower()
+    if domain_part_lower in _common_email_domains:
+        domain_norm = _common_email_domains[domain_part_lower]
+    else:
+        domain_parts = domain_part.split('.')
+        norm_domain_parts = []
+        for dp in domain_parts:
+            dp_norm = []
+            for char in dp.lower():
+                if char.isalnum():
+                    if char.isdigit():
+                        dp_norm.append(n2w_single(char))
+                    else:
+                        dp_norm.append(_vi_letter_names.get(char, char))
+                else: dp_norm.append(char)
+            norm_domain_parts.append(" ".join(dp_norm))
+        domain_norm = " chấm ".join(norm_domain_parts)
+
+    return " ".join(user_norm) + " a còng " + domain_norm
 
 def normalize_emails(text):
-    def _repl_email(m):
-        email = m.group(0)
-        parts = email.split('@')
-        if len(parts) != 2: return email
-
-        user_part, domain_part = parts
-
-        # User part: spell out
-        user_norm = []
-        for char in user_part.lower():
-            if char.isalnum():
-                if char.isdigit():
-                    user_norm.append(n2w_single(char))
-                else:
-                    user_norm.append(_vi_letter_names.get(char, char))
-            elif char == '.': user_norm.append('chấm')
-            elif char == '_': user_norm.append('gạch dưới')
-            elif char == '-': user_norm.append('gạch ngang')
-            else: user_norm.append(char)
-
-        # Domain part
-        domain_part_lower = domain_part.lower()
-        if domain_part_lower in _common_email_domains:
-            domain_norm = _common_email_domains[domain_part_lower]
-        else:
-            domain_parts = domain_part.split('.')
-            norm_domain_parts = []
-            for dp in domain_parts:
-                dp_norm = []
-                for char in dp.lower():
-                    if char.isalnum():
-                        if char.isdigit():
-                            dp_norm.append(n2w_single(char))
-                        else:
-                            dp_norm.append(_vi_letter_names.get(char, char))
-                    else: dp_norm.append(char)
-                norm_domain_parts.append(" ".join(dp_norm))
-            domain_norm = " chấm ".join(norm_domain_parts)
-
-        return " ".join(user_norm) + " a còng " + domain_norm
-
-    return RE_EMAIL.sub(_repl_email, text)
+    return RE_EMAIL.sub(_spell_email, text)
+
+def _is_all_caps(sentence):
+    alpha_words = [w for w in sentence.split() if any(c.isalpha() for c in w)]
+    return len(alpha_words) > 0 and all(w.isupper() for w in alpha_words)
+
+def _spell_acronym(m):
+    word = m.group(0)
+    if word.isdigit(): return word
+    return " ".join(_en_letter_names.get(c.lower(), c) for c in word)
 
 def normalize_acronyms(text):
     sentences = RE_SENTENCE_SPLIT.split(text)
@@ -291,24 +352,35 @@ def normalize_acronyms(text):
             processed.append(sep)
             continue
 
-        words = s.split()
-        alpha_words = [w for w in words if any(c.isalpha() for c in w)]
-        is_all_caps = len(alpha_words) > 0 and all(w.isupper() for w in alpha_words)
-
-        if not is_all_caps:
-            def _repl_acronym(m):
-                word = m.group(0)
-                if word.isdigit(): return word
-                return " ".join(_en_letter_names.get(c.lower(), c) for c in word)
-
-            s = RE_ACRONYM.sub(_repl_acronym, s)
+        if not _is_all_caps(s):
+            s = RE_ACRONYM.sub(_spell_acronym, s)
 
         processed.append(s + sep)
     return "".join(processed)
 
+def _expand_acronym_exception(m):
+    return _rule_value(_acronyms_exceptions_vi, m.group(0))
+
+def _expand_alphanumeric(m, road_context):
+    num = m.group(1)
+    char = m.group(2).lower()
+    if char in _letter_key_vi:
+        pronunciation = _letter_key_vi[char]
+        if char == 'd' and road_context:
+            pronunciation = 'đê'
+        return f"{num} {pronunciation}"
+    return m.group(0)
+
+def _has_road_context(text):
+    # "QL1D" / "quốc lộ 1D": the D of a road number is read "đê"
+    lowered = text.lower()
+    return 'quốc lộ' in lowered or 'ql' in lowered
+
+def _expand_version(m):
+    return ' chấm '.join(m.group(1).split('.'))
+
 def normalize_others(text):
-    for k, v in _acronyms_exceptions_vi.items():
-        text = re.sub(rf"\b{k}\b", v, text)
+    text = RE_ACRONYM_EXCEPTION.sub(_expand_acronym_exception, text)
     
     text = normalize_urls(text)
     text = normalize_emails(text)
@@ -317,23 +389,11 @@ def normalize_others(text):
     text = RE_ROMAN_NUMBER.sub(expand_roman, text)
     text = RE_LETTER.sub(expand_letter, text)
     
-    def _expand_alphanumeric(m):
-        num = m.group(1)
-        char = m.group(2).lower()
-        if char in _letter_key_vi:
-            pronunciation = _letter_key_vi[char]
-            if char == 'd' and ('quốc lộ' in text.lower() or 'ql' in text.lower()):
-                pronunciation = 'đê'
-            return f"{num} {pronunciation}"
-        return m.group(0)
-    
-    text = RE_ALPHANUMERIC.sub(_expand_alphanumeric, text)
+    road_context = _has_road_context(text)
+    text = RE_ALPHANUMERIC.sub(lambda m: _expand_alphanumeric(m, road_context), text)
     
-    text = text.replace('"', '').replace("'", '').replace(''', '').replace(''', '')
-    text = text.replace('&', ' và ').replace('+', ' cộng ').replace('=', ' bằng ').replace('#', ' thăng ')
-    text = text.replace('>', ' lớn hơn ').replace('<', ' nhỏ hơn ')
-    text = text.replace('≥', ' lớn hơn hoặc bằng ').replace('≤', ' nhỏ hơn hoặc bằng ')
-    text = text.replace('±', ' cộng trừ ').replace('≈', ' xấp xỉ ')
+    text = RE_QUOTES.sub('', text)
+    text = RE_SYMBOLS.sub(lambda m: _symbols_vi[m.group(0)], text)
 
     text = expand_compound_units(text)
     text = expand_measurement(text)
@@ -350,10 +410,20 @@ def normalize_others(text):
 
     text = normalize_acronyms(text)
 
-    def _expand_version(m):
-        return ' chấm '.join(m.group(1).split('.'))
     text = RE_VERSION.sub(_expand_version, text)
 
     text = RE_CLEAN_OTHERS.sub(' ', text)
     
     return text
+
+def collapse_spacing(text):
+    """Collapse redundant punctuation and whitespace left behind by the expansions."""
+    # 1. Collapse multiple spaces BUT preserve newlines
+    text = RE_SPACES.sub(' ', text)
+    # 2. Collapse consecutive commas and handle comma-punctuation pairs
+    text = RE_DOUBLE_COMMA.sub(',', text)
+    text = RE_COMMA_BEFORE_PUNCT.sub(r'\1', text)
+    # 3. Handle redundant spaces before punctuation
+    text = RE_SPACE_BEFORE_PUNCT.sub(r'\1', text)
+    # 4. Remove leading/trailing commas if they end up at the start/end of sentence parts
+    return text.strip().strip(',')
@@ -8,6 +8,61 @@ RE_NEWLINE = re.compile(r"[\r\n]+")
 RE_SENTENCE_END = re.compile(r"(?<=[\.\!\?\…])\s+")
 RE_MINOR_PUNCT = re.compile(r"(?<=[\,\;\:\-\–\—])\s+")
 
+# Prompt layouts understood by the backbone.
+# - "default": reference text and target text share one text prompt, reference codes follow it.
+#   Only the instruction + reference text head is a reusable prefix.
+# - "ref_first": the reference utterance is a complete first turn (text + codes), the target text
+#   comes after it. Everything voice-specific is a reusable prefix. Requires a model fine-tuned
+#   with the same layout (see finetune/train.py).
+PROMPT_LAYOUTS = ("default", "ref_first")
+
+def format_codes_str(codes: List[int]) -> str:
+    """Render speech code ids as backbone tokens."""
+    return "".join([f"<|speech_{idx}|>" for idx in codes])
+
+def format_prompt_prefix(ref_phones: str, codes_str: str, layout: str = "default") -> str:
+    """
+    Build the voice-specific head shared by every prompt of a voice.
+
+    Args:
+        ref_phones: Phonemized reference transcript.
+        codes_str: Reference speech codes rendered with format_codes_str.
+        layout: One of PROMPT_LAYOUTS.
+
+    Returns:
+        Prompt prefix string.
+    """
+    if layout == "ref_first":
+        return (
+            f"user: Convert the text to speech:<|TEXT_PROMPT_START|>{ref_phones}<|TEXT_PROMPT_END|>"
+            f"\nassistant:<|SPEECH_GENERATION_START|>{codes_str}<|SPEECH_GENERATION_END|>"
+        )
+    if layout == "default":
+        return f"user: Convert the text to speech:<|TEXT_PROMPT_START|>{ref_phones}"
+    raise ValueError(f"Unsupported prompt layout: {layout}. Choose from {PROMPT_LAYOUTS}")
+
+def format_prompt(ref_phones: str, input_phones: str, codes_str: str, layout: str = "default") -> str:
+    """
+    Build the full generation prompt for one text chunk.
+
+    Args:
+        ref_phones: Phonemized reference transcript.
+        input_phones: Phonemized target text.
+        codes_str: Reference speech codes rendered with format_codes_str.
+        layout: One of PROMPT_LAYOUTS.
+
+    Returns:
+        Prompt string ending with the speech generation start marker (and reference codes
+        for the default layout), ready for completion.
+    """
+    prefix = format_prompt_prefix(ref_phones, codes_str, layout)
+    if layout == "ref_first":
+        return (
+            f"{prefix}\nuser: Convert the text to speech:<|TEXT_PROMPT_START|>{input_phones}"
+            f"<|TEXT_PROMPT_END|>\nassistant:<|SPEECH_GENERATION_START|>"
+        )
+    return f"{prefix} {input_phones}<|TEXT_PROMPT_END|>\nassistant:<|SPEECH_GENERATION_START|>{codes_str}"
+
 def join_audio_chunks(chunks: List[np.ndarray], sr: int, silence_p: float = 0.0, crossfade_p: float = 0.0) -> np.ndarray:
     """
     Join audio chunks with optional silence padding and crossfading.
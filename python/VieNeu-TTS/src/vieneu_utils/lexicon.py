@@ -0,0 +1,511 @@
+"""
+Compact, memory-mapped syllable-to-phoneme lexicon.
+
+The lexicon is a prebuilt binary table of the Vietnamese syllable inventory (plus common
+loanwords) and their espeak phonemes, so ``phonemize_with_dict`` can resolve almost every
+word without calling espeak. The file is memory-mapped: opening it costs no parsing and
+the pages are shared between processes.
+
+Layout (little-endian)::
+
+    b"VNLX", version: u32, count: u32
+    key offsets:   (count + 1) x u32, into the key blob
+    value offsets: (count + 1) x u32, into the value blob
+    key blob:      UTF-8 keys, sorted bytewise
+    value blob:    UTF-8 phonemes
+
+Build it with ``python -m vieneu_utils.lexicon`` (requires eSpeak NG).
+"""
+import argparse
+import atexit
+import json
+import logging
+import mmap
+import os
+import struct
+import sys
+import threading
+import unicodedata
+from array import array
+from collections.abc import Mapping, MutableMapping
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger("Vieneu.Lexicon")
+
+MAGIC = b"VNLX"
+VERSION = 1
+_HEADER = struct.Struct("<4sII")
+
+LEXICON_PATH = os.getenv(
+    'PHONEME_LEXICON_PATH',
+    os.path.join(os.path.dirname(__file__), "phoneme_lexicon.bin")
+)
+
+
+def build_lexicon(entries: Mapping, path: str):
+    """Write ``entries`` (word -> phonemes) to ``path`` in the binary lexicon format."""
+    items = sorted((unicodedata.normalize('NFC', k).encode("utf-8"), v.encode("utf-8")) for k, v in entries.items())
+    key_offsets, value_offsets = array("I", [0]), array("I", [0])
+    for key, value in items:
+        key_offsets.append(key_offsets[-1] + len(key))
+        value_offsets.append(value_offsets[-1] + len(value))
+    if sys.byteorder != "little":
+        key_offsets.byteswap()
+        value_offsets.byteswap()
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, len(items)))
+        f.write(key_offsets.tobytes())
+        f.write(value_offsets.tobytes())
+        f.writelines(key for key, _ in items)
+        f.writelines(value for _, value in items)
+    os.replace(tmp_path, path)
+
+
+class Lexicon(Mapping):
+    """Read-only view of a binary lexicon file; lookups binary-search the mapped key table."""
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, count = _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            self._mm.close()
+            raise ValueError(f"{path} is not a version {VERSION} phoneme lexicon")
+        self.path = path
+        self._count = count
+
+        start = _HEADER.size
+        size = 4 * (count + 1)
+        view = memoryview(self._mm)
+        if sys.byteorder == "little":
+            self._key_offsets = view[start:start + size].cast("I")
+            self._value_offsets = view[start + size:start + 2 * size].cast("I")
+        else:
+            self._key_offsets = array("I", view[start:start + size])
+            self._value_offsets = array("I", view[start + size:start + 2 * size])
+            self._key_offsets.byteswap()
+            self._value_offsets.byteswap()
+        self._keys_start = start + 2 * size
+        self._values_start = self._keys_start + self._key_offsets[count]
+
+    def _key(self, i: int) -> bytes:
+        return self._mm[self._keys_start + self._key_offsets[i]:self._keys_start + self._key_offsets[i + 1]]
+
+    def _find(self, word: str) -> int:
+        """Index of ``word`` in the key table, or -1."""
+        if not isinstance(word, str):
+            return -1
+        key = word.encode("utf-8")
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo if lo < self._count and self._key(lo) == key else -1
+
+    def __getitem__(self, word: str) -> str:
+        i = self._find(word)
+        if i < 0:
+            raise KeyError(word)
+        start = self._values_start
+        return self._mm[start + self._value_offsets[i]:start + self._value_offsets[i + 1]].decode("utf-8")
+
+    def __contains__(self, word) -> bool:
+        return self._find(word) >= 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self) -> Iterator[str]:
+        for i in range(self._count):
+            yield self._key(i).decode("utf-8")
+
+
+class LearnedPhonemes:
+    """
+    Bounded store of the phonemes learned from espeak at runtime.
+
+    Reads are plain dict lookups without locking; writers serialize on a lock and evict
+    the oldest entries past ``max_entries``, so memory stays flat however many distinct
+    tokens come through. When ``path`` is set the entries are loaded from it and a
+    background thread writes changes back every ``flush_interval`` seconds (and at exit),
+    so they survive restarts without a request ever waiting on the file.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        max_entries: int = 50000,
+        max_word_length: int = 32,
+        flush_interval: float = 60.0,
+    ):
+        """
+        Args:
+            path: JSON file the entries are persisted to. ``None`` keeps them in memory only.
+            max_entries: Maximum number of entries; the oldest are evicted first.
+            max_word_length: Longer words (spelled-out garbage, URLs) are not stored.
+            flush_interval: Seconds between background write-backs.
+        """
+        self.path = path
+        self.max_entries = max(1, int(max_entries))
+        self.max_word_length = max_word_length
+        self.flush_interval = flush_interval
+        self._entries: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._dirty = False
+        self._closed = threading.Event()
+        self._writer: Optional[threading.Thread] = None
+        self.evictions = 0
+        self.rejected = 0
+        self.flushes = 0
+
+        if path is not None:
+            if os.path.exists(path):
+                try:
+                    with open(path, "r", encoding="utf-8") as f:
+                        entries = json.load(f)
+                    # The newest entries are last in the file
+                    for word, phoneme in list(entries.items())[-self.max_entries:]:
+                        self._entries[word] = phoneme
+                except Exception as e:
+                    logger.warning(f"Ignoring unreadable learned phonemes {path}: {e}")
+            self._writer = threading.Thread(target=self._write_loop, name="learned-phonemes-writer", daemon=True)
+            self._writer.start()
+            atexit.register(self.close)
+
+    def _write_loop(self):
+        while not self._closed.wait(self.flush_interval):
+            self.flush()
+
+    def get(self, word: str) -> Optional[str]:
+        return self._entries.get(word)
+
+    def put(self, word: str, phoneme: str) -> bool:
+        """Store a learned phoneme; returns False if the word is too long to be worth keeping."""
+        if len(word) > self.max_word_length:
+            self.rejected += 1
+            return False
+        with self._lock:
+            if self._entries.get(word) == phoneme:
+                return True
+            self._entries[word] = phoneme
+            while len(self._entries) > self.max_entries:
+                del self._entries[next(iter(self._entries))]
+                self.evictions += 1
+            self._dirty = True
+        return True
+
+    def remove(self, word: str) -> bool:
+        """Drop a learned phoneme; returns False if it was not stored (or already evicted)."""
+        with self._lock:
+            if self._entries.pop(word, None) is None:
+                return False
+            self._dirty = True
+            return True
+
+    def snapshot(self) -> Dict[str, str]:
+        with self._lock:
+            return dict(self._entries)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def flush(self):
+        """Write the entries back to ``path`` if they changed since the last write."""
+        if self.path is None:
+            return
+        with self._flush_lock:
+            with self._lock:
+                if not self._dirty:
+                    return
+                entries = dict(self._entries)
+                self._dirty = False
+
+            tmp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(entries, f, ensure_ascii=False)
+                os.replace(tmp_path, self.path)
+                self.flushes += 1
+            except Exception as e:
+                logger.warning(f"Could not persist learned phonemes: {e}")
+                with self._lock:
+                    self._dirty = True
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+
+    def close(self):
+        """Stop the background writer and write any pending changes."""
+        self._closed.set()
+        if self._writer is not None and self._writer is not threading.current_thread():
+            self._writer.join()
+        self.flush()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "evictions": self.evictions,
+            "rejected": self.rejected,
+            "flushes": self.flushes,
+            "path": self.path,
+        }
+
+
+class PhonemeLexicon(MutableMapping):
+    """
+    The phoneme dictionary used at runtime: overrides (``phoneme_dict.json``), then the
+    words learned from espeak (a bounded :class:`LearnedPhonemes`), then a prebuilt
+    :class:`Lexicon`. Assignments go to the learned store.
+    """
+
+    def __init__(
+        self,
+        lexicon: Optional[Lexicon] = None,
+        overrides: Optional[Mapping] = None,
+        learned: Optional[LearnedPhonemes] = None,
+    ):
+        self.lexicon = lexicon
+        self.overrides: Dict[str, str] = dict(overrides or {})
+        self.learned = learned if learned is not None else LearnedPhonemes()
+        # Counted without locking, so approximate under concurrency
+        self.lexicon_hits = 0
+        self.learned_hits = 0
+        self.misses = 0
+
+    def __getitem__(self, word: str) -> str:
+        phoneme = self.overrides.get(word)
+        if phoneme is not None:
+            return phoneme
+        phoneme = self.learned.get(word)
+        if phoneme is not None:
+            self.learned_hits += 1
+            return phoneme
+        if self.lexicon is None:
+            raise KeyError(word)
+        phoneme = self.lexicon[word]
+        self.lexicon_hits += 1
+        return phoneme
+
+    def get(self, word, default=None):
+        # One lookup per layer, so a concurrent eviction can't slip between a check and a read
+        try:
+            return self[word]
+        except KeyError:
+            self.misses += 1
+            return default
+
+    def __contains__(self, word) -> bool:
+        if (
+            word in self.overrides
+            or self.learned.get(word) is not None
+            or (self.lexicon is not None and word in self.lexicon)
+        ):
+            return True
+        self.misses += 1
+        return False
+
+    def __setitem__(self, word: str, phoneme: str):
+        self.learned.put(word, phoneme)
+
+    def __delitem__(self, word: str):
+        # Prebuilt entries are read-only
+        if word in self.overrides:
+            del self.overrides[word]
+        elif not self.learned.remove(word):
+            raise KeyError(word)
+
+    def _added(self) -> List[str]:
+        learned = [word for word in self.learned.snapshot() if word not in self.overrides]
+        return list(self.overrides) + learned
+
+    def __len__(self) -> int:
+        added = self._added()
+        if self.lexicon is None:
+            return len(added)
+        return len(self.lexicon) + sum(1 for word in added if word not in self.lexicon)
+
+    def __iter__(self) -> Iterator[str]:
+        added = self._added()
+        yield from added
+        if self.lexicon is not None:
+            added = set(added)
+            for word in self.lexicon:
+                if word not in added:
+                    yield word
+
+    def stats(self) -> Dict[str, Any]:
+        """Return lookup counters and the size of each layer."""
+        return {
+            "lexicon_entries": len(self.lexicon) if self.lexicon is not None else 0,
+            "overrides": len(self.overrides),
+            "lexicon_hits": self.lexicon_hits,
+            "learned_hits": self.learned_hits,
+            "misses": self.misses,
+            "learned": self.learned.stats(),
+        }
+
+
+def load_lexicon(
+    path: str = LEXICON_PATH,
+    overrides: Optional[Mapping] = None,
+    learned: Optional[LearnedPhonemes] = None,
+) -> PhonemeLexicon:
+    """Map the prebuilt lexicon at ``path`` if it exists, with ``overrides`` and ``learned`` on top."""
+    lexicon = None
+    if os.path.exists(path):
+        lexicon = Lexicon(path)
+    else:
+        logger.warning(
+            f"Phoneme lexicon not found at {path}; words outside the dictionary fall back to espeak. "
+            "Build it with `python -m vieneu_utils.lexicon` (or `make lexicon`)."
+        )
+    return PhonemeLexicon(lexicon, overrides, learned)
+
+
+# --- Syllable inventory ----------------------------------------------------
+
+_ONSETS = (
+    "", "b", "c", "ch", "d", "đ", "g", "gh", "gi", "h", "k", "kh", "l", "m", "n", "ng",
+    "ngh", "nh", "p", "ph", "qu", "r", "s", "t", "th", "tr", "v", "x",
+)
+
+_RHYMES = (
+    "a ac ach ai am an ang anh ao ap at au ay "
+    "ăc ăm ăn ăng ăp ăt âc âm ân âng âp ât âu ây "
+    "e ec em en eng eo ep et ê êch êm ên ênh êp êt êu "
+    "i ia ich iêc iêm iên iêng iêp iêt iêu im in inh ip it iu "
+    "o oa oac oach oai oam oan oang oanh oao oap oat oay oăc oăm oăn oăng oăt "
+    "oc oe oen oeo oet oi om on ong ooc oong op ot "
+    "ô ôc ôi ôm ôn ông ôp ôt ơ ơi ơm ơn ơp ơt "
+    "u ua uân uâng uât uây uc uê uêch uênh ui um un ung uôc uôi uôm uôn uông uôt up ut "
+    "uy uya uych uyên uyêt uyn uynh uyp uyt uyu "
+    "ư ưa ưc ưi ưm ưn ưng ươc ươi ươm ươn ương ươp ươt ươu ưt ưu "
+    "y yêm yên yêng yêt yêu"
+).split()
+
+_VOWELS = set("aăâeêioôơuưy")
+_MARKED = set("ăâêôơư")
+_FRONT = set("eêiy")
+# Sắc, huyền, hỏi, ngã, nặng
+_TONES = ("\u0301", "\u0300", "\u0309", "\u0303", "\u0323")
+_STOPS = ("c", "ch", "p", "t")
+
+LOANWORDS = (
+    "ok", "okay", "internet", "online", "offline", "email", "video", "wifi", "web", "website",
+    "app", "laptop", "smartphone", "game", "show", "livestream", "marketing", "startup", "youtube",
+    "facebook", "zalo", "google", "iphone", "tivi", "radio", "taxi", "pizza", "menu", "sale",
+    "shop", "fan", "team", "camera", "container", "virus", "vaccine", "robot", "chat", "selfie",
+)
+
+
+def _onset_fits(onset: str, rhyme: str) -> bool:
+    # Spelling rules: k, gh, ngh only before front vowels; c, g, ng never; qu takes no o/u glide
+    front = rhyme[0] in _FRONT
+    if onset in ("k", "gh", "ngh"):
+        return front
+    if onset in ("c", "g", "ng"):
+        return not front
+    if onset == "qu":
+        return rhyme[0] not in "ou"
+    if rhyme[0] == "y" and len(rhyme) > 1:
+        return onset == ""
+    return True
+
+
+def _tone_positions(onset: str, rhyme: str) -> List[int]:
+    """Indices into ``rhyme`` that may carry the tone mark (two for oa/oe/uy: old and new style)."""
+    nucleus = [i for i, ch in enumerate(rhyme) if ch in _VOWELS]
+    marked = [i for i in nucleus if rhyme[i] in _MARKED]
+    if marked:
+        return [marked[-1]]
+    has_coda = nucleus[-1] < len(rhyme) - 1
+    if len(nucleus) == 1 or has_coda:
+        return [nucleus[-1]]
+    if rhyme in ("oa", "oe", "uy"):
+        return nucleus
+    if len(nucleus) == 3:
+        return [nucleus[1]]
+    # After qu and gi the glide belongs to the onset: "quá", "già"
+    return [nucleus[-1]] if onset in ("qu", "gi") else [nucleus[0]]
+
+
+def vietnamese_syllables() -> Iterator[str]:
+    """Yield the written Vietnamese syllables, with every tone and both tone-mark styles."""
+    seen = set()
+    for onset in _ONSETS:
+        for rhyme in _RHYMES:
+            if not _onset_fits(onset, rhyme):
+                continue
+            written = onset
+            if onset == "gi" and rhyme[0] == "i":
+                # The i is shared: gi + iêng is "giêng", gi + i is "gì"
+                written = "g"
+            tones = _TONES[:1] + _TONES[4:] if rhyme.endswith(_STOPS) else ("",) + _TONES
+            positions = _tone_positions(written, rhyme)
+            for tone in tones:
+                for pos in positions if tone else [0]:
+                    syllable = written + (rhyme[:pos + 1] + tone + rhyme[pos + 1:] if tone else rhyme)
+                    syllable = unicodedata.normalize('NFC', syllable)
+                    if syllable not in seen:
+                        seen.add(syllable)
+                        yield syllable
+
+
+def _phonemize_words(words: List[str], batch_size: int) -> Iterator[Tuple[str, str]]:
+    from phonemizer import phonemize
+    from vieneu_utils.phonemize_text import setup_espeak_library
+
+    setup_espeak_library()
+    for start in range(0, len(words), batch_size):
+        batch = words[start:start + batch_size]
+        phonemes = phonemize(
+            batch,
+            language='vi',
+            backend='espeak',
+            preserve_punctuation=True,
+            with_stress=True,
+            language_switch='remove-flags'
+        )
+        for word, phoneme in zip(batch, phonemes):
+            phoneme = phoneme.strip()
+            # Same adjustment as phonemize_with_dict applies to espeak output
+            if word.startswith('r') and phoneme:
+                phoneme = 'ɹ' + phoneme[1:]
+            if phoneme:
+                yield word, phoneme
+
+
+def main(argv: Optional[Iterable[str]] = None):
+    parser = argparse.ArgumentParser(description="Build the binary phoneme lexicon with eSpeak NG")
+    parser.add_argument("--output", type=str, default=LEXICON_PATH, help="Path of the lexicon file")
+    parser.add_argument("--words", type=str, action="append", default=[], help="Extra word list, one word per line")
+    parser.add_argument("--dict", type=str, default=None, help="JSON word -> phonemes entries that override espeak")
+    parser.add_argument("--batch-size", type=int, default=2000, help="Words per espeak call")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    words = list(vietnamese_syllables()) + list(LOANWORDS)
+    for path in args.words:
+        with open(path, "r", encoding="utf-8") as f:
+            words.extend(unicodedata.normalize('NFC', line.strip()).lower() for line in f if line.strip())
+    words = list(dict.fromkeys(words))
+
+    logger.info(f"Phonemizing {len(words)} words...")
+    entries = dict(_phonemize_words(words, args.batch_size))
+    if args.dict:
+        with open(args.dict, "r", encoding="utf-8") as f:
+            entries.update(json.load(f))
+
+    build_lexicon(entries, args.output)
+    logger.info(f"Wrote {len(entries)} entries to {args.output} ({os.path.getsize(args.output) / 1024:.0f} KiB)")
+
+
+if __name__ == "__main__":
+    main()
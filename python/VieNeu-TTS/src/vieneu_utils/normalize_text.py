@@ -1,6 +1,12 @@
 import re
 import unicodedata
-from .cleaner import clean_vietnamese_text
+from .cleaner import clean_vietnamese_text, lex_vietnamese_text
+from .memo import MemoCache
+
+_ENGINES = {
+    "cascade": clean_vietnamese_text,
+    "lexer": lex_vietnamese_text,
+}
 
 class VietnameseTTSNormalizer:
     """
@@ -9,14 +15,35 @@ class VietnameseTTSNormalizer:
     All core logic is implemented in the cleaner module.
     """
     
-    def __init__(self):
-        pass
+    def __init__(self, engine="cascade", cache_size=1024):
+        """
+        Args:
+            engine: "cascade" applies the cleaner rules one whole-text pass at a time;
+                "lexer" cuts the text into typed spans in a single scan and expands
+                each one, which stays linear on long documents. Both give the same
+                output on running text; on tokens glued together without spaces the
+                lexer reads them as written rather than after earlier expansions.
+            cache_size: Number of recent inputs whose output is memoized. 0 disables the memo.
+        """
+        if engine not in _ENGINES:
+            raise ValueError(f"Unknown normalizer engine {engine!r}, expected one of {sorted(_ENGINES)}")
+        self.engine = engine
+        self._clean = _ENGINES[engine]
+        self.cache = MemoCache(cache_size)
     
     def normalize(self, text):
         """Main normalization pipeline with EN tag protection."""
         if not text:
             return ""
 
+        # Reference transcripts and repeated sentences come back verbatim
+        normalized = self.cache.get(text)
+        if normalized is None:
+            normalized = self._normalize(text)
+            self.cache.put(text, normalized)
+        return normalized
+
+    def _normalize(self, text):
         # Pre-normalization: Ensure NFC format for Vietnamese characters
         text = unicodedata.normalize('NFC', text)
 
@@ -31,7 +58,7 @@ class VietnameseTTSNormalizer:
         text = re.sub(r'<en>.*?</en>', extract_en, text, flags=re.IGNORECASE)
         
         # Step 2: Core Normalization
-        text = clean_vietnamese_text(text)
+        text = self._clean(text)
         
         # Final cleanup - preserve newlines
         text = text.lower()
@@ -6,6 +6,8 @@ import re
 from phonemizer import phonemize
 from phonemizer.backend.espeak.espeak import EspeakWrapper
 from vieneu_utils.normalize_text import VietnameseTTSNormalizer
+from vieneu_utils.memo import MemoCache
+from vieneu_utils.lexicon import LearnedPhonemes, PhonemeLexicon, load_lexicon
 
 # Configuration
 PHONEME_DICT_PATH = os.getenv(
@@ -85,14 +87,24 @@ def _setup_macos_espeak():
 # Initialize
 setup_espeak_library()
 
+normalizer = VietnameseTTSNormalizer()
 try:
-    phoneme_dict = load_phoneme_dict()
-    normalizer = VietnameseTTSNormalizer()
+    # The memory-mapped lexicon (see vieneu_utils.lexicon), with phoneme_dict.json entries on top
+    overrides = load_phoneme_dict() if os.path.exists(PHONEME_DICT_PATH) else {}
+    # Words espeak phonemized at runtime; bounded, and persisted if PHONEME_LEARNED_PATH is set
+    learned = LearnedPhonemes(
+        os.getenv('PHONEME_LEARNED_PATH') or None,
+        max_entries=int(os.getenv('PHONEME_LEARNED_MAX', '50000')),
+    )
+    phoneme_dict = load_lexicon(overrides=overrides, learned=learned)
 except Exception as e:
     print(f"Initialization error: {e}")
-    # We still need normalizer to function
-    normalizer = VietnameseTTSNormalizer()
-    phoneme_dict = {}
+    phoneme_dict = PhonemeLexicon()
+
+# Phonemized output of recent inputs, keyed by the exact text and skip_normalize. Only
+# calls using the shared phoneme_dict are memoized: a caller's own dictionary may differ.
+phoneme_cache = MemoCache(int(os.getenv('PHONEME_CACHE_SIZE', '4096')))
+_shared_phoneme_dict = phoneme_dict
 
 def phonemize_text(text: str) -> str:
     """
@@ -114,8 +126,17 @@ def phonemize_with_dict(text: str, phoneme_dict=phoneme_dict, skip_normalize: bo
     """
     Phonemize single text with dictionary lookup and EN tag support.
     """
+    memoize = phoneme_dict is _shared_phoneme_dict
+    key = (text, skip_normalize)
+    if memoize:
+        cached = phoneme_cache.get(key)
+        if cached is not None:
+            return cached
+
     if not skip_normalize:
         text = normalizer.normalize(text)
+    # Outputs that fell back to raw text are not memoized
+    complete = True
     
     # Split by EN tags
     parts = re.split(r'(<en>.*?</en>)', text, flags=re.IGNORECASE)
@@ -144,10 +165,11 @@ def phonemize_with_dict(text: str, phoneme_dict=phoneme_dict, skip_normalize: bo
                 match = re.match(r'^(\W*)(.*?)(\W*)$', word)
                 pre, core, suf = match.groups() if match else ("", word, "")
                 
+                phoneme = phoneme_dict.get(core) if core else None
                 if not core:
                     processed_words.append(word)
-                elif core in phoneme_dict:
-                    processed_words.append(f"{pre}{phoneme_dict[core]}{suf}")
+                elif phoneme is not None:
+                    processed_words.append(f"{pre}{phoneme}{suf}")
                 else:
                     vi_texts.append(word)
                     vi_indices.append(part_idx)
@@ -174,6 +196,7 @@ def phonemize_with_dict(text: str, phoneme_dict=phoneme_dict, skip_normalize: bo
                 processed_parts[part_idx] = phoneme.strip()
         except Exception as e:
             print(f"Warning: Could not phonemize EN texts: {e}")
+            complete = False
             for part_idx in en_indices:
                 processed_parts[part_idx] = en_texts[en_indices.index(part_idx)]
     
@@ -204,6 +227,7 @@ def phonemize_with_dict(text: str, phoneme_dict=phoneme_dict, skip_normalize: bo
                     processed_parts[part_idx][word_idx] = phoneme
         except Exception as e:
             print(f"Warning: Could not phonemize VI texts: {e}")
+            complete = False
             for idx, (part_idx, word_idx) in enumerate(vi_word_maps):
                 if processed_parts[part_idx] is not None:
                     processed_parts[part_idx][word_idx] = vi_texts[idx]
@@ -218,7 +242,9 @@ def phonemize_with_dict(text: str, phoneme_dict=phoneme_dict, skip_normalize: bo
     result = ' '.join(final_parts)
     
     result = re.sub(r'\s+([.,!?;:])', r'\1', result)
-    
+
+    if memoize and complete:
+        phoneme_cache.put(key, result)
     return result
 
 
@@ -234,6 +260,25 @@ def phonemize_batch(texts: list, phoneme_dict=phoneme_dict, skip_normalize: bool
     Returns:
         List of phonemized texts
     """
+    if phoneme_dict is not _shared_phoneme_dict:
+        return _phonemize_batch(texts, phoneme_dict, skip_normalize)[0]
+
+    results = [phoneme_cache.get((text, skip_normalize)) for text in texts]
+    # Each distinct miss is phonemized once, in a single batch
+    missing = list(dict.fromkeys(text for text, result in zip(texts, results) if result is None))
+    if missing:
+        phonemized, complete = _phonemize_batch(missing, phoneme_dict, skip_normalize)
+        if complete:
+            for text, result in zip(missing, phonemized):
+                phoneme_cache.put((text, skip_normalize), result)
+        phonemized = dict(zip(missing, phonemized))
+        results = [phonemized[text] if result is None else result for text, result in zip(texts, results)]
+    return results
+
+
+def _phonemize_batch(texts: list, phoneme_dict, skip_normalize: bool):
+    """Uncached body of ``phonemize_batch``; also reports whether every part was phonemized."""
+    complete = True
     if skip_normalize:
         normalized_texts = texts
     else:
@@ -265,10 +310,11 @@ def phonemize_batch(texts: list, phoneme_dict=phoneme_dict, skip_normalize: bool
                     match = re.match(r'^(\W*)(.*?)(\W*)$', word)
                     pre, core, suf = match.groups() if match else ("", word, "")
                     
+                    phoneme = phoneme_dict.get(core) if core else None
                     if not core:
                         processed_words.append(word)
-                    elif core in phoneme_dict:
-                        processed_words.append(f"{pre}{phoneme_dict[core]}{suf}")
+                    elif phoneme is not None:
+                        processed_words.append(f"{pre}{phoneme}{suf}")
                     else:
                         all_vi_texts.append(word)
                         all_vi_maps.append((text_idx, part_idx, len(processed_words)))
@@ -296,6 +342,7 @@ def phonemize_batch(texts: list, phoneme_dict=phoneme_dict, skip_normalize: bool
                 results[text_idx][part_idx] = phoneme.strip()
         except Exception as e:
             print(f"Warning: Batch EN phonemization failed: {e}")
+            complete = False
     
     if all_vi_texts:
         try:
@@ -322,6 +369,7 @@ def phonemize_batch(texts: list, phoneme_dict=phoneme_dict, skip_normalize: bool
                 results[text_idx][part_idx][word_idx] = phoneme
         except Exception as e:
             print(f"Warning: Batch VI phonemization failed: {e}")
+            complete = False
     
     final_results = []
     for processed_parts in results:
@@ -336,4 +384,4 @@ def phonemize_batch(texts: list, phoneme_dict=phoneme_dict, skip_normalize: bool
         result = re.sub(r'\s+([.,!?;:])', r'\1', result)
         final_results.append(result)
     
-    return final_results
\ No newline at end of file
+    return final_results, complete
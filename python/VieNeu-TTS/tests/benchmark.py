@@ -1,8 +1,9 @@
+import sys
 import time
 import numpy as np
 from vieneu_utils.normalize_text import VietnameseTTSNormalizer
 from vieneu_utils.phonemize_text import phonemize_with_dict
-from vieneu_utils.core_utils import split_text_into_chunks
+from vieneu_utils.core_utils import split_text_into_chunks, PROMPT_LAYOUTS
 
 def benchmark_normalization(n_iterations=100):
     normalizer = VietnameseTTSNormalizer()
@@ -38,8 +39,113 @@ def benchmark_text_splitting(n_iterations=100):
     avg_time = (end - start) / n_iterations
     print(f"Average Text Splitting Time: {avg_time*1000:.4f} ms")
 
+def benchmark_prefill_layouts(backbone_repo="pnnbao-ump/VieNeu-TTS-0.3B-q4-gguf", n_iterations=5):
+    """Compare GGUF prompt prefill time on CPU for each prompt layout, with and without the prefix cache."""
+    from vieneu import VieNeuTTS
+    from vieneu.cache import PrefixStateCache
+
+    tts = VieNeuTTS(backbone_repo=backbone_repo, backbone_device="cpu")
+    voices = [tts.get_preset_voice(v) for _, v in tts.list_preset_voices()[:2]]
+    texts = ["xin chào quý khách", "bạn cần tôi tư vấn thêm gì không", "số tổng đài là một chín không không"]
+
+    for layout in PROMPT_LAYOUTS:
+        for use_cache in (False, True):
+            tts.prompt_layout = layout
+            tts.prefix_cache = PrefixStateCache() if use_cache else None
+            timings, evaluated = [], []
+            for i in range(n_iterations * len(texts)):
+                # Alternate voices so the context never simply continues from the previous call
+                voice = voices[i % len(voices)]
+                prepared = tts.prepare_voice(voice)
+                start = time.time()
+                prompt = tts._format_ggml_prompt(prepared, texts[i % len(texts)])
+                prompt_tokens = prompt if isinstance(prompt, list) else tts.backbone.tokenize(prompt.encode("utf-8"), special=True)
+                # Tokens llama.cpp has to evaluate: everything past the context it can reuse
+                context = tts.backbone.input_ids[:tts.backbone.n_tokens].tolist()
+                reused = next((n for n, (a, b) in enumerate(zip(context, prompt_tokens)) if a != b), min(len(context), len(prompt_tokens)))
+                next(iter(tts.backbone(prompt_tokens, max_tokens=1, temperature=1.0, top_k=50, stream=True)))
+                timings.append(time.time() - start)
+                evaluated.append(len(prompt_tokens) - reused)
+            # Skip the first round, which fills the cache
+            steady, steady_evaluated = timings[len(voices):], evaluated[len(voices):]
+            print(f"Prefill [{layout:9s}] prefix_cache={'on ' if use_cache else 'off'}: "
+                  f"{np.mean(steady)*1000:.1f} ms avg, {np.percentile(steady, 95)*1000:.1f} ms p95, "
+                  f"{np.mean(steady_evaluated):.0f} prompt tokens evaluated")
+
+    tts.close()
+
+def benchmark_streaming_decode(codec_repo="neuphonic/distill-neucodec", n_frames=600, lookbacks=(100, 50, 25, 10), n_iterations=2):
+    """
+    Codec cost of the windowed streaming decode used by ``infer_stream``, per emitted second of audio.
+
+    Each chunk re-decodes ``streaming_lookback`` old frames because the codec decoder is a
+    bidirectional transformer with GroupNorm over time: every activation depends on the whole
+    window, so there is no decoder state to carry between chunks. The only lever is how much
+    left context each window gets. This reports the cost of each lookback against a one-shot
+    decode, and the SNR of the stitched stream relative to the default lookback.
+    """
+    from vieneu import VieNeuTTS
+    from vieneu.utils import StreamingOverlapAdd, SpeechTokenBuffer
+
+    tts = VieNeuTTS(backbone_repo=None, codec_repo=codec_repo)
+    tts._apply_watermark = lambda wav: wav
+    try:
+        ids = tts.get_preset_voice()["codes"].flatten().tolist()
+    except Exception:
+        ids = np.random.default_rng(0).integers(0, 65536, n_frames).tolist()
+    ids = (ids * (n_frames // max(len(ids), 1) + 1))[:n_frames]
+    emitted_seconds = n_frames * tts.hop_length / tts.sample_rate
+
+    def stream(lookback):
+        # Same windowing as VieNeuTTS._infer_stream_ggml, fed one token at a time
+        tts.streaming_lookback = lookback
+        ola = StreamingOverlapAdd(tts.streaming_stride_samples)
+        tokens = SpeechTokenBuffer()
+        n_decoded, pieces = 0, []
+        for token_id in ids:
+            tokens.append([token_id])
+            while len(tokens) - n_decoded >= tts.streaming_frames_per_chunk + tts.streaming_lookforward:
+                start = max(n_decoded - lookback - tts.streaming_overlap_frames, 0)
+                end = n_decoded + tts.streaming_frames_per_chunk + tts.streaming_lookforward + tts.streaming_overlap_frames
+                sample_start = (n_decoded - start) * tts.hop_length
+                sample_end = sample_start + (tts.streaming_frames_per_chunk + 2 * tts.streaming_overlap_frames) * tts.hop_length
+                pieces.append(ola.add(tts._decode_ids(tokens.window(start, end))[sample_start:sample_end]))
+                n_decoded += tts.streaming_frames_per_chunk
+        remaining = len(tokens) - n_decoded
+        if remaining > 0:
+            start = max(n_decoded - lookback - tts.streaming_overlap_frames, 0)
+            sample_start = (len(tokens) - start - remaining - tts.streaming_overlap_frames) * tts.hop_length
+            pieces.append(ola.add(tts._decode_ids(tokens.window(start))[sample_start:], final=True))
+        return np.concatenate(pieces)
+
+    def timed(fn):
+        fn()  # warmup
+        start = time.time()
+        for _ in range(n_iterations):
+            out = fn()
+        return (time.time() - start) / n_iterations, out
+
+    default_lookback = tts.streaming_lookback
+    secs, _ = timed(lambda: tts._decode_ids(ids))
+    print(f"Codec decode [one-shot      ]: {secs / emitted_seconds * 1000:.1f} ms per emitted second")
+
+    _, reference = timed(lambda: stream(default_lookback))
+    for lookback in sorted(set(lookbacks) | {default_lookback}, reverse=True):
+        secs, out = timed(lambda: stream(lookback))
+        n = min(len(out), len(reference))
+        noise = np.sum((out[:n] - reference[:n]) ** 2)
+        snr = 10 * np.log10(np.sum(reference[:n] ** 2) / noise) if noise > 0 else float("inf")
+        print(f"Codec decode [lookback={lookback:4d}]: {secs / emitted_seconds * 1000:.1f} ms per emitted second, "
+              f"SNR vs lookback={default_lookback}: {snr:.1f} dB")
+    tts.streaming_lookback = default_lookback
+
+
 if __name__ == "__main__":
     print("=== VieNeu-TTS Benchmarks ===")
     benchmark_normalization()
     benchmark_phonemization()
     benchmark_text_splitting()
+    if "--prefill" in sys.argv:
+        benchmark_prefill_layouts()
+    if "--streaming-decode" in sys.argv:
+        benchmark_streaming_decode()
@@ -1,6 +1,6 @@
 import numpy as np
 import pytest
-from vieneu.utils import _linear_overlap_add
+from vieneu.utils import _linear_overlap_add, StreamingOverlapAdd, SpeechTokenBuffer
 from vieneu_utils.core_utils import join_audio_chunks
 
 def test_linear_overlap_add():
@@ -26,6 +26,36 @@ def test_linear_overlap_add():
 def test_linear_overlap_add_empty():
     assert _linear_overlap_add([], 50).shape == (0,)
 
+@pytest.mark.parametrize("lengths", [
+    [160] * 8 + [90],          # regular chunks, shorter final flush
+    [160, 40, 160, 300, 120],  # frames shorter than the stride leave gaps
+])
+def test_streaming_overlap_add_matches_batch(lengths):
+    rng = np.random.default_rng(0)
+    stride = 100
+    frames = [rng.standard_normal(n).astype(np.float32) for n in lengths]
+
+    # Reference: what the streaming loops computed by re-running OLA on the whole history
+    expected, n_decoded = [], 0
+    for i in range(len(frames) - 1):
+        out = _linear_overlap_add(frames[: i + 1], stride)
+        expected.append(out[n_decoded:(i + 1) * stride])
+        n_decoded = (i + 1) * stride
+    expected.append(_linear_overlap_add(frames, stride)[n_decoded:])
+
+    ola = StreamingOverlapAdd(stride)
+    got = [ola.add(f) for f in frames[:-1]] + [ola.add(frames[-1], final=True)]
+
+    for g, e in zip(got, expected):
+        assert g.shape == e.shape
+        assert np.allclose(g, e, atol=1e-6)
+
+def test_streaming_overlap_add_keeps_only_pending_tail():
+    ola = StreamingOverlapAdd(stride=100)
+    for _ in range(1000):
+        ola.add(np.ones(160, dtype=np.float32))
+    assert ola._out.shape[-1] <= 160
+
 def test_join_audio_chunks_simple():
     chunks = [np.ones(100), np.zeros(100)]
     joined = join_audio_chunks(chunks, sr=16000)
@@ -60,3 +90,23 @@ def test_join_audio_chunks_empty():
 def test_join_audio_chunks_single():
     chunk = np.ones(100)
     assert np.array_equal(join_audio_chunks([chunk], 16000), chunk)
+
+def test_speech_token_buffer_parses_split_tokens():
+    buf = SpeechTokenBuffer([1, 2])
+    assert buf.feed("<|speech_3|><|spe") == 1
+    assert buf.feed("ech_45|>") == 1
+    assert buf.feed("<|SPEECH_GENERATION_END|>") == 0
+    assert len(buf) == 4
+    assert buf.window(0).tolist() == [1, 2, 3, 45]
+    assert buf.window(1, 3).tolist() == [2, 3]
+
+def test_speech_token_buffer_discards_and_stays_bounded():
+    buf = SpeechTokenBuffer(capacity=8)
+    for i in range(100):
+        buf.append([i])
+        buf.discard_before(i - 3)
+    assert len(buf) == 100
+    assert buf.window(96).tolist() == [96, 97, 98, 99]
+    assert buf._buf.size == 8
+    with pytest.raises(ValueError):
+        buf.window(10)
@@ -0,0 +1,158 @@
+import pytest
+import requests
+import torch
+from unittest.mock import MagicMock, patch
+from vieneu.balancer import EndpointBalancer
+from vieneu.remote import RemoteVieNeuTTS
+
+ENDPOINTS = ["http://a/v1", "http://b/v1", "http://c/v1"]
+
+
+@pytest.fixture
+def mock_codec():
+    codec = MagicMock()
+    codec.sample_rate = 24000
+    codec.device = "cpu"
+    codec.decode_code.return_value = torch.zeros((1, 1, 4800), dtype=torch.float32)
+    return codec
+
+
+@pytest.fixture
+def balancer():
+    b = EndpointBalancer(ENDPOINTS, health_interval=0)
+    yield b
+    b.close()
+
+
+def test_select_prefers_least_outstanding(balancer):
+    with balancer.track("http://a/v1"), balancer.track("http://b/v1"):
+        assert balancer.select() == "http://c/v1"
+    # Idle endpoints are rotated instead of always picking the first
+    assert len({balancer.select() for _ in range(3)}) == 3
+
+
+def test_affinity_is_sticky_until_overloaded(balancer):
+    home = balancer.select("voice-1")
+    assert all(balancer.select("voice-1") == home for _ in range(5))
+    assert EndpointBalancer(ENDPOINTS, health_interval=0).select("voice-1") == home
+
+    with balancer.track(home), balancer.track(home):
+        assert balancer.select("voice-1") == home  # within affinity_slack
+        with balancer.track(home):
+            assert balancer.select("voice-1") != home
+
+
+def test_mark_down_skips_endpoint_until_revived(balancer):
+    balancer.mark_down("http://a/v1")
+    assert "http://a/v1" not in {balancer.select() for _ in range(6)}
+    assert balancer.stats()["http://a/v1"]["healthy"] is False
+
+    # With every endpoint down, one is still tried rather than failing outright
+    balancer.mark_down("http://b/v1")
+    balancer.mark_down("http://c/v1")
+    assert balancer.select() in ENDPOINTS
+
+    balancer.mark_up("http://a/v1")
+    assert balancer.select() == "http://a/v1"
+
+
+def test_choices_tries_each_endpoint_once(balancer):
+    assert sorted(balancer.choices("voice-1")) == ENDPOINTS
+    with pytest.raises(RuntimeError):
+        balancer.select(exclude=ENDPOINTS)
+
+
+def test_check_health_marks_failing_endpoints(balancer):
+    def get(url, timeout):
+        if url.startswith("http://b"):
+            raise requests.ConnectionError("refused")
+        return MagicMock(status_code=503 if url.startswith("http://c") else 200)
+
+    with patch("vieneu.balancer.requests.get", side_effect=get):
+        balancer.check_health()
+    assert {e: s["healthy"] for e, s in balancer.stats().items()} == {
+        "http://a/v1": True, "http://b/v1": False, "http://c/v1": False,
+    }
+
+
+def test_remote_fails_over_to_next_endpoint(mock_codec):
+    with patch("vieneu.standard.DistillNeuCodec.from_pretrained", return_value=mock_codec):
+        tts = RemoteVieNeuTTS(api_base=ENDPOINTS[:2], model_name="mock-model", health_interval=0)
+
+    ok = MagicMock()
+    ok.json.return_value = {"choices": [{"message": {"content": "<|speech_1|><|speech_2|>"}}]}
+    tried = []
+
+    def post(url, **kwargs):
+        tried.append(url)
+        if len(tried) == 1:
+            raise requests.ConnectionError("refused")
+        return ok
+
+    with patch.object(tts.session, "post", side_effect=post), \
+         patch("vieneu.remote.phonemize_with_dict", return_value="phonemes"):
+        audio = tts.infer("Xin chào", ref_codes=[1, 2, 3], ref_text="Chào")
+
+    assert len(audio) == 4800
+    assert len(set(tried)) == 2
+    stats = tts.balancer.stats()
+    failed = tried[0].rsplit("/chat/completions", 1)[0]
+    assert stats[failed]["failures"] == 1 and stats[failed]["healthy"] is False
+    assert all(s["outstanding"] == 0 for s in stats.values())
+    tts.close()
+
+
+def test_remote_does_not_fail_over_on_client_error(mock_codec):
+    with patch("vieneu.standard.DistillNeuCodec.from_pretrained", return_value=mock_codec):
+        tts = RemoteVieNeuTTS(api_base=ENDPOINTS[:2], model_name="mock-model", health_interval=0)
+
+    bad = MagicMock()
+    bad.raise_for_status.side_effect = requests.HTTPError("400", response=MagicMock(status_code=400))
+    with patch.object(tts.session, "post", return_value=bad) as post, \
+         patch("vieneu.remote.phonemize_with_dict", return_value="phonemes"), \
+         pytest.raises(requests.HTTPError):
+        tts.infer("Xin chào", ref_codes=[1, 2, 3], ref_text="Chào")
+
+    assert post.call_count == 1
+    assert all(s["failures"] == 0 for s in tts.balancer.stats().values())
+    tts.close()
+
+
+def test_remote_stream_raises_when_all_endpoints_fail(mock_codec):
+    with patch("vieneu.standard.DistillNeuCodec.from_pretrained", return_value=mock_codec):
+        tts = RemoteVieNeuTTS(api_base=ENDPOINTS[:2], model_name="mock-model", health_interval=0)
+
+    with patch.object(tts.session, "post", side_effect=requests.ConnectionError("refused")) as post, \
+         patch("vieneu.remote.phonemize_with_dict", return_value="phonemes"), \
+         pytest.raises(requests.ConnectionError):
+        list(tts.infer_stream("Xin chào", ref_codes=[1, 2, 3], ref_text="Chào", skip_normalize=True))
+
+    assert post.call_count == 2
+    tts.close()
+
+
+def test_remote_stream_raises_after_first_window(mock_codec):
+    import json
+    import numpy as np
+
+    with patch("vieneu.standard.DistillNeuCodec.from_pretrained", return_value=mock_codec):
+        tts = RemoteVieNeuTTS(api_base=ENDPOINTS[:2], model_name="mock-model", health_interval=0)
+    tts._decode_ids = lambda ids: np.zeros(len(ids) * tts.hop_length, dtype=np.float32)
+
+    def lines():
+        content = "".join(f"<|speech_{t}|>" for t in range(40))
+        yield b"data: " + json.dumps({"choices": [{"delta": {"content": content}}]}).encode()
+        raise requests.ConnectionError("reset")
+
+    response = MagicMock()
+    response.__enter__.return_value.iter_lines.side_effect = lines
+    received = []
+    with patch.object(tts.session, "post", return_value=response) as post, \
+         patch("vieneu.remote.phonemize_with_dict", return_value="phonemes"), \
+         pytest.raises(requests.ConnectionError):
+        for wav in tts.infer_stream("Xin chào", ref_codes=[1, 2, 3], ref_text="Chào", skip_normalize=True):
+            received.append(wav)
+
+    # Audio was already delivered, so the error is surfaced instead of failing over
+    assert received and post.call_count == 1
+    tts.close()
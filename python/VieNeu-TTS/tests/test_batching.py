@@ -0,0 +1,94 @@
+import threading
+import torch
+import pytest
+from unittest.mock import MagicMock, patch
+from vieneu.batching import MicroBatcher
+from vieneu.standard import VieNeuTTS
+
+def test_micro_batcher_groups_concurrent_requests():
+    calls = []
+
+    def generate_fn(prompts, temperature, top_k):
+        calls.append((len(prompts), temperature))
+        return [f"out{p[0]}" for p in prompts]
+
+    batcher = MicroBatcher(generate_fn, max_batch_size=8, max_wait_ms=200)
+    try:
+        futures = [batcher.submit([i], 1.0, 50) for i in range(3)]
+        futures.append(batcher.submit([9], 0.5, 50))
+        assert [f.result(timeout=5) for f in futures] == ["out0", "out1", "out2", "out9"]
+    finally:
+        batcher.close()
+
+    assert sorted(calls) == [(1, 0.5), (3, 1.0)]
+    assert batcher.stats()["batches"] == 2
+
+def test_micro_batcher_propagates_errors():
+    def generate_fn(prompts, temperature, top_k):
+        raise ValueError("boom")
+
+    batcher = MicroBatcher(generate_fn, max_wait_ms=0)
+    try:
+        with pytest.raises(ValueError):
+            batcher.submit([1]).result(timeout=5)
+    finally:
+        batcher.close()
+
+def test_infer_torch_batch_left_pads_and_splits():
+    with patch("vieneu.standard.DistillNeuCodec.from_pretrained", return_value=MagicMock()):
+        tts = VieNeuTTS(backbone_repo=None)
+    end_id = 99
+    tts.tokenizer = MagicMock(pad_token_id=0)
+    tts.tokenizer.convert_tokens_to_ids.return_value = end_id
+    tts.tokenizer.decode.side_effect = lambda ids, **kw: ids
+    tts.backbone = MagicMock(device=torch.device("cpu"))
+    # Row 0 finishes early and is padded after its end token
+    tts.backbone.generate.return_value = torch.tensor([
+        [0, 5, 6, 7, 11, end_id, 0],
+        [1, 2, 3, 4, 12, 13, end_id],
+    ])
+
+    outputs = tts._infer_torch_batch([[5, 6, 7], [1, 2, 3, 4]], temperature=1.0, top_k=50)
+
+    args, kwargs = tts.backbone.generate.call_args
+    assert args[0].tolist() == [[0, 5, 6, 7], [1, 2, 3, 4]]
+    assert kwargs["attention_mask"].tolist() == [[0, 1, 1, 1], [1, 1, 1, 1]]
+    assert outputs == [[11, end_id], [12, 13, end_id]]
+
+def test_infer_uses_batcher_for_all_chunks(mock_batch_tts):
+    tts, seen = mock_batch_tts
+    tts.enable_batching(max_batch_size=8, max_wait_ms=100)
+    try:
+        with patch("vieneu.standard.phonemize_with_dict", return_value="phonemes"):
+            tts.infer("Câu một. Câu hai. Câu ba.", ref_codes=[1, 2, 3], ref_text="Chào", max_chars=10)
+    finally:
+        tts.disable_batching()
+    # All chunks of the text share one batched generate call and one codec call
+    assert seen == [3]
+    assert tts.codec.decode_code.call_count == 1
+
+@pytest.fixture
+def mock_batch_tts():
+    codec = MagicMock()
+    codec.device = "cpu"
+    codec.decode_code.side_effect = lambda codes: torch.zeros((codes.shape[0], 1, codes.shape[-1] * 480), dtype=torch.float32)
+    with patch("vieneu.standard.DistillNeuCodec.from_pretrained", return_value=codec):
+        tts = VieNeuTTS(backbone_repo=None)
+    tts.tokenizer = MagicMock()
+    tts._apply_chat_template = MagicMock(return_value=[1, 2, 3])
+    seen = []
+
+    def batch_fn(prompts, temperature, top_k):
+        seen.append(len(prompts))
+        return ["<|speech_1|>"] * len(prompts)
+
+    tts._infer_torch_batch = batch_fn
+    return tts, seen
+
+def test_enable_batching_rejects_gguf():
+    with patch("vieneu.standard.DistillNeuCodec.from_pretrained", return_value=MagicMock()):
+        tts = VieNeuTTS(backbone_repo=None)
+    tts._is_quantized_model = True
+    with pytest.raises(ValueError, match="spawn_worker"):
+        tts.enable_batching()
+    assert tts.batcher is None
@@ -0,0 +1,184 @@
+import os
+import random
+import numpy as np
+import torch
+import pytest
+from unittest.mock import MagicMock, patch
+from vieneu.cache import ReferenceCodeCache, AudioCache
+from vieneu_utils.memo import MemoCache
+from vieneu.standard import VieNeuTTS
+from vieneu.remote import RemoteVieNeuTTS
+
+@pytest.fixture
+def ref_wav(tmp_path):
+    path = tmp_path / "ref.wav"
+    path.write_bytes(b"RIFF" + b"\x00" * 64)
+    return path
+
+def test_reference_cache_roundtrip(ref_wav):
+    cache = ReferenceCodeCache(max_entries=2)
+    key = cache.make_key(ref_wav, "neuphonic/distill-neucodec")
+    assert cache.get(key) is None
+    cache.put(key, torch.arange(5))
+    assert torch.equal(cache.get(key), torch.arange(5))
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+def test_reference_cache_key_depends_on_codec_and_mtime(ref_wav):
+    cache = ReferenceCodeCache()
+    key = cache.make_key(ref_wav, "neuphonic/distill-neucodec")
+    assert key != cache.make_key(ref_wav, "neuphonic/neucodec")
+
+    st = ref_wav.stat()
+    os.utime(ref_wav, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+    assert key != cache.make_key(ref_wav, "neuphonic/distill-neucodec")
+
+def test_reference_cache_lru_eviction(ref_wav):
+    cache = ReferenceCodeCache(max_entries=2)
+    for i in range(3):
+        cache.put(f"k{i}", torch.tensor([i]))
+    assert cache.get("k0") is None
+    assert cache.get("k2") is not None
+
+def test_reference_cache_persists_to_disk(ref_wav, tmp_path):
+    cache_dir = tmp_path / "codes"
+    key = ReferenceCodeCache(cache_dir=cache_dir).make_key(ref_wav, "codec")
+    ReferenceCodeCache(cache_dir=cache_dir).put(key, torch.tensor([7, 8, 9]))
+
+    restarted = ReferenceCodeCache(cache_dir=cache_dir)
+    assert torch.equal(restarted.get(key), torch.tensor([7, 8, 9]))
+    assert restarted.stats()["disk_hits"] == 1
+
+def test_encode_reference_skips_codec_on_hit(ref_wav):
+    tts = VieNeuTTS.__new__(VieNeuTTS)
+    tts.codec_repo = "neuphonic/distill-neucodec"
+    tts.ref_code_cache = ReferenceCodeCache()
+    tts._encode_reference_audio = MagicMock(return_value=torch.tensor([1, 2, 3]))
+
+    first = tts.encode_reference(ref_wav)
+    second = tts.encode_reference(ref_wav)
+    assert torch.equal(first, second)
+    assert tts._encode_reference_audio.call_count == 1
+
+def test_audio_cache_key_covers_voice_and_sampling():
+    cache = AudioCache(seed=1)
+    voice = AudioCache.voice_identity(torch.tensor([1, 2, 3]), "chào")
+    key = cache.make_key("xin chào", voice, "model", 0.7, 35)
+    assert key == cache.make_key("xin chào", AudioCache.voice_identity([1, 2, 3], "chào"), "model", 0.7, 35)
+    assert key != cache.make_key("xin chào", voice, "model", 0.8, 35)
+    assert key != cache.make_key("xin chào", AudioCache.voice_identity([1, 2, 4], "chào"), "model", 0.7, 35)
+    assert key != AudioCache(seed=2).make_key("xin chào", voice, "model", 0.7, 35)
+
+def test_audio_cache_bounded_by_bytes_and_persisted(tmp_path):
+    cache = AudioCache(cache_dir=tmp_path, max_bytes=2 * 400)
+    for i in range(3):
+        cache.put(f"k{i}", np.full(100, i, dtype=np.float32))
+    assert cache.stats()["entries"] == 2
+    assert cache.stats()["bytes"] == 800
+
+    # Evicted from memory but still on disk
+    audio = cache.get("k0")
+    assert np.array_equal(audio, np.zeros(100, dtype=np.float32))
+    assert cache.stats()["disk_hits"] == 1
+
+def test_audio_cache_disk_store_bounded_by_bytes(tmp_path):
+    cache = AudioCache(cache_dir=tmp_path, max_bytes=400)
+    cache.put("k0", np.zeros(100, dtype=np.float32))
+    file_size = (tmp_path / "k0.npy").stat().st_size
+
+    cache = AudioCache(cache_dir=tmp_path, max_bytes=400, max_disk_bytes=2 * file_size)
+    assert cache.stats()["disk_entries"] == 1
+    cache.put("k1", np.ones(100, dtype=np.float32))
+    # A disk hit on k0 makes k1 the least recently used file
+    cache.clear()
+    assert cache.get("k0") is not None
+    cache.put("k2", np.full(100, 2, dtype=np.float32))
+
+    assert sorted(p.stem for p in tmp_path.glob("*.npy")) == ["k0", "k2"]
+    assert cache.stats()["disk_bytes"] == 2 * file_size
+
+def test_audio_cache_disabled_without_seeded_sampling():
+    with patch("vieneu.standard.DistillNeuCodec.from_pretrained", return_value=MagicMock()):
+        tts = RemoteVieNeuTTS(api_base="http://mock-api", model_name="mock-model", health_interval=0)
+    tts.set_audio_cache(AudioCache())
+    assert tts.audio_cache is None
+
+def test_infer_returns_cached_audio_without_backbone():
+    codec = MagicMock()
+    codec.device = "cpu"
+    codec.decode_code.return_value = torch.ones((1, 1, 480), dtype=torch.float32)
+    with patch("vieneu.standard.DistillNeuCodec.from_pretrained", return_value=codec):
+        tts = VieNeuTTS(backbone_repo=None)
+    tts.set_audio_cache(AudioCache())
+    tts._apply_chat_template = MagicMock(return_value=[1, 2, 3])
+    tts._infer_torch = MagicMock(return_value="<|speech_1|>")
+
+    with patch("vieneu.standard.phonemize_with_dict", return_value="phonemes"):
+        first = tts.infer("Xin chào", ref_codes=[1, 2, 3], ref_text="Chào")
+        second = tts.infer("Xin chào", ref_codes=[1, 2, 3], ref_text="Chào")
+        looked_up = tts.lookup_cached_audio("Xin chào", ref_codes=[1, 2, 3], ref_text="Chào")
+
+    assert tts._infer_torch.call_count == 1
+    assert np.array_equal(first, second)
+    assert np.array_equal(first, looked_up)
+    assert tts.audio_cache.stats()["hits"] == 2
+
+class SeededLlama:
+    """Stands in for a llama.cpp model whose sampler RNG lives on the shared context."""
+
+    def __init__(self):
+        self.rng = random.Random()
+
+    def set_seed(self, seed):
+        self.rng = random.Random(seed)
+
+def _sampling_draws(backend):
+    codec = MagicMock()
+    codec.device = "cpu"
+    codec.decode_code.return_value = torch.ones((1, 1, 480), dtype=torch.float32)
+    with patch("vieneu.standard.DistillNeuCodec.from_pretrained", return_value=codec):
+        tts = VieNeuTTS(backbone_repo=None)
+    draws = []
+    if backend == "gguf":
+        tts._is_quantized_model = True
+        tts.backbone = SeededLlama()
+        tts._infer_ggml = lambda voice, chunk, temperature, top_k: draws.append(tts.backbone.rng.random()) or "<|speech_1|>"
+    else:
+        tts._apply_chat_template = MagicMock(return_value=[1, 2, 3])
+        tts._infer_torch = lambda prompt, temperature, top_k: draws.append(torch.rand(1).item()) or "<|speech_1|>"
+
+    with patch("vieneu.standard.phonemize_with_dict", return_value="phonemes"):
+        tts.set_audio_cache(AudioCache(seed=7))
+        tts.infer("Xin chào", ref_codes=[1, 2, 3], ref_text="Chào")
+        tts.set_audio_cache(None)
+        tts.infer("Xin chào", ref_codes=[1, 2, 3], ref_text="Chào")
+        tts.infer("Tạm biệt", ref_codes=[1, 2, 3], ref_text="Chào")
+    return draws
+
+@pytest.mark.parametrize("backend", ["gguf", "torch"])
+def test_seeded_cache_miss_does_not_seed_later_calls(backend):
+    first = _sampling_draws(backend)
+    second = _sampling_draws(backend)
+    # The cache-miss generation is reproducible...
+    assert first[0] == second[0]
+    # ...but the unseeded calls after it do not inherit its seed
+    assert first[1] != second[1]
+    assert first[2] != second[2]
+
+def test_memo_cache_evicts_least_recently_used():
+    memo = MemoCache(max_entries=2)
+    memo.put("a", "1")
+    memo.put("b", "2")
+    assert memo.get("a") == "1"
+    memo.put("c", "3")
+    assert memo.get("b") is None
+    assert memo.get("a") == "1" and memo.get("c") == "3"
+    stats = memo.stats()
+    assert stats["entries"] == 2 and stats["hits"] == 3 and stats["misses"] == 1
+    assert stats["hit_rate"] == 0.75
+
+def test_memo_cache_disabled():
+    memo = MemoCache(max_entries=0)
+    memo.put("a", "1")
+    assert memo.get("a") is None
+    assert memo.stats()["entries"] == 0
@@ -1,6 +1,6 @@
 import numpy as np
 import pytest
-from vieneu_utils.core_utils import split_text_into_chunks, join_audio_chunks
+from vieneu_utils.core_utils import split_text_into_chunks, join_audio_chunks, format_codes_str, format_prompt, format_prompt_prefix
 
 def test_split_text_into_chunks():
     text = "Đây là một câu ngắn. Đây là một câu dài hơn một chút để kiểm tra xem nó có bị chia ra không nếu chúng ta đặt giới hạn ký tự thấp."
@@ -36,3 +36,25 @@ def test_join_audio_chunks_with_silence():
     joined = join_audio_chunks([chunk1, chunk2], sr, silence_p=0.1)
     assert len(joined) == 1600 + 1600 + 1600
     assert np.all(joined[1600:3200] == 0.0)
+
+def test_format_prompt_default_layout():
+    prompt = format_prompt("ref", "input", "<|speech_1|>")
+    assert prompt == (
+        "user: Convert the text to speech:<|TEXT_PROMPT_START|>ref input"
+        "<|TEXT_PROMPT_END|>\nassistant:<|SPEECH_GENERATION_START|><|speech_1|>"
+    )
+    assert prompt.startswith(format_prompt_prefix("ref", "<|speech_1|>"))
+
+def test_format_prompt_ref_first_layout():
+    codes_str = format_codes_str([1, 2])
+    prompt = format_prompt("ref", "input", codes_str, layout="ref_first")
+    prefix = format_prompt_prefix("ref", codes_str, layout="ref_first")
+    # Everything voice-specific is in the shared prefix, the target text comes last
+    assert prompt.startswith(prefix)
+    assert "<|speech_1|><|speech_2|>" in prefix
+    assert "input" not in prefix
+    assert prompt.endswith("<|SPEECH_GENERATION_START|>")
+
+def test_format_prompt_unknown_layout():
+    with pytest.raises(ValueError):
+        format_prompt("ref", "input", "", layout="unknown")
@@ -0,0 +1,117 @@
+import threading
+import time
+import pytest
+from unittest.mock import patch
+from vieneu_utils.lexicon import (
+    Lexicon, LearnedPhonemes, PhonemeLexicon, build_lexicon, load_lexicon, vietnamese_syllables,
+)
+from vieneu_utils.phonemize_text import phonemize_with_dict
+
+ENTRIES = {"xin": "sin", "chào": "tʃaːw", "việt": "viət", "nam": "naːm", "ok": "ɔk"}
+
+@pytest.fixture
+def lexicon_path(tmp_path):
+    path = tmp_path / "lexicon.bin"
+    build_lexicon(ENTRIES, str(path))
+    return str(path)
+
+def test_lexicon_roundtrip(lexicon_path):
+    lexicon = Lexicon(lexicon_path)
+    assert len(lexicon) == len(ENTRIES)
+    assert dict(lexicon.items()) == ENTRIES
+    assert lexicon["chào"] == "tʃaːw"
+    assert "việt" in lexicon and "viet" not in lexicon and 3 not in lexicon
+    assert lexicon.get("hà") is None
+    # Keys are stored sorted, which the binary search relies on
+    assert list(lexicon) == sorted(ENTRIES, key=lambda k: k.encode("utf-8"))
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / "other.bin"
+    path.write_bytes(b"\x00" * 32)
+    with pytest.raises(ValueError):
+        Lexicon(str(path))
+
+def test_overrides_and_learned_words_sit_on_top(lexicon_path):
+    phonemes = load_lexicon(lexicon_path, overrides={"nam": "nam"})
+    assert phonemes["nam"] == "nam"
+    assert phonemes["xin"] == "sin"
+    phonemes["robot"] = "ɹobot"
+    assert "robot" in phonemes and len(phonemes) == len(ENTRIES) + 1
+    with pytest.raises(KeyError):
+        del phonemes["xin"]
+
+def test_missing_lexicon_is_empty(tmp_path, caplog):
+    with caplog.at_level("WARNING", logger="Vieneu.Lexicon"):
+        phonemes = load_lexicon(str(tmp_path / "missing.bin"))
+    assert len(phonemes) == 0 and "xin" not in phonemes
+    assert "missing.bin" in caplog.text
+
+def test_phonemize_resolves_from_lexicon_without_espeak(lexicon_path):
+    phonemes = load_lexicon(lexicon_path)
+    with patch("vieneu_utils.phonemize_text.phonemize", side_effect=AssertionError("espeak called")):
+        assert phonemize_with_dict("xin chào việt nam", phoneme_dict=phonemes, skip_normalize=True) == "sin tʃaːw viət naːm"
+
+def test_syllable_inventory():
+    syllables = set(vietnamese_syllables())
+    for word in ("người", "rượu", "khuỷu", "ngoái", "hòa", "hoà", "giêng", "gì", "quý", "nghiêng", "việt"):
+        assert word in syllables
+    # Spelling rules: k/gh/ngh only before e, ê, i, y; stop codas take only sắc and nặng
+    for word in ("ke", "ki", "ghe", "nghi", "cá", "gà", "mạt"):
+        assert word in syllables
+    for word in ("ce", "ka", "gha", "nghà", "gè", "màt"):
+        assert word not in syllables
+
+def test_learned_store_is_bounded():
+    learned = LearnedPhonemes(max_entries=3, max_word_length=10)
+    phonemes = load_lexicon("/nonexistent/lexicon.bin", learned=learned)
+    for i in range(5):
+        phonemes[f"w{i}"] = f"p{i}"
+    # The oldest entries go first
+    assert sorted(phonemes) == ["w2", "w3", "w4"]
+    phonemes["x" * 11] = "long"
+    assert "x" * 11 not in phonemes
+    assert phonemes["w4"] == "p4"
+    assert learned.stats()["evictions"] == 2 and learned.stats()["rejected"] == 1
+    stats = phonemes.stats()
+    assert stats["learned_hits"] == 1 and stats["misses"] == 1
+
+def test_learned_store_survives_restart(tmp_path):
+    path = str(tmp_path / "learned.json")
+    learned = LearnedPhonemes(path, max_entries=2, flush_interval=3600)
+    learned.put("xin", "sin")
+    assert learned.stats()["flushes"] == 0
+    learned.put("chào", "tʃaːw")
+    learned.put("robot", "ɹobot")
+    learned.flush()
+
+    restored = LearnedPhonemes(path, max_entries=2)
+    assert restored.snapshot() == {"chào": "tʃaːw", "robot": "ɹobot"}
+
+def test_learned_store_under_concurrent_writers():
+    learned = LearnedPhonemes(max_entries=100)
+    phonemes = PhonemeLexicon(learned=learned)
+
+    def write(offset):
+        for i in range(2000):
+            phonemes[f"t{offset}-{i}"] = "x"
+            assert len(phonemes) <= 100
+
+    threads = [threading.Thread(target=write, args=(n,)) for n in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(learned) == 100
+    assert learned.stats()["evictions"] == 4 * 2000 - 100
+
+def test_learned_store_writes_back_in_background(tmp_path):
+    path = str(tmp_path / "learned.json")
+    learned = LearnedPhonemes(path, flush_interval=0.05)
+    learned.put("xin", "sin")
+    assert learned.remove("xin") and not learned.remove("xin")
+    learned.put("chào", "tʃaːw")
+    deadline = time.monotonic() + 5
+    while learned.stats()["flushes"] == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    learned.close()
+    assert LearnedPhonemes(path).snapshot() == {"chào": "tʃaːw"}
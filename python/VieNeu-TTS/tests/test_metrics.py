@@ -0,0 +1,84 @@
+import torch
+from unittest.mock import MagicMock, patch
+from vieneu.metrics import MetricsRegistry, Histogram
+from vieneu.standard import VieNeuTTS
+
+def test_histogram_renders_cumulative_buckets():
+    hist = Histogram("lat_seconds", "Latency.", buckets=(0.1, 1.0), label="stage")
+    hist.observe(0.05, "decode")
+    hist.observe(0.5, "decode")
+    hist.observe(5.0, "decode")
+    lines = hist.render()
+    assert 'lat_seconds_bucket{stage="decode",le="0.1"} 1' in lines
+    assert 'lat_seconds_bucket{stage="decode",le="1.0"} 2' in lines
+    assert 'lat_seconds_bucket{stage="decode",le="+Inf"} 3' in lines
+    assert 'lat_seconds_count{stage="decode"} 3' in lines
+
+def test_registry_render_includes_stages_throughput_and_gauges():
+    registry = MetricsRegistry()
+    with registry.stage("normalize"):
+        pass
+    registry.observe_generation(50, 0.5)
+    registry.set_gauge("workers_busy", 1, "Busy workers.")
+    text = registry.render()
+    assert "# TYPE vieneu_stage_duration_seconds histogram" in text
+    assert 'vieneu_stage_duration_seconds_count{stage="generate"} 1' in text
+    assert 'vieneu_generation_tokens_per_second_bucket{le="100.0"} 1' in text
+    assert "vieneu_workers_busy 1.0" in text
+
+def test_infer_records_pipeline_stages():
+    codec = MagicMock()
+    codec.device = "cpu"
+    codec.decode_code.return_value = torch.zeros((1, 1, 480), dtype=torch.float32)
+    with patch("vieneu.standard.DistillNeuCodec.from_pretrained", return_value=codec):
+        tts = VieNeuTTS(backbone_repo=None, prompt_layout="ref_first")
+    registry = MetricsRegistry()
+    tts.set_metrics(registry)
+    tts.tokenizer = MagicMock()
+    tts.tokenizer.encode.return_value = [1, 2]
+    tts.tokenizer.decode.return_value = "<|speech_1|><|speech_2|>"
+    tts.backbone = MagicMock(device=torch.device("cpu"))
+    tts.backbone.generate.return_value = torch.tensor([[1, 2, 3, 4, 5]])
+
+    with patch("vieneu.standard.phonemize_with_dict", return_value="phonemes"):
+        tts.infer("Xin chào", ref_codes=[1, 2, 3], ref_text="Chào")
+
+    for stage in ("normalize", "phonemize", "generate", "codec_decode"):
+        assert registry.stages.snapshot(stage)["count"] >= 1, stage
+
+def test_timed_generation_splits_first_item():
+    tts = VieNeuTTS.__new__(VieNeuTTS)
+    tts.metrics = MetricsRegistry()
+    assert list(tts._timed_generation(iter(range(4)))) == [0, 1, 2, 3]
+    assert tts.metrics.stages.snapshot("prompt_eval")["count"] == 1
+    assert tts.metrics.tokens_per_second.snapshot()["count"] == 1
+
+def test_counters_render_with_counter_type():
+    registry = MetricsRegistry()
+    registry.set_counter("worker_waits_total", 3, "Requests that had to wait.")
+    registry.set_gauge("workers", 2)
+    text = registry.render()
+    assert "# TYPE vieneu_worker_waits_total counter" in text
+    assert "vieneu_worker_waits_total 3.0" in text
+    assert "# TYPE vieneu_workers gauge" in text
+
+def test_ggml_stream_records_prompt_eval_once():
+    codec = MagicMock()
+    codec.device = "cpu"
+    codec.decode_code.return_value = torch.zeros((1, 1, 480), dtype=torch.float32)
+    with patch("vieneu.standard.DistillNeuCodec.from_pretrained", return_value=codec):
+        tts = VieNeuTTS(backbone_repo=None)
+    tts.set_metrics(MetricsRegistry())
+    tts._is_quantized_model = True
+    # A voice prefix evaluated separately before the completion starts
+    tts._prepare_ggml_prompt = lambda voice, text: ("prompt", 0.25)
+    tts.backbone = MagicMock(side_effect=lambda prompt, **kwargs: iter(
+        [{"choices": [{"text": f"<|speech_{i}|>"}]} for i in range(4)]
+    ))
+
+    with patch("vieneu.standard.phonemize_with_dict", return_value="phonemes"):
+        list(tts.infer_stream("Xin chào", ref_codes=[1, 2, 3], ref_text="Chào", skip_normalize=True))
+
+    prompt_eval = tts.metrics.stages.snapshot("prompt_eval")
+    assert prompt_eval["count"] == 1
+    assert prompt_eval["sum"] >= 0.25
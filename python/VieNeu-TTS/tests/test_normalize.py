@@ -1,9 +1,11 @@
+import random
+import time
 import pytest
 from vieneu_utils.normalize_text import VietnameseTTSNormalizer
 
-@pytest.fixture
-def normalizer():
-    return VietnameseTTSNormalizer()
+@pytest.fixture(params=["cascade", "lexer"])
+def normalizer(request):
+    return VietnameseTTSNormalizer(engine=request.param)
 
 # Combined test cases from multiple categories
 TEST_CASES = [
@@ -214,6 +216,10 @@ TEST_CASES = [
     # Redundant expansion (symbol + unit)
     ("#1kg", "thăng một ki lô gam"),
 
+    # Several units and acronyms in one sentence
+    ("Quãng đường 5 km, 300 m và 2,5 kg hàng", "quãng đường năm ki lô mét, ba trăm mét và hai phẩy năm ki lô gam hàng"),
+    ("Tôi sống ở TP HCM, giá 20 USD", "tôi sống ở thành phố hồ chí minh, giá hai mươi đô la mỹ"),
+
     # ─── 24. CÂU TEST THỰC TẾ ──────────────────────────────────────────────────
     ("Ông Lưu Trung Thái, Chủ tịch HĐQT MB cho biết, vốn hóa của ngân hàng đã tăng gần 10 lần kể từ năm 2017, đạt khoảng 8,5 tỷ USD, tạo nền tảng cho mục tiêu 10 tỷ USD vào năm 2027.",
      "ông lưu trung thái, chủ tịch hđqt em bi cho biết, vốn hóa của ngân hàng đã tăng gần mười lần kể từ năm hai nghìn không trăm mười bảy, đạt khoảng tám phẩy năm tỷ đô la mỹ, tạo nền tảng cho mục tiêu mười tỷ đô la mỹ vào năm hai nghìn không trăm hai mươi bảy."),
@@ -230,3 +236,48 @@ def test_normalize(normalizer, input_text, expected):
     # Note: brackets are sometimes kept or removed depending on normalizer state
     # We follow the user provided expected strings
     assert actual_clean == expected_clean
+
+
+def test_unknown_engine():
+    with pytest.raises(ValueError):
+        VietnameseTTSNormalizer(engine="fst")
+
+
+# Sentences only: bare numbers on consecutive lines read as one space-grouped number
+SENTENCES = [input_text for input_text, _ in TEST_CASES if len(input_text.split()) >= 4]
+
+
+def test_lexer_matches_cascade_on_documents():
+    rng = random.Random(0)
+    cascade = VietnameseTTSNormalizer(engine="cascade", cache_size=0)
+    lexer = VietnameseTTSNormalizer(engine="lexer", cache_size=0)
+    documents = ["\n".join(SENTENCES * 3)]
+    for _ in range(300):
+        sentences = rng.sample(SENTENCES, rng.randint(1, 5))
+        documents.append(rng.choice(["\n", " ", ". ", "! "]).join(sentences))
+    for document in documents:
+        assert lexer.normalize(document) == cascade.normalize(document), document
+
+
+def test_lexer_scales_linearly():
+    lexer = VietnameseTTSNormalizer(engine="lexer", cache_size=0)
+    small = "\n".join(SENTENCES * 2)
+    large = "\n".join(SENTENCES * 32)
+
+    def best_time(text):
+        timings = []
+        for _ in range(3):
+            start = time.perf_counter()
+            lexer.normalize(text)
+            timings.append(time.perf_counter() - start)
+        return min(timings)
+
+    # 16x the text; a quadratic scan would take ~256x as long
+    assert best_time(large) < 16 * 4 * best_time(small)
+
+
+def test_repeated_input_is_memoized():
+    normalizer = VietnameseTTSNormalizer(cache_size=8)
+    first = normalizer.normalize("Ngày 21/02/2025 giá tăng 2,5%")
+    assert normalizer.normalize("Ngày 21/02/2025 giá tăng 2,5%") == first
+    assert normalizer.cache.stats()["hits"] == 1
@@ -1,5 +1,7 @@
 import pytest
-from vieneu_utils.phonemize_text import phonemize_with_dict
+from unittest.mock import patch
+from vieneu_utils import phonemize_text
+from vieneu_utils.phonemize_text import phonemize_with_dict, phonemize_batch
 
 def test_phonemize_vietnamese():
     text = "Xin chào Việt Nam"
@@ -23,3 +25,21 @@ def test_phonemize_with_custom_dict():
     text = "Tôi là robot"
     phonemes = phonemize_with_dict(text, phoneme_dict=custom_dict)
     assert "ro-bot-phi-diệu" in phonemes
+
+def test_repeated_text_is_memoized():
+    phonemize_text.phoneme_cache.clear()
+    fake = lambda texts, **kwargs: [f"/{t}/" for t in texts]
+    with patch("vieneu_utils.phonemize_text.phonemize", side_effect=fake) as espeak:
+        first = phonemize_with_dict("zxqv wqkj", skip_normalize=True)
+        assert phonemize_with_dict("zxqv wqkj", skip_normalize=True) == first
+        assert espeak.call_count == 1
+
+        batch = phonemize_batch(["zxqv wqkj", "qwzk", "qwzk"], skip_normalize=True)
+        assert batch[0] == first and batch[1] == batch[2]
+        assert espeak.call_count == 2
+        assert espeak.call_args.args[0] == ["qwzk"]
+
+    # Drop the fake phonemes the call taught the shared dictionary
+    phonemize_text.phoneme_cache.clear()
+    for word in ("zxqv", "wqkj", "qwzk"):
+        phonemize_text.phoneme_dict.pop(word, None)
@@ -0,0 +1,78 @@
+import sys
+import threading
+import pytest
+from unittest.mock import MagicMock, patch
+from vieneu.pool import BackbonePool, default_threads_per_worker
+from vieneu.standard import VieNeuTTS
+
+@pytest.fixture
+def ggml_tts():
+    codec = MagicMock()
+    with patch("vieneu.standard.DistillNeuCodec.from_pretrained", return_value=codec):
+        tts = VieNeuTTS(backbone_repo=None, n_threads=4)
+    tts.backbone = MagicMock(model_path="/models/vieneu.gguf")
+    tts._is_quantized_model = True
+    return tts
+
+def test_spawn_worker_shares_codec_with_own_context(ggml_tts):
+    llama_cpp = MagicMock()
+    llama_cls = llama_cpp.Llama
+    with patch.dict(sys.modules, {"llama_cpp": llama_cpp}):
+        worker = ggml_tts.spawn_worker(n_threads=2)
+    kwargs = llama_cls.call_args.kwargs
+    assert kwargs["model_path"] == "/models/vieneu.gguf"
+    assert kwargs["n_threads"] == 2
+    assert worker.backbone is not ggml_tts.backbone
+    assert worker.codec is ggml_tts.codec
+    assert worker.ref_code_cache is ggml_tts.ref_code_cache
+    assert worker.prefix_cache is not ggml_tts.prefix_cache
+    # Preset voices are copied, the locked normalizer memo is shared
+    assert worker._preset_voices == ggml_tts._preset_voices
+    assert worker._preset_voices is not ggml_tts._preset_voices
+    assert worker.normalizer is ggml_tts.normalizer
+
+def test_spawn_worker_rebuilds_watermarker(ggml_tts):
+    ggml_tts.watermarker = MagicMock()
+    with patch.dict(sys.modules, {"llama_cpp": MagicMock()}), \
+         patch.object(VieNeuTTS, "_init_watermarker", lambda self: setattr(self, "watermarker", MagicMock())):
+        worker = ggml_tts.spawn_worker()
+    assert worker.watermarker is not ggml_tts.watermarker
+
+def test_spawn_worker_requires_gguf(ggml_tts):
+    ggml_tts._is_quantized_model = False
+    with pytest.raises(ValueError, match="enable_batching"):
+        ggml_tts.spawn_worker()
+
+def test_pool_runs_workers_concurrently(ggml_tts):
+    with patch.object(VieNeuTTS, "spawn_worker", side_effect=lambda n_threads=None: MagicMock()):
+        pool = BackbonePool(ggml_tts, size=2)
+
+    barrier = threading.Barrier(2, timeout=5)
+    seen = []
+
+    def job():
+        with pool.acquire() as worker:
+            seen.append(worker)
+            barrier.wait()  # only passes if both workers are held at once
+
+    threads = [threading.Thread(target=job) for _ in range(2)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len({id(w) for w in seen}) == 2
+    assert pool.stats()["acquisitions"] == 2
+    assert pool.stats()["idle"] == 2
+
+def test_pool_acquire_timeout(ggml_tts):
+    pool = BackbonePool(ggml_tts, size=1)
+    with pool.acquire():
+        with pytest.raises(TimeoutError):
+            with pool.acquire(timeout=0.01):
+                pass
+    assert pool.stats()["waits"] == 0
+
+def test_default_threads_per_worker():
+    assert default_threads_per_worker(1) >= 1
+    assert default_threads_per_worker(10_000) == 1
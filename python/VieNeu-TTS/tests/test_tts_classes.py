@@ -100,11 +100,45 @@ def test_remote_vieneu_tts_infer(mock_codec):
         }
         mock_response.raise_for_status = MagicMock()
 
-        with patch("requests.post", return_value=mock_response), \
+        with patch.object(tts.session, "post", return_value=mock_response) as post, \
              patch("vieneu.remote.phonemize_with_dict", return_value="phonemes"):
             audio = tts.infer("Xin chào", ref_codes=[1, 2, 3], ref_text="Chào")
             assert isinstance(audio, np.ndarray)
             assert len(audio) == 4800
+            assert post.call_args.kwargs["timeout"] == tts.timeout
+
+def test_remote_infer_raises_when_a_chunk_fails(mock_codec):
+    import requests
+    with patch("vieneu.standard.DistillNeuCodec.from_pretrained", return_value=mock_codec):
+        tts = RemoteVieNeuTTS(api_base="http://mock-api", model_name="mock-model")
+
+    ok = MagicMock()
+    ok.json.return_value = {"choices": [{"message": {"content": "<|speech_1|><|speech_2|>"}}]}
+    responses = lambda: iter([ok, requests.ConnectionError("down"), ok])
+    text = "Một hai ba bốn. Năm sáu bảy tám. Chín mười."
+
+    with patch("vieneu.remote.phonemize_with_dict", return_value="phonemes"):
+        with patch.object(tts.session, "post", side_effect=responses()):
+            with pytest.raises(requests.ConnectionError):
+                tts.infer(text, ref_codes=[1, 2, 3], ref_text="Chào", max_chars=16, skip_normalize=True)
+        # Skipping is an explicit opt-in: the failed chunk is left out of the audio
+        with patch.object(tts.session, "post", side_effect=responses()):
+            audio = tts.infer(text, ref_codes=[1, 2, 3], ref_text="Chào", max_chars=16, skip_normalize=True, skip_failed_chunks=True, silence_p=0.0)
+    assert len(audio) == 2 * 4800
+
+def test_remote_session_pools_and_retries(mock_codec):
+    with patch("vieneu.standard.DistillNeuCodec.from_pretrained", return_value=mock_codec):
+        tts = RemoteVieNeuTTS(api_base="http://mock-api", pool_size=4, connect_timeout=2.0, read_timeout=30.0, max_retries=2)
+
+    adapter = tts.session.get_adapter("http://mock-api/chat/completions")
+    assert adapter._pool_maxsize == 4 and adapter._pool_block
+    retry = adapter.max_retries
+    assert retry.connect == 2 and retry.status == 2 and retry.read == 0
+    assert 503 in retry.status_forcelist and "POST" in retry.allowed_methods
+    assert tts.timeout == (2.0, 30.0)
+
+    tts.close()
+    assert tts.session is None
 
 def test_vieneu_tts_streaming(mock_codec, mock_backbone, mock_tokenizer):
     with patch("vieneu.standard.NeuCodec.from_pretrained", return_value=mock_codec), \
@@ -119,3 +153,398 @@ def test_vieneu_tts_streaming(mock_codec, mock_backbone, mock_tokenizer):
             chunks = list(stream)
             assert len(chunks) > 0
             assert isinstance(chunks[0], np.ndarray)
+
+class FakeLlama:
+    """Minimal stand-in for llama_cpp.Llama tracking evaluated tokens."""
+
+    def __init__(self):
+        self.input_ids = np.zeros(4096, dtype=np.intc)
+        self.n_tokens = 0
+        self.evaluated = 0
+        self.tokenized = 0
+
+    def tokenize(self, text, add_bos=True, special=False):
+        self.tokenized += 1
+        return [ord(c) % 256 for c in text.decode("utf-8")]
+
+    def detokenize(self, tokens, special=False):
+        return bytes(tokens)
+
+    def token_bos(self):
+        return -1
+
+    def reset(self):
+        self.n_tokens = 0
+
+    def eval(self, tokens):
+        self.input_ids[self.n_tokens:self.n_tokens + len(tokens)] = tokens
+        self.n_tokens += len(tokens)
+        self.evaluated += len(tokens)
+
+    def save_state(self):
+        return (self.input_ids.copy(), self.n_tokens)
+
+    def load_state(self, state):
+        self.input_ids, self.n_tokens = state[0].copy(), state[1]
+
+def test_ggml_prefix_state_cache(mock_codec):
+    from vieneu.cache import PrefixStateCache
+    with patch("vieneu.standard.DistillNeuCodec.from_pretrained", return_value=mock_codec):
+        tts = VieNeuTTS(backbone_repo=None)
+    tts.backbone = FakeLlama()
+    tts._backbone_repo = "fake-gguf"
+    tts.prefix_cache = PrefixStateCache(max_entries=2)
+
+    tts._restore_ggml_prefix("voice A head")
+    evaluated = tts.backbone.evaluated
+    # Context already holds the prefix: nothing is re-evaluated
+    tts._restore_ggml_prefix("voice A head")
+    assert tts.backbone.evaluated == evaluated
+
+    tts._restore_ggml_prefix("voice B head")
+    evaluated = tts.backbone.evaluated
+    # Switching back restores the snapshot instead of evaluating again
+    tts._restore_ggml_prefix("voice A head")
+    assert tts.backbone.evaluated == evaluated
+    assert tts._context_starts_with(tts.backbone.tokenize(b"voice A head"))
+    assert tts.prefix_cache.stats()["hits"] == 2
+
+def test_ggml_prompt_tokenized_once_with_cached_head(mock_codec):
+    from vieneu.cache import PrefixStateCache
+    with patch("vieneu.standard.DistillNeuCodec.from_pretrained", return_value=mock_codec):
+        tts = VieNeuTTS(backbone_repo=None)
+    tts.backbone = FakeLlama()
+    tts._backbone_repo = "fake-gguf"
+    tts.prefix_cache = PrefixStateCache(max_entries=2)
+
+    for layout in ("default", "ref_first"):
+        tts.prompt_layout = layout
+        with patch("vieneu.standard.phonemize_with_dict", return_value="phonemes"):
+            voice = tts.prepare_voice(ref_codes=[1, 2, 3], ref_text="Chao")
+            tokenized = tts.backbone.tokenized
+            prompt_tokens = tts._format_ggml_prompt(voice, "Xin chao")
+        assert tts.backbone.tokenized == tokenized + 1
+        key = PrefixStateCache.make_key("fake-gguf", layout, voice.prompt_prefix)
+        prefix_tokens, _ = tts.prefix_cache.get(key)
+        # The cached prefix is the head of the very tokens passed to the completion
+        assert prompt_tokens[:len(prefix_tokens)] == prefix_tokens
+        assert bytes(prefix_tokens) == voice.prompt_prefix.encode("utf-8")
+
+@pytest.mark.parametrize("layout, context", [("default", [1, 2, 3]), ("ref_first", [])])
+def test_ggml_stream_lookback_starts_from_continued_codes(mock_codec, layout, context):
+    with patch("vieneu.standard.DistillNeuCodec.from_pretrained", return_value=mock_codec):
+        tts = VieNeuTTS(backbone_repo=None, prompt_layout=layout)
+    tts._is_quantized_model = True
+    tts.streaming_frames_per_chunk = 2
+    tts.streaming_lookforward = 0
+    windows = []
+    tts._decode_ids = lambda ids: (windows.append(list(ids)), np.zeros(len(ids) * tts.hop_length, dtype=np.float32))[1]
+    tts.backbone = MagicMock(side_effect=lambda prompt, **kwargs: iter(
+        [{"choices": [{"text": f"<|speech_{i}|>"}]} for i in (7, 8, 9, 10)]
+    ))
+
+    with patch("vieneu.standard.phonemize_with_dict", return_value="phonemes"):
+        list(tts.infer_stream("Xin chào", ref_codes=[1, 2, 3], ref_text="Chào"))
+    # ref_first generates a new speech turn, so the reference codes are not its lookback
+    assert windows[0][: len(context) + 1] == context + [7]
+
+def test_ggml_stream_stops_on_cancel(mock_codec):
+    import threading
+    with patch("vieneu.standard.DistillNeuCodec.from_pretrained", return_value=mock_codec):
+        tts = VieNeuTTS(backbone_repo=None)
+    tts._is_quantized_model = True
+    tts.streaming_frames_per_chunk = 2
+    tts.streaming_lookforward = 0
+    cancel = threading.Event()
+    sampled = []
+
+    def completion(prompt, **kwargs):
+        for i in range(1000):
+            sampled.append(i)
+            yield {"choices": [{"text": f"<|speech_{i}|>"}]}
+
+    tts.backbone = MagicMock(side_effect=completion)
+    with patch("vieneu.standard.phonemize_with_dict", return_value="phonemes"):
+        stream = tts.infer_stream("Xin chào", ref_codes=[1, 2, 3], ref_text="Chào", cancel_event=cancel)
+        next(stream)
+        cancel.set()
+        assert list(stream) == []
+    # Sampling stopped right after the token that was in flight
+    assert len(sampled) < 10
+
+def test_pipelined_decode_overlaps_and_keeps_order(mock_codec):
+    import threading
+    import time
+    with patch("vieneu.standard.DistillNeuCodec.from_pretrained", return_value=mock_codec):
+        tts = VieNeuTTS(backbone_repo=None, pipeline_decode=True)
+    tts._is_quantized_model = True
+    tts._infer_ggml = lambda voice, chunk, temperature, top_k: (time.sleep(0.05), chunk)[1]
+    decode_threads = set()
+
+    def decode(chunk):
+        decode_threads.add(threading.current_thread().name)
+        time.sleep(0.05)
+        return np.full(10, len(chunk), dtype=np.float32)
+
+    tts._decode = decode
+    text = "Một. Hai hai. Ba ba ba. Bốn bốn bốn bốn."
+    start = time.perf_counter()
+    wav = tts.infer(text, ref_codes=[1, 2, 3], ref_text="Chào", max_chars=12, skip_normalize=True)
+    elapsed = time.perf_counter() - start
+
+    tts.pipeline_decode = False
+    expected = tts.infer(text, ref_codes=[1, 2, 3], ref_text="Chào", max_chars=12, skip_normalize=True)
+    assert np.array_equal(wav, expected)
+    assert decode_threads == {"vieneu-decode", threading.current_thread().name}
+    # 5 chunks x (50 ms generate + 50 ms decode) take >= 500 ms sequentially, ~300 ms pipelined
+    assert elapsed < 0.45
+
+@pytest.mark.parametrize("onnx", [False, True])
+def test_decode_batch_buckets_by_length_and_trims(mock_codec, onnx):
+    with patch("vieneu.standard.DistillNeuCodec.from_pretrained", return_value=mock_codec):
+        tts = VieNeuTTS(backbone_repo=None)
+    tts._is_onnx_codec = onnx
+    calls = []
+
+    def decode_code(codes):
+        calls.append(np.asarray(codes).copy())
+        if onnx:
+            assert isinstance(codes, np.ndarray)
+            return np.repeat(codes.astype(np.float32), tts.hop_length, axis=-1)
+        return codes.float().repeat_interleave(tts.hop_length, dim=-1)
+
+    mock_codec.decode_code.side_effect = decode_code
+    seqs = [[5, 6, 7], [1, 2], [9] * 10, [3, 4, 5], [8, 8]]
+
+    # Default: only equal lengths share a call
+    wavs = tts._decode_batch(seqs)
+    assert sorted(c.shape for c in calls) == [(1, 1, 10), (2, 1, 2), (2, 1, 3)]
+    for seq, wav in zip(seqs, wavs):
+        assert np.array_equal(wav, np.repeat(np.array(seq, dtype=np.float32), tts.hop_length))
+
+    # A bounded spread joins close lengths, edge-padded; the 10-frame sequence stays alone
+    calls.clear()
+    tts.decode_batch_max_pad_frames = 3
+    wavs = tts._decode_batch(seqs)
+    assert sorted(c.shape for c in calls) == [(1, 1, 10), (4, 1, 3)]
+    batched = next(c for c in calls if c.shape[0] == 4)
+    assert batched[0, 0].tolist() == [1, 2, 2]
+    for seq, wav in zip(seqs, wavs):
+        assert np.array_equal(wav, np.repeat(np.array(seq, dtype=np.float32), tts.hop_length))
+
+    with pytest.raises(ValueError):
+        tts._decode_batch([[1, 2], []])
+
+def test_decode_batch_matches_per_item_decode_on_real_codec():
+    pytest.importorskip("neucodec")
+    from neucodec import DistillNeuCodec
+    try:
+        codec = DistillNeuCodec.from_pretrained("neuphonic/distill-neucodec")
+    except Exception as e:
+        pytest.skip(f"codec weights unavailable: {e}")
+    codec.eval()
+    with patch("vieneu.standard.DistillNeuCodec.from_pretrained", return_value=codec):
+        tts = VieNeuTTS(backbone_repo=None)
+
+    rng = np.random.default_rng(0)
+    seqs = [rng.integers(0, 65536, size=n) for n in (40, 40, 25, 60, 25)]
+    expected = [tts._decode_ids(ids) for ids in seqs]
+    for wav, ref in zip(tts._decode_batch(seqs), expected):
+        assert wav.shape == ref.shape
+        np.testing.assert_allclose(wav, ref, atol=1e-4)
+
+def test_prepared_voice_reused_across_chunks(mock_codec, mock_backbone, mock_tokenizer):
+    import dataclasses
+    from vieneu import PreparedVoice
+    with patch("vieneu.standard.NeuCodec.from_pretrained", return_value=mock_codec), \
+         patch("vieneu.standard.DistillNeuCodec.from_pretrained", return_value=mock_codec), \
+         patch("transformers.AutoTokenizer.from_pretrained", return_value=mock_tokenizer), \
+         patch("transformers.AutoModelForCausalLM.from_pretrained", return_value=mock_backbone):
+        tts = VieNeuTTS(backbone_repo="some/repo", backbone_device="cpu")
+
+    with patch("vieneu.base.phonemize_with_dict", return_value="ref phonemes") as ref_phonemize:
+        voice = tts.prepare_voice(ref_codes=torch.tensor([[1, 2, 3]]), ref_text="Chào")
+    assert isinstance(voice, PreparedVoice)
+    assert voice.codes == (1, 2, 3)
+    assert voice.phones == "ref phonemes"
+    assert voice.codes_str == "<|speech_1|><|speech_2|><|speech_3|>"
+    assert voice.codes_token_ids == (1, 2, 3)
+    assert ref_phonemize.call_count == 1
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        voice.phones = "other"
+    # Already prepared for this model and layout: returned as is
+    assert tts.prepare_voice(voice) is voice
+
+    mock_tokenizer.encode.reset_mock()
+    with patch("vieneu.base.phonemize_with_dict") as ref_phonemize, \
+         patch("vieneu.standard.phonemize_with_dict", return_value="phonemes") as chunk_phonemize:
+        tts.infer("Câu một. Câu hai. Câu ba.", voice=voice, max_chars=10, skip_normalize=True)
+    ref_phonemize.assert_not_called()
+    assert chunk_phonemize.call_count == 3
+    # Only the per-chunk text and chat template are tokenized, never the reference codes
+    encoded = [c.args[0] for c in mock_tokenizer.encode.call_args_list]
+    assert voice.codes_str not in encoded
+
+def test_fast_stream_feeds_only_new_text(mock_codec):
+    from types import SimpleNamespace
+    from vieneu.fast import FastVieNeuTTS
+    with patch.object(FastVieNeuTTS, "_load_backbone_lmdeploy"), \
+         patch.object(FastVieNeuTTS, "_load_codec"), \
+         patch.object(FastVieNeuTTS, "_load_voices"), \
+         patch.object(FastVieNeuTTS, "_warmup_model"):
+        tts = FastVieNeuTTS()
+    tts.codec = mock_codec
+    tts.gen_config = MagicMock()
+    tts._apply_watermark = lambda wav: wav
+    generated = list(range(100, 170))
+
+    def stream_infer(prompts, **kwargs):
+        # LMDeploy returns the whole text so far; steps carry one to three tokens
+        text, i = "", 0
+        while i < len(generated):
+            step = generated[i:i + 1 + i % 3]
+            text += "".join(f"<|speech_{t}|>" for t in step)
+            i += len(step)
+            yield SimpleNamespace(text=text, generate_token_len=i)
+
+    tts.backbone = MagicMock()
+    tts.backbone.stream_infer.side_effect = stream_infer
+    windows = []
+    tts._decode_ids = lambda ids: (windows.append(list(ids)), np.zeros(len(ids) * tts.hop_length, dtype=np.float32))[1]
+    voice = tts.prepare_voice(ref_codes=[1, 2, 3], ref_text="Chào")
+
+    with patch("vieneu.fast.phonemize_with_dict", return_value="phonemes"):
+        chunks = list(tts._infer_stream_single("xin chào", voice))
+
+    assert len(chunks) == len(windows) == 2
+    # First window: reference codes plus generated tokens through the lookforward
+    assert len(windows[0]) >= 3 + tts.streaming_frames_per_chunk + tts.streaming_lookforward
+    assert windows[0] == ([1, 2, 3] + generated)[:len(windows[0])]
+    # Final flush ends with the last generated token, nothing repeated or dropped
+    assert windows[1][-len(generated) + 10:] == generated[10:]
+
+def test_fast_stream_prefetch_matches_sequential(mock_codec):
+    from types import SimpleNamespace
+    from vieneu.fast import FastVieNeuTTS
+    with patch.object(FastVieNeuTTS, "_load_backbone_lmdeploy"), \
+         patch.object(FastVieNeuTTS, "_load_codec"), \
+         patch.object(FastVieNeuTTS, "_load_voices"), \
+         patch.object(FastVieNeuTTS, "_warmup_model"):
+        tts = FastVieNeuTTS()
+    tts.codec = mock_codec
+    tts.gen_config = MagicMock()
+    tts._apply_watermark = lambda wav: wav
+    texts = ["một", "hai", "ba"]
+
+    def stream_infer(prompts, **kwargs):
+        # Chunk k emits 40 + 10k tokens; later chunks step faster, so they finish first
+        seqs = [[1000 * (texts.index(p) + 1) + t for t in range(40 + 10 * texts.index(p))] for p in prompts]
+        pos = [0] * len(prompts)
+        while any(n < len(s) for n, s in zip(pos, seqs)):
+            for i, s in enumerate(seqs):
+                if pos[i] < len(s):
+                    pos[i] = min(len(s), pos[i] + 1 + i)
+                    text = "".join(f"<|speech_{t}|>" for t in s[:pos[i]])
+                    done = "stop" if pos[i] == len(s) else None
+                    yield SimpleNamespace(index=i, text=text, generate_token_len=pos[i], finish_reason=done)
+
+    tts.backbone = MagicMock()
+    tts.backbone.stream_infer.side_effect = stream_infer
+    tts._format_prompt = lambda voice, text: text
+    tts._decode_ids = lambda ids: np.repeat(np.asarray(ids, dtype=np.float32), tts.hop_length)
+    voice = tts.prepare_voice(ref_codes=[1, 2, 3], ref_text="Chào")
+
+    with patch("vieneu.fast.split_text_into_chunks", return_value=texts), \
+         patch("vieneu.fast.phonemize_with_dict", return_value="phonemes"):
+        sequential = list(tts.infer_stream("x", voice=voice, skip_normalize=True))
+        tts.backbone.stream_infer.reset_mock()
+        prefetched = list(tts.infer_stream("x", voice=voice, skip_normalize=True, prefetch=1))
+
+    # Chunks 0-1 share one engine call, chunk 2 gets its own
+    assert [c.args[0] for c in tts.backbone.stream_infer.call_args_list] == [texts[:2], texts[2:]]
+    assert len(prefetched) == len(sequential)
+    for a, b in zip(prefetched, sequential):
+        np.testing.assert_array_equal(a, b)
+
+def test_remote_stream_async_matches_sync(mock_codec):
+    import asyncio
+    import json
+    from vieneu.balancer import EndpointBalancer
+    web = pytest.importorskip("aiohttp.web")
+
+    with patch("vieneu.standard.DistillNeuCodec.from_pretrained", return_value=mock_codec):
+        tts = RemoteVieNeuTTS(api_base="http://mock-api", model_name="mock-model")
+    tts._decode_ids = lambda ids: np.repeat(np.asarray(ids, dtype=np.float32), tts.hop_length)
+    tts._apply_watermark = lambda wav: wav
+    generated = list(range(100, 160))
+    lines = [b'data: ' + json.dumps({"choices": [{"delta": {"content": "".join(f"<|speech_{t}|>" for t in generated[i:i + 4])}}]}).encode()
+             for i in range(0, len(generated), 4)] + [b"data: [DONE]"]
+
+    response = MagicMock()
+    response.__enter__.return_value.iter_lines.return_value = lines
+    with patch.object(tts.session, "post", return_value=response), \
+         patch("vieneu.remote.phonemize_with_dict", return_value="phonemes"):
+        expected = list(tts.infer_stream("Xin chào", ref_codes=[1, 2, 3], ref_text="Chào", skip_normalize=True))
+
+    async def sse(request):
+        resp = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await resp.prepare(request)
+        for line in lines:
+            await resp.write(line + b"\n\n")
+        return resp
+
+    async def run():
+        app = web.Application()
+        app.router.add_post("/chat/completions", sse)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        tts.balancer.close()
+        tts.balancer = EndpointBalancer([f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}"])
+        try:
+            return [wav async for wav in tts.infer_stream_async("Xin chào", ref_codes=[1, 2, 3], ref_text="Chào", skip_normalize=True)]
+        finally:
+            await runner.cleanup()
+
+    with patch("vieneu.remote.phonemize_with_dict", return_value="phonemes"):
+        chunks = asyncio.run(run())
+
+    assert len(chunks) == len(expected) > 1
+    for a, b in zip(chunks, expected):
+        np.testing.assert_array_equal(a, b)
+    tts.close()
+
+def test_remote_stream_async_prepares_off_the_event_loop(mock_codec):
+    import asyncio
+    import threading
+    pytest.importorskip("aiohttp")
+
+    with patch("vieneu.standard.DistillNeuCodec.from_pretrained", return_value=mock_codec):
+        tts = RemoteVieNeuTTS(api_base="http://mock-api", model_name="mock-model")
+    threads = {}
+    prepare_voice, normalize = tts.prepare_voice, tts._normalize_text
+
+    def record(name, fn):
+        def wrapper(*args, **kwargs):
+            threads[name] = threading.get_ident()
+            return fn(*args, **kwargs)
+        return wrapper
+
+    tts.prepare_voice = record("prepare_voice", prepare_voice)
+    tts._normalize_text = record("normalize", normalize)
+    session = MagicMock()
+    session.post.side_effect = ValueError("stop after the prompt is built")
+
+    async def run():
+        threads["loop"] = threading.get_ident()
+        async for _ in tts.infer_stream_async("Xin chào", ref_codes=[1, 2, 3], ref_text="Chào", session=session):
+            pass
+
+    with patch("vieneu.remote.phonemize_with_dict", side_effect=record("phonemize", lambda *a, **k: "phonemes")), \
+         pytest.raises(ValueError):
+        asyncio.run(run())
+
+    assert {"prepare_voice", "normalize", "phonemize"} <= threads.keys()
+    assert all(threads[name] != threads["loop"] for name in ("prepare_voice", "normalize", "phonemize"))
+    tts.close()
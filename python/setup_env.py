@@ -29,6 +29,7 @@ REQUIREMENTS_FILE = SCRIPT_DIR / "requirements.txt"
 VIENEU_DIR = SCRIPT_DIR / "VieNeu-TTS"
 VIENEU_VENV_DIR = VIENEU_DIR / ".venv"
 TTS_SERVER_SCRIPT = SCRIPT_DIR / "vieneu_tts_server.py"
+LEXICON_FILE = VIENEU_DIR / "src" / "vieneu_utils" / "phoneme_lexicon.bin"
 
 
 def get_platform_info():
@@ -114,6 +115,7 @@ def check_env():
     vieneu_cloned = VIENEU_DIR.exists()
     vieneu_venv_exists = VIENEU_VENV_DIR.exists() and Path(info["vieneu_python"]).exists()
     tts_server_exists = TTS_SERVER_SCRIPT.exists()
+    lexicon_built = LEXICON_FILE.exists()
 
     # Check installed packages if venv exists
     installed_packages = []
@@ -162,6 +164,7 @@ def check_env():
          vieneu_venv_exists=vieneu_venv_exists,
          vieneu_installed=vieneu_installed,
          tts_server_exists=tts_server_exists,
+         lexicon_built=lexicon_built,
          whisper_installed=whisper_installed,
          torch_installed=torch_installed,
          installed_count=len(installed_packages),
@@ -274,11 +277,39 @@ def install_vieneu_tts():
         return False
 
 
+def build_phoneme_lexicon():
+    """Build the prebuilt phoneme lexicon of VieNeu-TTS (needs eSpeak NG)."""
+    info = get_platform_info()
+
+    if not VIENEU_DIR.exists():
+        return True
+
+    emit("step", step="building_lexicon", message="Building phoneme lexicon...")
+
+    try:
+        result = subprocess.run(
+            [info["venv_python"], "-m", "vieneu_utils.lexicon", "--output", str(LEXICON_FILE)],
+            capture_output=True, text=True, timeout=600
+        )
+
+        if result.returncode != 0:
+            emit("error", step="build_lexicon",
+                 message="Phoneme lexicon build failed (is eSpeak NG installed?); "
+                         f"TTS will fall back to slow espeak phonemization: {result.stderr[-500:]}")
+            return False
+
+        emit("step", step="lexicon_built", message="Phoneme lexicon built successfully")
+        return True
+    except Exception as e:
+        emit("error", step="build_lexicon", message=str(e))
+        return False
+
+
 def full_setup():
-    """Run full setup: venv → pip upgrade → requirements → VieNeu-TTS."""
+    """Run full setup: venv → pip upgrade → requirements → VieNeu-TTS → phoneme lexicon."""
     emit("step", step="setup_start", message="Starting full Python environment setup...")
 
-    total_steps = 4
+    total_steps = 5
     current = 0
 
     # Step 1: Create venv
@@ -305,6 +336,11 @@ def full_setup():
     emit("progress", current=current, total=total_steps, percent=int(current / total_steps * 100))
     install_vieneu_tts()  # Non-critical
 
+    # Step 5: Build phoneme lexicon
+    current += 1
+    emit("progress", current=current, total=total_steps, percent=int(current / total_steps * 100))
+    build_phoneme_lexicon()  # Non-critical, TTS falls back to espeak
+
     emit("complete", success=True, message="Python environment setup completed!")
 
 
@@ -322,6 +358,7 @@ def main():
     elif command == "install":
         install_requirements()
         install_vieneu_tts()
+        build_phoneme_lexicon()
     else:
         print(json.dumps({"error": f"Unknown command: {command}"}))
         sys.exit(1)
@@ -12,10 +12,21 @@ Optimizations applied:
   - NVIDIA persistence mode at startup
   - Triton-compiled codec if available
   - cudnn.benchmark for auto-tuned convolution kernels
+  - pool of independent GGUF backbone contexts (VIENEU_TTS_WORKERS) sharing one codec
 
 API unchanged — same endpoints, same response format, same SSE protocol.
 HTTP API on localhost:8179 for Electron to call.
 
+Binary streaming (POST /generate-stream-pcm, WS /ws/generate-stream):
+  Raw little-endian PCM16 mono instead of base64 WAV-in-JSON. One header up front:
+    b"VNPC" | uint32 sample_rate | uint16 channels | uint16 bits_per_sample
+  HTTP (chunked) then sends length-prefixed frames:
+    uint8 type | uint32 payload_length | payload
+    type 1 = audio (PCM16 samples), 2 = done (JSON), 3 = error (JSON)
+  WebSocket sends the header as the first binary message, then one binary
+  message of PCM16 samples per chunk, then a JSON text message
+  {"event": "done" | "error", ...}.
+
 Requires:
     pip install fastapi uvicorn
 """
@@ -30,6 +41,9 @@ import base64
 import subprocess
 import asyncio
 import threading
+import concurrent.futures
+from collections import OrderedDict
+from contextlib import contextmanager, aclosing
 from pathlib import Path
 
 os.environ["PYTHONUTF8"] = "1"
@@ -53,21 +67,51 @@ REF_TEXT = "Đang tìm kiếm một công cụ giúp quản lý tài chính thô
 CODEC_REPO = "neuphonic/distill-neucodec"
 SAMPLE_RATE = 24000
 
+# Encoded reference codes are cached in memory and on disk, so repeated
+# requests with the same ref_audio (and server restarts) skip codec encoding
+REF_CACHE_DIR = SCRIPT_DIR / ".cache" / "ref_codes"
+REF_CACHE_MAX_ENTRIES = 64
+
+# Synthesized audio for repeated phrases (greetings, hotline numbers, ...), keyed by
+# normalized text + voice + model + sampling params and generated with a fixed seed.
+# Off by default; set VIENEU_AUDIO_CACHE=1 to enable.
+AUDIO_CACHE_ENABLED = os.environ.get("VIENEU_AUDIO_CACHE", "0") == "1"
+AUDIO_CACHE_DIR = SCRIPT_DIR / ".cache" / "audio"
+AUDIO_CACHE_MAX_MB = 256
+AUDIO_CACHE_MAX_DISK_MB = 1024
+AUDIO_CACHE_SEED = 1234
+
+# Phonemized reference transcript + rendered reference codes per voice, built once
+# and reused by every request (and every chunk) that uses the same reference
+PREPARED_VOICE_CACHE_SIZE = 16
+
 # Inference defaults — tuned for GGUF quantized models
 # Lower temperature reduces repetition/noise artifacts common in q4 models
 # Tighter top_k produces more stable speech token sequences
 DEFAULT_TEMPERATURE = 0.7
 DEFAULT_TOP_K = 35
 
+# Max decoded chunks buffered per stream before the producer thread blocks
+# (backpressure towards a slow client instead of unbounded memory growth)
+STREAM_QUEUE_MAXSIZE = 8
+
+# Backbone worker pool: each worker is an independent llama.cpp context over the
+# same mmapped GGUF weights (one shared codec), so concurrent requests — e.g.
+# Electron's MAX_TTS_CONCURRENT=2 — run in parallel instead of queueing.
+# CPU cores are split evenly across workers unless TTS_THREADS_PER_WORKER is set.
+TTS_WORKERS = int(os.environ.get("VIENEU_TTS_WORKERS", "2"))
+TTS_THREADS_PER_WORKER = int(os.environ.get("VIENEU_TTS_THREADS_PER_WORKER", "0")) or None
+
 # Global state
 tts = None
+tts_pool = None
+metrics = None  # vieneu.metrics.MetricsRegistry, exposed on /metrics
 is_loaded = False
 lora_loaded = False
 load_error = None
 tts_mode = None  # 'standard-cpu' or 'fast' or 'standard'
-
-# Thread lock for llama_cpp inference (NOT thread-safe)
-_inference_lock = threading.Lock()
+_prepared_voices = OrderedDict()  # (ref_audio, mtime, ref_text) -> vieneu.PreparedVoice
+_prepared_voices_lock = threading.Lock()
 
 
 def set_nvidia_persistence_mode():
@@ -117,7 +161,7 @@ def set_torch_optimizations():
 
 def load_model():
     """Load model — GGUF backbone on CPU + codec on CUDA."""
-    global tts, is_loaded, lora_loaded, load_error, tts_mode
+    global tts, tts_pool, metrics, is_loaded, lora_loaded, load_error, tts_mode
 
     if is_loaded:
         return
@@ -126,7 +170,9 @@ def load_model():
     sys.path.insert(0, str(VIENEU_DIR / "src"))
     sys.path.insert(0, str(VIENEU_DIR))
 
-    from vieneu import Vieneu
+    from vieneu import Vieneu, ReferenceCodeCache, AudioCache, BackbonePool
+    from vieneu.pool import default_threads_per_worker
+    from vieneu.metrics import MetricsRegistry
 
     # Apply torch optimizations before model load (for codec on CUDA)
     set_torch_optimizations()
@@ -139,6 +185,9 @@ def load_model():
         print(f"[TTS-Server] Backbone: {GGUF_MODEL} (CPU)", flush=True)
         print(f"[TTS-Server] Codec: {CODEC_REPO} (CUDA)", flush=True)
 
+        n_threads = TTS_THREADS_PER_WORKER or default_threads_per_worker(TTS_WORKERS)
+        print(f"[TTS-Server] Workers: {TTS_WORKERS} x {n_threads} threads", flush=True)
+
         t0 = time.time()
         tts = Vieneu(
             mode="standard",
@@ -146,9 +195,19 @@ def load_model():
             backbone_device="cpu",
             codec_repo=CODEC_REPO,
             codec_device="cuda",
+            n_threads=n_threads,
+            pipeline_decode=True,  # codec decodes chunk N while the backbone generates N+1
         )
         tts_mode = "standard-cpu"
         lora_loaded = False  # GGUF does not support LoRA
+        tts.set_reference_cache(ReferenceCodeCache(cache_dir=REF_CACHE_DIR, max_entries=REF_CACHE_MAX_ENTRIES))
+        if AUDIO_CACHE_ENABLED:
+            tts.set_audio_cache(AudioCache(cache_dir=AUDIO_CACHE_DIR, max_bytes=AUDIO_CACHE_MAX_MB * 1024 * 1024,
+                                           seed=AUDIO_CACHE_SEED,
+                                           max_disk_bytes=AUDIO_CACHE_MAX_DISK_MB * 1024 * 1024))
+        metrics = MetricsRegistry()
+        tts.set_metrics(metrics)
+        tts_pool = BackbonePool(tts, size=TTS_WORKERS)
         print(f"[TTS-Server] ✅ Model loaded in {time.time() - t0:.1f}s", flush=True)
         print(f"[TTS-Server] ℹ️ GGUF mode: no LoRA (using base voice)", flush=True)
 
@@ -158,6 +217,14 @@ def load_model():
         else:
             print(f"[TTS-Server] ⚠️ Ref audio not found: {REF_AUDIO}", flush=True)
 
+        # Without the prebuilt lexicon every new word goes through espeak
+        from vieneu_utils.phonemize_text import phoneme_dict
+        if phoneme_dict.lexicon is not None:
+            print(f"[TTS-Server] ✅ Phoneme lexicon: {len(phoneme_dict.lexicon)} entries", flush=True)
+        else:
+            print("[TTS-Server] ⚠️ Phoneme lexicon missing, phonemization falls back to espeak (slow). "
+                  "Build it with: python -m vieneu_utils.lexicon (or re-run setup_env.py install)", flush=True)
+
         is_loaded = True
         load_error = None
 
@@ -168,20 +235,36 @@ def load_model():
         print(f"[TTS-Server] ❌ Model load error: {e}", flush=True)
 
 
+def get_prepared_voice(ref_audio, ref_text):
+    """Return the PreparedVoice for a reference, preparing it once per (file, mtime, text)."""
+    key = (ref_audio, os.path.getmtime(ref_audio), ref_text)
+    with _prepared_voices_lock:
+        voice = _prepared_voices.get(key)
+        if voice is not None:
+            _prepared_voices.move_to_end(key)
+            return voice
+
+    voice = tts.prepare_voice(ref_audio=ref_audio, ref_text=ref_text)
+    with _prepared_voices_lock:
+        _prepared_voices[key] = voice
+        while len(_prepared_voices) > PREPARED_VOICE_CACHE_SIZE:
+            _prepared_voices.popitem(last=False)
+    return voice
+
+
 def cuda_prewarm():
     """Run a dummy inference to pre-allocate CUDA kernels and memory."""
-    if not is_loaded or tts is None:
+    if not is_loaded or tts_pool is None:
         return
 
     import torch
     print("[TTS-Server] 🔥 CUDA pre-warm: running dummy inference...", flush=True)
     t0 = time.time()
     try:
-        with torch.inference_mode():
-            _ = tts.infer(
+        with tts_pool.acquire() as worker, torch.inference_mode():
+            _ = worker.infer(
                 text="xin chào",
-                ref_audio=REF_AUDIO,
-                ref_text=REF_TEXT,
+                voice=get_prepared_voice(REF_AUDIO, REF_TEXT),
                 temperature=DEFAULT_TEMPERATURE,
                 top_k=DEFAULT_TOP_K,
             )
@@ -193,14 +276,20 @@ def cuda_prewarm():
         print(f"[TTS-Server] ⚠️ CUDA pre-warm failed: {e}", flush=True)
 
 
-def encode_wav_bytes(audio_data, sample_rate):
-    """Encode numpy audio to WAV bytes (PCM 16-bit mono)."""
+def encode_pcm16(audio_data):
+    """Convert numpy audio to little-endian PCM 16-bit samples."""
     import numpy as np
 
     if audio_data.dtype in (np.float32, np.float64):
-        audio_int16 = np.clip(audio_data * 32767, -32768, 32767).astype(np.int16)
+        audio_int16 = np.clip(audio_data * 32767, -32768, 32767).astype("<i2")
     else:
-        audio_int16 = audio_data.astype(np.int16)
+        audio_int16 = audio_data.astype("<i2")
+    return audio_int16
+
+
+def encode_wav_bytes(audio_data, sample_rate):
+    """Encode numpy audio to WAV bytes (PCM 16-bit mono)."""
+    audio_int16 = encode_pcm16(audio_data)
 
     buf = io.BytesIO()
     n = len(audio_int16)
@@ -224,16 +313,51 @@ def encode_wav_bytes(audio_data, sample_rate):
     return buf.getvalue()
 
 
+# Binary stream protocol (see module docstring)
+PCM_STREAM_MAGIC = b"VNPC"
+PCM_FRAME_AUDIO = 1
+PCM_FRAME_DONE = 2
+PCM_FRAME_ERROR = 3
+
+
+def pcm_stream_header(sample_rate):
+    """Stream header sent once before any PCM frame."""
+    return PCM_STREAM_MAGIC + struct.pack("<IHH", sample_rate, 1, 16)
+
+
+def pcm_frame(frame_type, payload):
+    """Length-prefixed binary frame."""
+    return struct.pack("<BI", frame_type, len(payload)) + payload
+
+
+def observe_stage(stage, seconds):
+    """Record a server-side pipeline stage (no-op until the model is loaded)."""
+    if metrics is not None:
+        metrics.observe(stage, seconds)
+
+
+@contextmanager
+def acquire_worker():
+    """Borrow a backbone worker from the pool, recording how long the request waited for it."""
+    t0 = time.perf_counter()
+    with tts_pool.acquire() as worker:
+        observe_stage("worker_wait", time.perf_counter() - t0)
+        yield worker
+
+
 def generate_audio(gen_text, ref_audio=None, ref_text=None, speed=1.0, response_format="json",
-                   temperature=None, top_k=None):
+                   temperature=None, top_k=None, enqueued_at=None):
     """Generate audio with torch.inference_mode() for maximum speed.
 
     If client sends ref_audio/ref_text, use those.
     Otherwise fall back to the training dataset reference (best quality).
+    enqueued_at is the perf_counter() time the request was handed to the executor.
     """
     import torch
 
     start = time.time()
+    queue_wait = time.perf_counter() - enqueued_at if enqueued_at is not None else 0.0
+    observe_stage("queue_wait", queue_wait)
 
     # Use provided values or fall back to optimized defaults
     actual_temperature = temperature if temperature is not None else DEFAULT_TEMPERATURE
@@ -242,27 +366,40 @@ def generate_audio(gen_text, ref_audio=None, ref_text=None, speed=1.0, response_
     # Use provided ref or fall back to default (training dataset)
     actual_ref_audio = ref_audio if (ref_audio and os.path.isfile(ref_audio)) else REF_AUDIO
     actual_ref_text = ref_text if ref_text else REF_TEXT
+    voice = get_prepared_voice(actual_ref_audio, actual_ref_text)
 
     gen_start = time.time()
-    with _inference_lock:  # llama_cpp is NOT thread-safe
-        with torch.inference_mode():
-            audio = tts.infer(
-                text=gen_text,
-                ref_audio=actual_ref_audio,
-                ref_text=actual_ref_text,
-                temperature=actual_temperature,
-                top_k=actual_top_k,
-            )
+    # Repeated phrases are answered from the audio cache without taking a worker
+    audio = tts.lookup_cached_audio(
+        text=gen_text,
+        voice=voice,
+        temperature=actual_temperature,
+        top_k=actual_top_k,
+    )
+    cached = audio is not None
+    if not cached:
+        with acquire_worker() as worker:  # llama_cpp contexts are NOT thread-safe
+            with torch.inference_mode():
+                audio = worker.infer(
+                    text=gen_text,
+                    voice=voice,
+                    temperature=actual_temperature,
+                    top_k=actual_top_k,
+                )
     gen_time = time.time() - gen_start
 
     timings = {
         "preprocess": 0,
         "generate": round(gen_time, 3),
         "total": round(time.time() - start, 3),
+        "queue_wait": round(queue_wait, 3),
+        "cached": cached,
     }
 
     if response_format == "wav":
+        t0 = time.perf_counter()
         wav_bytes = encode_wav_bytes(audio, SAMPLE_RATE)
+        observe_stage("wav_encode", time.perf_counter() - t0)
         return wav_bytes, timings
 
     # Legacy JSON response with file path
@@ -281,8 +418,12 @@ def generate_audio(gen_text, ref_audio=None, ref_text=None, speed=1.0, response_
 
 
 def generate_audio_stream(gen_text, ref_audio=None, ref_text=None,
-                          temperature=None, top_k=None):
-    """Generator: yield (wav_bytes, chunk_index) with torch.inference_mode()."""
+                          temperature=None, top_k=None, fmt="wav", cancel_event=None):
+    """Generator: yield (audio_bytes, chunk_index) with torch.inference_mode().
+
+    fmt='wav' yields a full WAV file per chunk, fmt='pcm' yields raw PCM16 samples.
+    Setting cancel_event (threading.Event) stops generation at the next token.
+    """
     import torch
 
     actual_temperature = temperature if temperature is not None else DEFAULT_TEMPERATURE
@@ -290,20 +431,27 @@ def generate_audio_stream(gen_text, ref_audio=None, ref_text=None,
 
     actual_ref_audio = ref_audio if (ref_audio and os.path.isfile(ref_audio)) else REF_AUDIO
     actual_ref_text = ref_text if ref_text else REF_TEXT
+    voice = get_prepared_voice(actual_ref_audio, actual_ref_text)
 
     chunk_index = 0
-    with _inference_lock:  # llama_cpp is NOT thread-safe
+    with acquire_worker() as worker:  # llama_cpp contexts are NOT thread-safe
         with torch.inference_mode():
-            for audio_chunk in tts.infer_stream(
+            for audio_chunk in worker.infer_stream(
                 text=gen_text,
-                ref_audio=actual_ref_audio,
-                ref_text=actual_ref_text,
+                voice=voice,
                 temperature=actual_temperature,
                 top_k=actual_top_k,
+                cancel_event=cancel_event,
             ):
                 if len(audio_chunk) > 0:
-                    wav_bytes = encode_wav_bytes(audio_chunk, SAMPLE_RATE)
-                    yield wav_bytes, chunk_index
+                    t0 = time.perf_counter()
+                    if fmt == "pcm":
+                        audio_bytes = encode_pcm16(audio_chunk).tobytes()
+                        observe_stage("pcm_encode", time.perf_counter() - t0)
+                    else:
+                        audio_bytes = encode_wav_bytes(audio_chunk, SAMPLE_RATE)
+                        observe_stage("wav_encode", time.perf_counter() - t0)
+                    yield audio_bytes, chunk_index
                     chunk_index += 1
 
 
@@ -312,8 +460,8 @@ def generate_audio_stream(gen_text, ref_audio=None, ref_text=None,
 # ============================================================
 
 from contextlib import asynccontextmanager
-from fastapi import FastAPI, Request
-from fastapi.responses import JSONResponse, Response, StreamingResponse
+from fastapi import FastAPI, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 
 
@@ -327,6 +475,9 @@ async def lifespan(app):
     print(f"[TTS-Server]   GET  /health           - Health check", flush=True)
     print(f"[TTS-Server]   POST /generate          - Generate audio (json|wav)", flush=True)
     print(f"[TTS-Server]   POST /generate-stream   - SSE streaming (chunked)", flush=True)
+    print(f"[TTS-Server]   GET  /metrics           - Prometheus per-stage latency metrics", flush=True)
+    print(f"[TTS-Server]   POST /generate-stream-pcm - Binary PCM16 streaming (chunked)", flush=True)
+    print(f"[TTS-Server]   WS   /ws/generate-stream  - Binary PCM16 streaming (WebSocket)", flush=True)
     yield
     # Shutdown
     print("[TTS-Server] Shutting down...", flush=True)
@@ -358,11 +509,41 @@ async def health():
         "ref_audio": Path(REF_AUDIO).name,
         "sample_rate": SAMPLE_RATE,
     }
+    if tts is not None and getattr(tts, "ref_code_cache", None) is not None:
+        response["ref_cache"] = tts.ref_code_cache.stats()
+    if tts is not None and getattr(tts, "audio_cache", None) is not None:
+        response["audio_cache"] = tts.audio_cache.stats()
+    if tts_pool is not None:
+        response["workers"] = tts_pool.stats()
+    if is_loaded:
+        from vieneu_utils.phonemize_text import phoneme_dict
+        response["phoneme_lexicon"] = phoneme_dict.lexicon is not None
     if load_error:
         response["error"] = load_error
     return JSONResponse(content=response)
 
 
+@app.get("/metrics")
+async def metrics_endpoint():
+    """Per-stage latency histograms and pool/cache gauges in Prometheus text format."""
+    if metrics is None:
+        return PlainTextResponse("", media_type="text/plain; version=0.0.4")
+
+    if tts_pool is not None:
+        pool = tts_pool.stats()
+        metrics.set_gauge("workers", pool["workers"], "Backbone workers in the pool.")
+        metrics.set_gauge("workers_busy", pool["busy"], "Backbone workers currently synthesizing.")
+        metrics.set_counter("worker_waits_total", pool["waits"], "Requests that had to wait for a free worker.")
+    for name, cache in (("ref_cache", getattr(tts, "ref_code_cache", None)),
+                        ("audio_cache", getattr(tts, "audio_cache", None))):
+        if cache is not None:
+            cache_stats = cache.stats()
+            metrics.set_gauge(f"{name}_entries", cache_stats["entries"])
+            metrics.set_gauge(f"{name}_hit_rate", cache_stats["hit_rate"])
+
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
 @app.post("/generate")
 async def generate(request: Request):
     """Generate audio — supports JSON (legacy) and WAV binary response."""
@@ -390,9 +571,10 @@ async def generate(request: Request):
         loop = asyncio.get_event_loop()
 
         if response_format == "wav":
+            enqueued_at = time.perf_counter()
             wav_bytes, timings = await loop.run_in_executor(
                 None, lambda: generate_audio(gen_text, ref_audio, ref_text, speed, "wav",
-                                              temperature, top_k)
+                                              temperature, top_k, enqueued_at)
             )
             print(f"[TTS-Server] Done in {timings['total']}s", flush=True)
 
@@ -405,9 +587,10 @@ async def generate(request: Request):
                 },
             )
         else:
+            enqueued_at = time.perf_counter()
             result, _ = await loop.run_in_executor(
                 None, lambda: generate_audio(gen_text, ref_audio, ref_text, speed, "json",
-                                              temperature, top_k)
+                                              temperature, top_k, enqueued_at)
             )
             print(f"[TTS-Server] Done: {result.get('output', 'N/A')}", flush=True)
             return JSONResponse(content=result)
@@ -418,81 +601,131 @@ async def generate(request: Request):
         return JSONResponse(status_code=500, content={"error": str(e)})
 
 
+def parse_stream_request(data):
+    """Extract streaming parameters from a request payload."""
+    gen_text = (data.get("gen_text") or "").strip()
+    temperature = data.get("temperature")
+    top_k = data.get("top_k")
+    return {
+        "gen_text": gen_text,
+        "ref_audio": data.get("ref_audio"),
+        "ref_text": data.get("ref_text"),
+        "temperature": float(temperature) if temperature is not None else None,
+        "top_k": int(top_k) if top_k is not None else None,
+    }
+
+
+async def iterate_audio_stream(params, fmt):
+    """Run generate_audio_stream in a producer thread and yield its items on the event loop.
+
+    Yields ("chunk", audio_bytes, idx), then exactly one ("done", None, None)
+    or ("error", message, None).
+
+    The thread hands items over through a bounded asyncio.Queue, so each chunk
+    wakes the consumer as soon as it is decoded, no executor thread is held
+    while waiting, and a slow client blocks the producer once
+    STREAM_QUEUE_MAXSIZE chunks are pending.
+
+    When the consumer goes away (client disconnect cancels or closes this
+    generator), the cancel token is set: the backbone stops at the next token,
+    and the producer closes the generator, which returns its backbone worker
+    to the pool. Consumers should iterate inside contextlib.aclosing() so the
+    cleanup runs immediately.
+    """
+    loop = asyncio.get_running_loop()
+    q = asyncio.Queue(maxsize=STREAM_QUEUE_MAXSIZE)
+    stopped = threading.Event()
+    started_at = time.perf_counter()
+
+    def put(item):
+        """Blocking put from the producer thread; False once the consumer is gone.
+
+        The time spent blocked is recorded as "stream_put_wait": it grows when the
+        client reads slower than chunks are decoded and the queue is full.
+        """
+        if stopped.is_set():
+            return False
+        t0 = time.perf_counter()
+        try:
+            fut = asyncio.run_coroutine_threadsafe(q.put(item), loop)
+        except RuntimeError:  # event loop closed
+            return False
+        while True:
+            try:
+                fut.result(timeout=0.5)
+                observe_stage("stream_put_wait", time.perf_counter() - t0)
+                return True
+            except concurrent.futures.TimeoutError:
+                if stopped.is_set():
+                    fut.cancel()
+                    return False
+
+    def producer():
+        gen = generate_audio_stream(params["gen_text"], params["ref_audio"],
+                                    params["ref_text"], params["temperature"],
+                                    params["top_k"], fmt=fmt, cancel_event=stopped)
+        try:
+            for audio_bytes, chunk_idx in gen:
+                if not put(("chunk", audio_bytes, chunk_idx)):
+                    return
+            if stopped.is_set():
+                print("[TTS-Server] Stream cancelled (client disconnected)", flush=True)
+                return
+            put(("done", None, None))
+        except Exception as e:
+            put(("error", str(e), None))
+        finally:
+            gen.close()
+
+    threading.Thread(target=producer, daemon=True).start()
+
+    first_chunk = True
+    try:
+        while True:
+            item = await q.get()
+            if first_chunk and item[0] == "chunk":
+                observe_stage("stream_first_chunk", time.perf_counter() - started_at)
+                first_chunk = False
+            yield item
+            if item[0] != "chunk":
+                break
+    finally:
+        stopped.set()
+
+
 @app.post("/generate-stream")
 async def generate_stream(request: Request):
     """SSE streaming: yield audio chunks as they're generated."""
     try:
-        data = await request.json()
-
-        gen_text = data.get("gen_text", "").strip()
-        if not gen_text:
+        params = parse_stream_request(await request.json())
+        if not params["gen_text"]:
             return JSONResponse(status_code=400, content={"error": "Missing gen_text"})
 
-        ref_audio = data.get("ref_audio")
-        ref_text = data.get("ref_text")
-        temperature = data.get("temperature")
-        top_k = data.get("top_k")
-        if temperature is not None:
-            temperature = float(temperature)
-        if top_k is not None:
-            top_k = int(top_k)
-
-        print(f"[TTS-Server] Streaming: '{gen_text[:80]}...'", flush=True)
+        print(f"[TTS-Server] Streaming: '{params['gen_text'][:80]}...'", flush=True)
 
         start = time.time()
 
         async def event_generator():
-            loop = asyncio.get_event_loop()
-
-            # Run the blocking generator in a thread
-            import queue
-            import threading
-
-            q = queue.Queue()
-
-            def producer():
-                try:
-                    for wav_bytes, chunk_idx in generate_audio_stream(gen_text, ref_audio, ref_text,
-                                                                       temperature, top_k):
-                        q.put(("chunk", wav_bytes, chunk_idx))
-                    q.put(("done", None, None))
-                except Exception as e:
-                    q.put(("error", str(e), None))
-
-            thread = threading.Thread(target=producer, daemon=True)
-            thread.start()
-
-            while True:
-                # Check queue with timeout to keep async loop responsive
-                try:
-                    item = await loop.run_in_executor(None, lambda: q.get(timeout=0.1))
-                except Exception:
-                    continue
-
-                msg_type, payload, idx = item
-
-                if msg_type == "chunk":
-                    event_data = json.dumps({
-                        "chunk_index": idx,
-                        "audio_base64": base64.b64encode(payload).decode("ascii"),
-                        "sample_rate": SAMPLE_RATE,
-                        "elapsed": round(time.time() - start, 3),
-                    })
-                    yield f"event: audio-chunk\ndata: {event_data}\n\n"
-                    print(f"[TTS-Server] Chunk {idx} (t={round(time.time() - start, 2)}s)", flush=True)
-
-                elif msg_type == "done":
-                    done_data = json.dumps({"total_time": round(time.time() - start, 3)})
-                    yield f"event: done\ndata: {done_data}\n\n"
-                    print(f"[TTS-Server] Stream done in {round(time.time() - start, 2)}s", flush=True)
-                    break
-
-                elif msg_type == "error":
-                    error_data = json.dumps({"error": payload})
-                    yield f"event: error\ndata: {error_data}\n\n"
-                    break
-
-            thread.join(timeout=5)
+            async with aclosing(iterate_audio_stream(params, "wav")) as items:
+                async for msg_type, payload, idx in items:
+                    if msg_type == "chunk":
+                        event_data = json.dumps({
+                            "chunk_index": idx,
+                            "audio_base64": base64.b64encode(payload).decode("ascii"),
+                            "sample_rate": SAMPLE_RATE,
+                            "elapsed": round(time.time() - start, 3),
+                        })
+                        yield f"event: audio-chunk\ndata: {event_data}\n\n"
+                        print(f"[TTS-Server] Chunk {idx} (t={round(time.time() - start, 2)}s)", flush=True)
+
+                    elif msg_type == "done":
+                        done_data = json.dumps({"total_time": round(time.time() - start, 3)})
+                        yield f"event: done\ndata: {done_data}\n\n"
+                        print(f"[TTS-Server] Stream done in {round(time.time() - start, 2)}s", flush=True)
+
+                    elif msg_type == "error":
+                        error_data = json.dumps({"error": payload})
+                        yield f"event: error\ndata: {error_data}\n\n"
 
         return StreamingResponse(
             event_generator(),
@@ -509,6 +742,93 @@ async def generate_stream(request: Request):
         return JSONResponse(status_code=500, content={"error": str(e)})
 
 
+@app.post("/generate-stream-pcm")
+async def generate_stream_pcm(request: Request):
+    """Binary streaming over chunked HTTP: header + length-prefixed PCM16 frames."""
+    try:
+        params = parse_stream_request(await request.json())
+        if not params["gen_text"]:
+            return JSONResponse(status_code=400, content={"error": "Missing gen_text"})
+
+        print(f"[TTS-Server] Streaming (pcm): '{params['gen_text'][:80]}...'", flush=True)
+
+        start = time.time()
+
+        async def frame_generator():
+            yield pcm_stream_header(SAMPLE_RATE)
+            n_chunks = 0
+            async with aclosing(iterate_audio_stream(params, "pcm")) as items:
+                async for msg_type, payload, idx in items:
+                    if msg_type == "chunk":
+                        n_chunks += 1
+                        yield pcm_frame(PCM_FRAME_AUDIO, payload)
+                        print(f"[TTS-Server] PCM chunk {idx} (t={round(time.time() - start, 2)}s)", flush=True)
+                    elif msg_type == "done":
+                        done_data = json.dumps({"total_time": round(time.time() - start, 3), "chunks": n_chunks})
+                        yield pcm_frame(PCM_FRAME_DONE, done_data.encode("utf-8"))
+                        print(f"[TTS-Server] PCM stream done in {round(time.time() - start, 2)}s", flush=True)
+                    elif msg_type == "error":
+                        yield pcm_frame(PCM_FRAME_ERROR, json.dumps({"error": payload}).encode("utf-8"))
+
+        return StreamingResponse(
+            frame_generator(),
+            media_type="application/octet-stream",
+            headers={
+                "Cache-Control": "no-cache",
+                "X-Audio-Format": "pcm_s16le",
+                "X-Sample-Rate": str(SAMPLE_RATE),
+                "X-Channels": "1",
+            },
+        )
+
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return JSONResponse(status_code=500, content={"error": str(e)})
+
+
+@app.websocket("/ws/generate-stream")
+async def ws_generate_stream(websocket: WebSocket):
+    """Binary streaming over WebSocket: one request per message, PCM16 chunks as binary messages."""
+    await websocket.accept()
+    try:
+        while True:
+            try:
+                data = json.loads(await websocket.receive_text())
+                if not isinstance(data, dict):
+                    raise ValueError("expected a JSON object")
+                params = parse_stream_request(data)
+            except (ValueError, TypeError) as e:
+                # A malformed message gets an error frame; the connection stays open
+                await websocket.send_json({"event": "error", "error": f"Invalid request: {e}"})
+                continue
+            if not params["gen_text"]:
+                await websocket.send_json({"event": "error", "error": "Missing gen_text"})
+                continue
+
+            print(f"[TTS-Server] Streaming (ws): '{params['gen_text'][:80]}...'", flush=True)
+            start = time.time()
+            n_chunks = 0
+
+            await websocket.send_bytes(pcm_stream_header(SAMPLE_RATE))
+            async with aclosing(iterate_audio_stream(params, "pcm")) as items:
+                async for msg_type, payload, idx in items:
+                    if msg_type == "chunk":
+                        n_chunks += 1
+                        await websocket.send_bytes(payload)
+                    elif msg_type == "done":
+                        await websocket.send_json({
+                            "event": "done",
+                            "total_time": round(time.time() - start, 3),
+                            "chunks": n_chunks,
+                        })
+                        print(f"[TTS-Server] WS stream done in {round(time.time() - start, 2)}s", flush=True)
+                    elif msg_type == "error":
+                        await websocket.send_json({"event": "error", "error": payload})
+    except WebSocketDisconnect:
+        pass
+
+
 def main():
     import uvicorn
 
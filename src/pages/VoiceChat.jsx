@@ -57,13 +57,50 @@ export default function VoiceChat() {
 
     // Shared streaming handler setup for all voice processing paths
     const createStreamHandler = () => {
-        const audioQueue = []   // sparse array: audioQueue[chunkIndex] = { audioData, mimeType } | 'skipped'
+        // sparse array: audioQueue[chunkIndex] = { audioData, mimeType } | 'skipped'
+        //   | { pcm: true, sampleRate, parts, scheduled, playHead, ended } for chunks streamed as PCM16
+        const audioQueue = []
         let nextPlayIndex = 0
         let streamDone = false
         let totalChunks = 0     // total expected chunks (set when done)
         let playbackResolve = null
         let isPlaying = false
         let aborted = false     // cancels all pending callbacks when session ends
+        let audioCtx = null     // Web Audio context for PCM chunks (created on first use)
+        let pcmActive = null    // PCM entry currently being played
+        const pcmSources = new Set()
+
+        // Schedule any PCM parts of the active entry that arrived since the last call, back to back
+        const schedulePcm = (entry) => {
+            while (entry.scheduled < entry.parts.length) {
+                const bytes = entry.parts[entry.scheduled++]
+                const samples = new Int16Array(bytes.slice().buffer)
+                const buffer = audioCtx.createBuffer(1, samples.length, entry.sampleRate)
+                const channel = buffer.getChannelData(0)
+                for (let i = 0; i < samples.length; i++) channel[i] = samples[i] / 32768
+
+                const source = audioCtx.createBufferSource()
+                source.buffer = buffer
+                source.connect(audioCtx.destination)
+                const startAt = Math.max(audioCtx.currentTime, entry.playHead)
+                source.start(startAt)
+                entry.playHead = startAt + buffer.duration
+                pcmSources.add(source)
+                source.onended = () => {
+                    pcmSources.delete(source)
+                    finishPcmIfDone(entry)
+                }
+            }
+        }
+
+        // Move on once the server finished the chunk and everything scheduled has played
+        const finishPcmIfDone = (entry) => {
+            if (aborted || entry !== pcmActive || !entry.ended) return
+            if (pcmSources.size > 0 || entry.scheduled < entry.parts.length) return
+            pcmActive = null
+            isPlaying = false
+            tryPlayNext()
+        }
 
         const tryPlayNext = () => {
             if (aborted || isPlaying) return
@@ -73,7 +110,16 @@ export default function VoiceChat() {
                 nextPlayIndex++
             }
 
-            if (nextPlayIndex < audioQueue.length && audioQueue[nextPlayIndex] && audioQueue[nextPlayIndex] !== 'skipped') {
+            if (nextPlayIndex < audioQueue.length && audioQueue[nextPlayIndex]?.pcm) {
+                const entry = audioQueue[nextPlayIndex]
+                nextPlayIndex++
+                isPlaying = true
+                pcmActive = entry
+                if (!audioCtx) audioCtx = new AudioContext()
+                entry.playHead = audioCtx.currentTime
+                schedulePcm(entry)
+                finishPcmIfDone(entry)
+            } else if (nextPlayIndex < audioQueue.length && audioQueue[nextPlayIndex] && audioQueue[nextPlayIndex] !== 'skipped') {
                 const { audioData, mimeType } = audioQueue[nextPlayIndex]
                 nextPlayIndex++
                 isPlaying = true
@@ -157,8 +203,42 @@ export default function VoiceChat() {
                     }
                     tryPlayNext()
                 },
+                onTtsPcmStart: (data) => {
+                    if (aborted) return
+                    setPipelineStep('playing')
+                    audioQueue[data.chunkIndex] = {
+                        pcm: true,
+                        sampleRate: data.sampleRate,
+                        parts: [],
+                        scheduled: 0,
+                        playHead: 0,
+                        ended: false,
+                    }
+                    tryPlayNext()
+                },
+                onTtsPcmChunk: (data) => {
+                    if (aborted) return
+                    const entry = audioQueue[data.chunkIndex]
+                    if (!entry?.pcm) return
+                    entry.parts.push(data.pcm)
+                    if (entry === pcmActive) schedulePcm(entry)
+                },
+                onTtsPcmEnd: (data) => {
+                    if (aborted) return
+                    const entry = audioQueue[data.chunkIndex]
+                    if (!entry?.pcm) return
+                    entry.ended = true
+                    finishPcmIfDone(entry)
+                },
                 onTtsChunkFailed: (data) => {
                     if (aborted) return
+                    const entry = audioQueue[data.chunkIndex]
+                    if (entry?.pcm) {
+                        // Keep whatever was already streamed, just stop waiting for more
+                        entry.ended = true
+                        finishPcmIfDone(entry)
+                        return
+                    }
                     audioQueue[data.chunkIndex] = 'skipped'
                     tryPlayNext()
                 },
@@ -206,6 +286,17 @@ export default function VoiceChat() {
                 audioPlayerRef.current.src = ''
                 audioPlayerRef.current = null
             }
+            // Stop streamed PCM playback
+            for (const source of pcmSources) {
+                source.onended = null
+                try { source.stop() } catch { /* already stopped */ }
+            }
+            pcmSources.clear()
+            pcmActive = null
+            if (audioCtx) {
+                audioCtx.close().catch(() => {})
+                audioCtx = null
+            }
         }
 
         return { registerListeners, waitForPlayback, abort }